@@ -0,0 +1,82 @@
+"""Micro-benchmark of the JSON codec backends on work-order payloads.
+
+    python -m benchmarks.bench_codec [--records 20000]
+"""
+import argparse
+import sys
+import os
+import timeit
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.adapters import codec
+
+
+def sample_client_work_orders(count: int) -> list[dict]:
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    statuses = ["isCanceled", "isDone", "isOnHold", "isPending", None]
+    samples = []
+    for i in range(1, count + 1):
+        status = statuses[i % len(statuses)]
+        samples.append({
+            "orderNo": i,
+            "isActive": True,
+            "isCanceled": status == "isCanceled",
+            "isDeleted": False,
+            "isDone": status == "isDone",
+            "isOnHold": status == "isOnHold",
+            "isPending": status == "isPending",
+            "isSynced": False,
+            "summary": f"Example workorder #{i} - troca de rolamento do motor {i % 97}",
+            "creationDate": (base + timedelta(minutes=i)).isoformat(),
+            "lastUpdateDate": (base + timedelta(minutes=i, hours=1)).isoformat(),
+            "deletedDate": None,
+        })
+    return samples
+
+
+def available_backends() -> dict:
+    backends = {}
+    for name, factory in codec._BACKENDS.items():
+        try:
+            backends[name] = factory()
+        except ImportError:
+            continue
+    return backends
+
+
+def run(records: int, repeat: int) -> dict:
+    orders = sample_client_work_orders(records)
+    results = {}
+    
+    for name, (_, loads, dumps, _) in available_backends().items():
+        payloads = [dumps(wo, False) for wo in orders]
+        timings = {
+            "loads": min(timeit.repeat(lambda: [loads(p) for p in payloads], number=1, repeat=repeat)),
+            "dumps": min(timeit.repeat(lambda: [dumps(wo, False) for wo in orders], number=1, repeat=repeat)),
+            "dumps_indent": min(timeit.repeat(lambda: [dumps(wo, True) for wo in orders], number=1, repeat=repeat)),
+        }
+        results[name] = {op: records / seconds for op, seconds in timings.items()}
+    
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    results = run(args.records, args.repeat)
+    baseline = results["json"]
+    
+    print(f"Backend selecionado: {codec.BACKEND}  ({args.records} work orders, melhor de {args.repeat})\n")
+    print(f"{'backend':<10}{'op':<14}{'registros/s':>14}{'vs json':>10}")
+    for name, ops in results.items():
+        for op, rate in ops.items():
+            print(f"{name:<10}{op:<14}{rate:>14,.0f}{rate / baseline[op]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
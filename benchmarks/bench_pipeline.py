@@ -0,0 +1,356 @@
+"""End-to-end benchmark of the inbound, outbound and round-trip pipelines.
+
+    python -m benchmarks.bench_pipeline [--records 10000] [--backend memory|mongod]
+        [--scenario inbound|outbound|roundtrip|all] [--baseline previous.json]
+
+Each scenario runs in a fresh process, so peak RSS is per scenario. Cold start
+runs `python -m src` commands with nothing to do in fresh interpreters
+(--cold-start-runs times each). Results are saved as JSON in --output; with
+--baseline, throughput drops and cold-start slowdowns larger than --tolerance
+are reported and the exit code is 1.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import platform
+import subprocess
+import sys
+import os
+import tempfile
+import time
+import tomllib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.loadgen import DEFAULT_MIX, LoadProfile, parse_mix, seed_collection, write_inbound_files
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+ROOT = Path(__file__).resolve().parent.parent
+SCENARIOS = ("inbound", "outbound", "roundtrip")
+BACKENDS = ("memory", "mongod")
+# Interpreter arguments; "python" is the floor every command pays before importing anything
+COLD_START_COMMANDS = {
+    "python": ["-c", "pass"],
+    "help": ["-m", "src", "--help"],
+    "inbound-idle": ["-m", "src", "inbound"],
+    "outbound-idle": ["-m", "src", "outbound"],
+}
+
+
+def percentile(values: List[float], q: float) -> float | None:
+    # Nearest rank, so p99 is an observed value and not an interpolation
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux and bytes on macOS; children cover the parallel inbound workers
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak / scale
+
+
+def latency_summary(samples: Dict) -> Dict[str, Dict]:
+    summary = {}
+    for (name, labels), values in samples.items():
+        label = "/".join(value for _, value in labels)
+        summary[f"{name}:{label}"] = {
+            "count": len(values),
+            "meanMs": sum(values) / len(values) * 1000,
+            "p50Ms": percentile(values, 0.50) * 1000,
+            "p99Ms": percentile(values, 0.99) * 1000,
+        }
+    return dict(sorted(summary.items()))
+
+
+def build_info() -> Dict:
+    info = {"python": platform.python_version(), "platform": platform.platform()}
+    try:
+        info["version"] = tomllib.loads((ROOT / "pyproject.toml").read_text())["tool"]["poetry"]["version"]
+    except (OSError, KeyError):
+        pass
+    try:
+        info["commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return info
+
+
+def use_backend(backend: str, database: str):
+    from src.database.checkpoints import CHECKPOINTS_COLLECTION
+    from src.database.connection import DatabaseConnection, get_db
+    from src.database.indexes import ensure_indexes
+    
+    os.environ["MONGO_DATABASE"] = database
+    os.environ["MONGO_ENSURE_INDEXES"] = "false"
+    if backend == "memory":
+        from benchmarks.memory_store import MemoryClient
+        
+        # Installed as the shared client, so every service's get_db() picks it up
+        DatabaseConnection._client = MemoryClient()
+        DatabaseConnection._db = DatabaseConnection._client[database]
+    
+    db = get_db()
+    if not db.is_connected():
+        db.close()
+        raise RuntimeError(f"MongoDB indisponível em {os.getenv('MONGO_URI', 'mongodb://localhost:27017')}")
+    
+    collection = db.get_collection("workorders")
+    collection.drop()
+    db.get_collection(CHECKPOINTS_COLLECTION).drop()
+    ensure_indexes(collection)
+    return db
+
+
+def _run_stage(run, records: int) -> Dict:
+    started = time.perf_counter()
+    totals = run()
+    seconds = time.perf_counter() - started
+    return {
+        "records": records,
+        "seconds": seconds,
+        "recordsPerSecond": records / seconds if seconds else None,
+        "totals": totals,
+    }
+
+
+def run_inbound(parallel: bool) -> Dict[str, int]:
+    from src.service.inbound_service import InboundService
+    from src.service.parallel_inbound_service import ParallelInboundService
+    
+    service = ParallelInboundService() if parallel else InboundService()
+    try:
+        return service.process()
+    finally:
+        service.close()
+
+
+def run_outbound() -> Dict[str, int]:
+    from src.service.outbound_service import OutboundService
+    
+    service = OutboundService()
+    try:
+        return service.process()
+    finally:
+        service.close()
+
+
+def run_scenario(scenario: str, profile: LoadProfile, backend: str, database: str, parallel: bool, log_level: str) -> Dict:
+    from src.log_config import configure_logging
+    from src.metrics import metrics
+    
+    configure_logging(level=log_level, enqueue=False)
+    
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        os.environ["DATA_INBOUND_DIR"] = os.path.join(workdir, "inbound")
+        os.environ["DATA_OUTBOUND_DIR"] = os.path.join(workdir, "outbound")
+        os.environ["INBOUND_INCREMENTAL"] = "false"
+        # The generated files are seconds old; malformed ones are quarantined, not held back as still being written
+        os.environ["QUARANTINE_MIN_AGE"] = "0"
+        
+        db = use_backend(backend, database)
+        try:
+            # Data generation is setup, not part of the measured stages
+            generated = {}
+            if scenario in ("inbound", "roundtrip"):
+                generated = write_inbound_files(os.environ["DATA_INBOUND_DIR"], profile)
+            if scenario == "outbound":
+                generated = {"documents": seed_collection(db.get_collection("workorders"), profile)}
+            
+            metrics.reset()
+            metrics.keep_samples = True
+            stages = {}
+            if scenario in ("inbound", "roundtrip"):
+                stages["inbound"] = _run_stage(lambda: run_inbound(parallel), profile.records)
+            if scenario in ("outbound", "roundtrip"):
+                unsynced = db.get_collection("workorders").count_documents({"isSynced": False})
+                stages["outbound"] = _run_stage(run_outbound, unsynced)
+        finally:
+            db.close()
+    
+    seconds = sum(stage["seconds"] for stage in stages.values())
+    return {
+        "generated": generated,
+        "seconds": seconds,
+        "recordsPerSecond": profile.records / seconds if seconds else None,
+        "stages": stages,
+        "latency": latency_summary(metrics.samples),
+        "peakRssMb": peak_rss_mb(),
+    }
+
+
+def run(args, profile: LoadProfile) -> Dict:
+    scenarios = SCENARIOS if args.scenario == "all" else (args.scenario,)
+    results = {}
+    for scenario in scenarios:
+        call = (scenario, profile, args.backend, args.database, args.parallel, args.log_level)
+        if args.in_process:
+            results[scenario] = run_scenario(*call)
+            continue
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            results[scenario] = executor.submit(run_scenario, *call).result()
+    return results
+
+
+def measure_cold_start(runs: int, backend: str, database: str) -> Dict[str, Dict]:
+    commands = dict(COLD_START_COMMANDS)
+    if backend != "mongod":
+        # The outbound probe needs a server; the memory backend only lives inside this process
+        commands.pop("outbound-idle")
+    
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench-cold-") as workdir:
+        env = {
+            **os.environ,
+            "DATA_INBOUND_DIR": os.path.join(workdir, "inbound"),
+            "DATA_OUTBOUND_DIR": os.path.join(workdir, "outbound"),
+            # Never the benchmark database, so outbound-idle really finds nothing to sync
+            "MONGO_DATABASE": f"{database}_coldstart",
+            "LOG_LEVEL": "ERROR",
+        }
+        os.makedirs(env["DATA_INBOUND_DIR"])
+        
+        for name, arguments in commands.items():
+            samples = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                subprocess.run([sys.executable, *arguments], cwd=ROOT, env=env, capture_output=True, check=True)
+                samples.append(time.perf_counter() - started)
+            results[name] = {
+                "runs": runs,
+                # The minimum is the least noisy estimate of a process start, so it is what gets compared
+                "minMs": min(samples) * 1000,
+                "p50Ms": percentile(samples, 0.50) * 1000,
+                "maxMs": max(samples) * 1000,
+            }
+    return results
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    regressions = []
+    for scenario, current in results.items():
+        for stage, measured in current["stages"].items():
+            previous = baseline.get("scenarios", {}).get(scenario, {}).get("stages", {}).get(stage)
+            if not previous or not previous.get("recordsPerSecond") or not measured.get("recordsPerSecond"):
+                continue
+            change = measured["recordsPerSecond"] / previous["recordsPerSecond"] - 1
+            if change < -tolerance:
+                regressions.append(f"{scenario}/{stage}: {change:+.1%} registros/s")
+    return regressions
+
+
+def compare_cold_start(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    regressions = []
+    for name, measured in results.items():
+        previous = baseline.get("coldStart", {}).get(name)
+        if not previous or not previous.get("minMs"):
+            continue
+        change = measured["minMs"] / previous["minMs"] - 1
+        if change > tolerance:
+            regressions.append(f"cold-start/{name}: {change:+.1%} ms")
+    return regressions
+
+
+def save(report: Dict, directory: str | Path) -> Path:
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = directory / f"bench-{report['backend']}-{report['profile']['records']}-{stamp}.json"
+    path.write_text(json.dumps(report, indent=2, default=str))
+    return path
+
+
+def print_report(report: Dict):
+    print(f"{report['profile']['records']} work orders, backend {report['backend']}\n")
+    print(f"{'cenário':<12}{'etapa':<10}{'registros/s':>14}{'segundos':>10}{'pico RSS MB':>13}")
+    for scenario, result in report["scenarios"].items():
+        for stage, measured in result["stages"].items():
+            rss = result["peakRssMb"]
+            print(
+                f"{scenario:<12}{stage:<10}{measured['recordsPerSecond'] or 0:>14,.0f}"
+                f"{measured['seconds']:>10.2f}{rss if rss is not None else float('nan'):>13.1f}"
+            )
+    
+    print(f"\n{'cenário':<12}{'métrica':<40}{'p50 ms':>10}{'p99 ms':>10}")
+    for scenario, result in report["scenarios"].items():
+        for name, latency in result["latency"].items():
+            print(f"{scenario:<12}{name:<40}{latency['p50Ms']:>10.3f}{latency['p99Ms']:>10.3f}")
+    
+    if report.get("coldStart"):
+        print(f"\n{'cold start':<16}{'mín ms':>10}{'p50 ms':>10}{'máx ms':>10}")
+        for name, measured in report["coldStart"].items():
+            print(f"{name:<16}{measured['minMs']:>10.1f}{measured['p50Ms']:>10.1f}{measured['maxMs']:>10.1f}")
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--scenario", choices=SCENARIOS + ("all",), default="all")
+    parser.add_argument("--backend", choices=BACKENDS, default="memory")
+    parser.add_argument("--database", default="tractian_bench", help="banco usado (e limpo) com --backend mongod")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="pesos por status, ex.: pending=30,completed=70")
+    parser.add_argument("--deleted-ratio", type=float, default=0.05)
+    parser.add_argument("--malformed-ratio", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--parallel", action="store_true", help="usa ParallelInboundService no inbound")
+    parser.add_argument("--in-process", action="store_true", help="não isola cenários em processos separados")
+    parser.add_argument("--log-level", default="ERROR", help="WARNING mostra cada arquivo malformado")
+    parser.add_argument("--output", default="./data/benchmarks")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--cold-start-runs", type=int, default=5, help="0 desativa a medição de cold start")
+    args = parser.parse_args(argv)
+    
+    profile = LoadProfile(
+        args.records, parse_mix(args.mix), args.deleted_ratio, args.malformed_ratio, seed=args.seed
+    )
+    report = {
+        "generatedAt": datetime.now(timezone.utc).isoformat(),
+        "build": build_info(),
+        "backend": args.backend,
+        "parallel": args.parallel,
+        "profile": {
+            "records": profile.records,
+            "mix": profile.mix,
+            "deletedRatio": profile.deleted_ratio,
+            "malformedRatio": profile.malformed_ratio,
+            "seed": profile.seed,
+        },
+        "scenarios": run(args, profile),
+        "coldStart": measure_cold_start(args.cold_start_runs, args.backend, args.database) if args.cold_start_runs else {},
+    }
+    
+    path = save(report, args.output)
+    print_report(report)
+    print(f"\nResultados gravados em {path}")
+    
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if baseline.get("profile") != report["profile"] or baseline.get("backend") != args.backend:
+            print("Aviso: baseline gerado com outro perfil de carga ou backend; a comparação não é equivalente")
+        regressions = compare(report["scenarios"], baseline, args.tolerance)
+        regressions += compare_cold_start(report["coldStart"], baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSÃO {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Micro-benchmark of the timestamp codec against the previous per-call parsing.
+
+    python -m benchmarks.bench_timestamps [--records 50000] [--distinct 500]
+"""
+import argparse
+import sys
+import os
+import timeit
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.translators import timestamps
+
+
+def legacy_parse(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def legacy_format(value: datetime) -> str:
+    return value.isoformat().replace('+00:00', 'Z')
+
+
+def sample_timestamps(count: int, distinct: int) -> list[str]:
+    # ERP batches share a small set of lastUpdateDate values
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        (base + timedelta(seconds=i % distinct)).isoformat().replace('+00:00', 'Z')
+        for i in range(count)
+    ]
+
+
+def run(records: int, distinct: int, repeat: int) -> dict:
+    values = sample_timestamps(records, distinct)
+    parsed = [legacy_parse(v) for v in values]
+    
+    def best(fn):
+        return records / min(timeit.repeat(fn, number=1, repeat=repeat))
+    
+    def cold_parse():
+        timestamps.parse_timestamp.cache_clear()
+        return [timestamps.parse_timestamp(v) for v in values]
+    
+    def cold_format():
+        timestamps._format_datetime.cache_clear()
+        return [timestamps.format_timestamp(d) for d in parsed]
+    
+    return {
+        "parse": {
+            "legacy": best(lambda: [legacy_parse(v) for v in values]),
+            "cached": best(cold_parse),
+        },
+        "format": {
+            "legacy": best(lambda: [legacy_format(d) for d in parsed]),
+            "cached": best(cold_format),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=50000)
+    parser.add_argument("--distinct", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    results = run(args.records, args.distinct, args.repeat)
+    
+    print(f"{args.records} timestamps, {args.distinct} distintos, melhor de {args.repeat}\n")
+    print(f"{'op':<10}{'impl':<12}{'registros/s':>14}{'vs legacy':>11}")
+    for op, impls in results.items():
+        for impl, rate in impls.items():
+            print(f"{op:<10}{impl:<12}{rate:>14,.0f}{rate / impls['legacy']:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
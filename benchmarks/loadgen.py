@@ -0,0 +1,169 @@
+"""Deterministic load generator for the pipeline benchmarks.
+
+    python -m benchmarks.loadgen --records 100000 --inbound-dir ./data/bench/inbound
+"""
+import argparse
+import random
+import sys
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.adapters import codec
+
+STATUSES = ("pending", "in_progress", "completed", "on_hold", "cancelled")
+DEFAULT_MIX = "pending=30,in_progress=30,completed=20,on_hold=10,cancelled=10"
+CLIENT_FLAGS = {"cancelled": "isCanceled", "completed": "isDone", "on_hold": "isOnHold", "pending": "isPending"}
+MALFORMED_KINDS = ("truncated", "missing_field", "empty_summary", "not_json")
+BASE_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    weights = {}
+    for part in spec.split(","):
+        status, _, weight = part.partition("=")
+        status = status.strip()
+        if status not in STATUSES:
+            raise ValueError(f"Status desconhecido no mix: {status} (use {', '.join(STATUSES)})")
+        weights[status] = float(weight)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError(f"Mix de status sem peso: {spec}")
+    return {status: weight / total for status, weight in weights.items()}
+
+
+@dataclass(frozen=True)
+class LoadProfile:
+    records: int
+    mix: Dict[str, float]
+    deleted_ratio: float = 0.05
+    malformed_ratio: float = 0.0
+    # Distinct lastUpdateDate values, as ERP exports share a handful of batch timestamps
+    distinct_timestamps: int = 500
+    seed: int = 42
+    
+    def rng(self, stream: str) -> random.Random:
+        return random.Random(f"{self.seed}:{stream}")
+
+
+def _statuses(profile: LoadProfile, rng: random.Random) -> Iterator[str]:
+    statuses, weights = zip(*profile.mix.items())
+    while True:
+        yield from rng.choices(statuses, weights, k=1024)
+
+
+def _summary(number: int, rng: random.Random) -> str:
+    asset = rng.choice(("motor", "bomba", "compressor", "esteira", "redutor"))
+    return f"Example workorder #{number} - troca de rolamento do {asset} {rng.randint(1, 97)}"
+
+
+def _dates(profile: LoadProfile, number: int) -> tuple:
+    created = BASE_DATE + timedelta(minutes=number)
+    updated = BASE_DATE + timedelta(days=30, seconds=number % profile.distinct_timestamps)
+    return created, updated
+
+
+def client_work_orders(profile: LoadProfile) -> Iterator[Dict]:
+    rng = profile.rng("client")
+    statuses = _statuses(profile, rng)
+    for number in range(1, profile.records + 1):
+        status = next(statuses)
+        created, updated = _dates(profile, number)
+        deleted = rng.random() < profile.deleted_ratio
+        order = {
+            "orderNo": number,
+            "isActive": not deleted,
+            "isDeleted": deleted,
+            "isSynced": False,
+            "summary": _summary(number, rng),
+            "creationDate": created.isoformat(),
+            "lastUpdateDate": updated.isoformat(),
+            "deletedDate": updated.isoformat() if deleted else None,
+        }
+        order.update({flag: status == flag_status for flag_status, flag in CLIENT_FLAGS.items()})
+        yield order
+
+
+def tracos_documents(profile: LoadProfile) -> Iterator[Dict]:
+    rng = profile.rng("tracos")
+    statuses = _statuses(profile, rng)
+    for number in range(1, profile.records + 1):
+        created, updated = _dates(profile, number)
+        deleted = rng.random() < profile.deleted_ratio
+        summary = _summary(number, rng)
+        yield {
+            "number": number,
+            "status": next(statuses),
+            "title": summary,
+            "description": summary,
+            "createdAt": created,
+            "updatedAt": updated,
+            "deleted": deleted,
+            "deletedAt": updated if deleted else None,
+            "isSynced": False,
+        }
+
+
+def malformed_payload(order: Dict, kind: str) -> bytes:
+    if kind == "truncated":
+        return codec.dumps(order)[:-7]
+    if kind == "missing_field":
+        return codec.dumps({key: value for key, value in order.items() if key != "creationDate"})
+    if kind == "empty_summary":
+        return codec.dumps({**order, "summary": ""})
+    return b"orderNo;summary\n1;csv por engano\n"
+
+
+def write_inbound_files(directory: str | Path, profile: LoadProfile) -> Dict[str, int]:
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = profile.rng("malformed")
+    written = {"valid": 0, "malformed": 0}
+    
+    for order in client_work_orders(profile):
+        if rng.random() < profile.malformed_ratio:
+            payload = malformed_payload(order, rng.choice(MALFORMED_KINDS))
+            written["malformed"] += 1
+        else:
+            payload = codec.dumps(order)
+            written["valid"] += 1
+        (directory / f"{order['orderNo']}.json").write_bytes(payload)
+    
+    return written
+
+
+def chunks(documents: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    while chunk := list(islice(documents, size)):
+        yield chunk
+
+
+def seed_collection(collection, profile: LoadProfile, chunk_size: int = 10000) -> int:
+    inserted = 0
+    for chunk in chunks(tracos_documents(profile), chunk_size):
+        collection.insert_many(chunk)
+        inserted += len(chunk)
+    return inserted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--deleted-ratio", type=float, default=0.05)
+    parser.add_argument("--malformed-ratio", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--inbound-dir", default="./data/bench/inbound")
+    args = parser.parse_args()
+    
+    profile = LoadProfile(args.records, parse_mix(args.mix), args.deleted_ratio, args.malformed_ratio, seed=args.seed)
+    written = write_inbound_files(args.inbound_dir, profile)
+    print(f"{written['valid']} arquivos válidos e {written['malformed']} malformados em {args.inbound_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""In-process stand-in for the MongoDB operations the pipeline uses.
+
+mongomock is not usable here: its bulk_write does not accept the operations of
+pymongo 4.x and it ignores pipeline updates, which the inbound upserts rely on.
+This store implements exactly the subset the services call, with a unique
+in-memory index on `number`, so benchmarks can run without a mongod.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List
+
+from bson import ObjectId
+
+
+# Anything outside this subset raises NotImplementedError: a silently wrong match would skew the numbers
+QUERY_OPERATORS = ("$in", "$gt", "$ne")
+
+
+def _evaluate(expression, document: Dict):
+    # Aggregation expressions used by conditional_update: $cond, $ne, $eq, $literal, "$field", "$$NOW"
+    if expression == "$$NOW":
+        return datetime.utcnow()
+    if isinstance(expression, str) and expression.startswith("$$"):
+        raise NotImplementedError(f"memory_store: variável {expression} não suportada")
+    if isinstance(expression, str) and expression.startswith("$"):
+        return document.get(expression[1:])
+    if isinstance(expression, dict) and len(expression) == 1:
+        operator, args = next(iter(expression.items()))
+        if operator == "$literal":
+            return args
+        if operator == "$cond":
+            condition, then, otherwise = args
+            return _evaluate(then if _evaluate(condition, document) else otherwise, document)
+        if operator == "$ne":
+            return _evaluate(args[0], document) != _evaluate(args[1], document)
+        if operator == "$eq":
+            return _evaluate(args[0], document) == _evaluate(args[1], document)
+        if operator.startswith("$"):
+            raise NotImplementedError(f"memory_store: expressão {operator} não suportada")
+    return expression
+
+
+def _matches_value(value, condition) -> bool:
+    if isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition):
+        for operator, operand in condition.items():
+            if operator not in QUERY_OPERATORS:
+                raise NotImplementedError(f"memory_store: operador {operator} não suportado")
+            if operator == "$in" and value not in operand:
+                return False
+            if operator == "$gt" and (value is None or not value > operand):
+                return False
+            if operator == "$ne" and value == operand:
+                return False
+        return True
+    return value == condition
+
+
+def _matches(document: Dict, query: Dict) -> bool:
+    for key in query:
+        if key.startswith("$"):
+            raise NotImplementedError(f"memory_store: operador {key} não suportado")
+    return all(_matches_value(document.get(key), condition) for key, condition in query.items())
+
+
+def _project(document: Dict, projection: Dict | None) -> Dict:
+    if not projection:
+        return dict(document)
+    included = [key for key, flag in projection.items() if flag and key != "_id"]
+    projected = {key: document[key] for key in included if key in document}
+    if projection.get("_id", 1) and "_id" in document:
+        projected["_id"] = document["_id"]
+    return projected
+
+
+class MemoryCursor:
+    
+    def __init__(self, documents: List[Dict]):
+        self._documents = documents
+    
+    def sort(self, key: str, direction: int = 1) -> "MemoryCursor":
+        self._documents.sort(key=lambda doc: (doc.get(key) is None, doc.get(key)), reverse=direction < 0)
+        return self
+    
+    def batch_size(self, size: int) -> "MemoryCursor":
+        return self
+    
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self._documents)
+
+
+@dataclass
+class UpdateResult:
+    matched_count: int = 0
+    modified_count: int = 0
+    upserted_id: ObjectId | None = None
+
+
+@dataclass
+class BulkWriteResult:
+    matched_count: int = 0
+    modified_count: int = 0
+    upserted_ids: Dict[int, ObjectId] = field(default_factory=dict)
+
+
+class MemoryCollection:
+    
+    def __init__(self, name: str):
+        self.name = name
+        self._documents: Dict = {}
+        self._by_number: Dict[int, object] = {}
+    
+    def with_options(self, **options) -> "MemoryCollection":
+        return self
+    
+    def create_indexes(self, indexes) -> List[str]:
+        return [index.document["name"] for index in indexes]
+    
+    def count_documents(self, query: Dict) -> int:
+        return sum(1 for _ in self._candidates(query))
+    
+    def drop(self):
+        self._documents.clear()
+        self._by_number.clear()
+    
+    def _candidates(self, query: Dict) -> Iterator[Dict]:
+        # Equality and $in on number use the unique index, like the real number_unique index
+        number = query.get("number")
+        if number is not None and (not isinstance(number, dict) or list(number) == ["$in"]):
+            numbers = number["$in"] if isinstance(number, dict) and "$in" in number else [number]
+            ids = (self._by_number.get(value) for value in numbers)
+            documents = (self._documents[_id] for _id in ids if _id is not None)
+        elif "_id" in query:
+            documents = [self._documents[query["_id"]]] if query["_id"] in self._documents else []
+        else:
+            documents = self._documents.values()
+        return (doc for doc in documents if _matches(doc, query))
+    
+    def find(self, query: Dict | None = None, projection: Dict | None = None, batch_size: int | None = None) -> MemoryCursor:
+        return MemoryCursor([_project(doc, projection) for doc in self._candidates(query or {})])
+    
+    def find_one(self, query: Dict | None = None, projection: Dict | None = None) -> Dict | None:
+        return next(iter(self.find(query, projection)), None)
+    
+    def insert_many(self, documents: Iterable[Dict]):
+        for document in documents:
+            self._insert(dict(document))
+    
+    def _insert(self, document: Dict):
+        document.setdefault("_id", ObjectId())
+        number = document.get("number")
+        if number is not None:
+            if number in self._by_number:
+                raise ValueError(f"E11000 duplicate key: number {number}")
+            self._by_number[number] = document["_id"]
+        self._documents[document["_id"]] = document
+        return document["_id"]
+    
+    def _apply(self, document: Dict, update) -> Dict:
+        if isinstance(update, list):
+            updated = dict(document)
+            for stage in update:
+                if list(stage) != ["$set"]:
+                    raise NotImplementedError(f"memory_store: estágio {', '.join(stage)} não suportado")
+                updated.update({key: _evaluate(value, document) for key, value in stage["$set"].items()})
+            return updated
+        if list(update) != ["$set"]:
+            raise NotImplementedError(f"memory_store: atualização {', '.join(update)} não suportada")
+        return {**document, **update["$set"]}
+    
+    def update_one(self, query: Dict, update, upsert: bool = False) -> UpdateResult:
+        document = next(self._candidates(query), None)
+        if document is None:
+            if not upsert:
+                return UpdateResult()
+            seed = {key: value for key, value in query.items() if not isinstance(value, dict)}
+            return UpdateResult(upserted_id=self._insert(self._apply(seed, update)))
+        
+        updated = self._apply(document, update)
+        if updated == document:
+            return UpdateResult(matched_count=1)
+        self._documents[document["_id"]] = updated
+        return UpdateResult(matched_count=1, modified_count=1)
+    
+    def update_many(self, query: Dict, update) -> UpdateResult:
+        result = UpdateResult()
+        for document in list(self._candidates(query)):
+            result.matched_count += 1
+            self._documents[document["_id"]] = self._apply(document, update)
+            result.modified_count += 1
+        return result
+    
+    def bulk_write(self, operations, ordered: bool = True) -> BulkWriteResult:
+        result = BulkWriteResult()
+        for index, operation in enumerate(operations):
+            outcome = self.update_one(operation._filter, operation._doc, upsert=operation._upsert)
+            result.matched_count += outcome.matched_count
+            result.modified_count += outcome.modified_count
+            if outcome.upserted_id is not None:
+                result.upserted_ids[index] = outcome.upserted_id
+        return result
+
+
+class MemoryDatabase:
+    
+    def __init__(self, name: str):
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+    
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(name)
+        return self._collections[name]
+    
+    get_collection = __getitem__
+
+
+class MemoryClient:
+    
+    def __init__(self):
+        self._databases: Dict[str, MemoryDatabase] = {}
+    
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        if name not in self._databases:
+            self._databases[name] = MemoryDatabase(name)
+        return self._databases[name]
+    
+    get_database = __getitem__
+    
+    def close(self):
+        pass
@@ -0,0 +1,180 @@
+import gzip
+import os
+import shutil
+import tarfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, List, Set
+from loguru import logger
+
+from src.adapters.inbound_manifest import SourceFile
+from src.env import load_env
+from src.metrics import metrics, timed
+
+load_env()
+
+
+class InboundArchive:
+    
+    MODES = ("none", "move", "gzip", "tar")
+    COMPRESSIONS = ("gz", "zst", "none")
+    
+    def __init__(
+        self,
+        archive_dir: str | Path,
+        mode: str | None = None,
+        compression: str | None = None,
+        retention_days: int | None = None,
+    ):
+        self.archive_dir = Path(archive_dir)
+        self.mode = (mode or os.getenv("INBOUND_ARCHIVE", "none")).lower()
+        self.compression = (compression or os.getenv("INBOUND_ARCHIVE_COMPRESSION", "gz")).lower()
+        self.retention_days = retention_days if retention_days is not None else int(os.getenv("INBOUND_ARCHIVE_RETENTION_DAYS", 0))
+        
+        if self.mode not in self.MODES:
+            raise ValueError(f"INBOUND_ARCHIVE inválido: {self.mode} (use {', '.join(self.MODES)})")
+        if self.compression not in self.COMPRESSIONS:
+            raise ValueError(f"INBOUND_ARCHIVE_COMPRESSION inválido: {self.compression} (use {', '.join(self.COMPRESSIONS)})")
+        
+        self._created: Set[Path] = set()
+        # tar mode: files stay in the inbound directory until the run's bundle is complete
+        self._bundle: List[SourceFile] = []
+    
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "none"
+    
+    def partition(self, now: datetime | None = None) -> Path:
+        now = now or datetime.now(timezone.utc)
+        directory = self.archive_dir / f"{now:%Y}" / f"{now:%m}" / f"{now:%d}"
+        if directory not in self._created:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._created.add(directory)
+        return directory
+    
+    def _destination(self, directory: Path, name: str) -> Path:
+        destination = directory / name
+        if destination.exists():
+            # The ERP re-exported a file already archived today: keep both
+            destination = directory / f"{Path(name).stem}.{time.time_ns()}{Path(name).suffix}"
+        return destination
+    
+    def _unchanged(self, source: SourceFile) -> bool:
+        # A file the ERP rewrote after it was read holds data not yet ingested: it stays for the next run
+        stat = os.stat(source.path)
+        return (stat.st_mtime_ns, stat.st_size) == (source.mtime_ns, source.size)
+    
+    def store(self, sources: Iterable[SourceFile]) -> int:
+        if not self.enabled:
+            return 0
+        
+        stored = 0
+        with timed("archive"):
+            for source in sources:
+                path = Path(source.path)
+                try:
+                    if self.mode == "tar":
+                        self._bundle.append(source)
+                        continue
+                    if not self._unchanged(source):
+                        continue
+                    if self.mode == "move":
+                        os.replace(path, self._destination(self.partition(), path.name))
+                    else:
+                        self._gzip(path)
+                    stored += 1
+                
+                except FileNotFoundError:
+                    # Several orders in a batch can come from one file, or it was archived by another run
+                    continue
+                except OSError as e:
+                    logger.error("Erro ao arquivar {}: {}", path.name, e)
+        
+        metrics.inc("archived_total", stored, mode=self.mode)
+        return stored
+    
+    def _gzip(self, path: Path):
+        destination = self._destination(self.partition(), f"{path.name}.gz")
+        with open(path, "rb") as source, gzip.open(destination, "wb") as target:
+            shutil.copyfileobj(source, target)
+        path.unlink()
+    
+    def _open_bundle(self, destination: Path, compression: str):
+        if compression == "zst":
+            import zstandard
+            
+            stream = zstandard.ZstdCompressor().stream_writer(open(destination, "wb"), closefd=True)
+            return tarfile.open(fileobj=stream, mode="w|"), stream
+        mode = "w:gz" if compression == "gz" else "w"
+        return tarfile.open(destination, mode), None
+    
+    def flush(self) -> Path | None:
+        # Writes the run's bundle, then removes the originals; a crash before that only re-ingests them
+        if not self._bundle:
+            return None
+        
+        compression = self.compression
+        if compression == "zst":
+            try:
+                import zstandard  # noqa: F401
+            except ImportError:
+                logger.warning("zstandard não instalado, usando gzip no pacote do arquivo")
+                compression = "gz"
+        
+        suffix = {"gz": ".tar.gz", "zst": ".tar.zst", "none": ".tar"}[compression]
+        stamp = datetime.now(timezone.utc).strftime("%H%M%S")
+        destination = self._destination(self.partition(), f"inbound-{stamp}-{os.getpid()}{suffix}")
+        sources, self._bundle = self._bundle, []
+        
+        with timed("archive"):
+            bundle, stream = self._open_bundle(destination, compression)
+            added = []
+            with bundle:
+                for source in {source.path: source for source in sources}.values():
+                    try:
+                        if self._unchanged(source):
+                            bundle.add(source.path, arcname=os.path.basename(source.path))
+                            added.append(Path(source.path))
+                    except FileNotFoundError:
+                        continue
+            if stream is not None:
+                stream.close()
+            
+            for path in added:
+                path.unlink(missing_ok=True)
+        
+        metrics.inc("archived_total", len(added), mode=self.mode)
+        logger.info("{} arquivos arquivados em {}", len(added), destination)
+        return destination
+    
+    def prune(self, now: datetime | None = None) -> int:
+        if not self.retention_days or not self.archive_dir.exists():
+            return 0
+        
+        cutoff = (now or datetime.now(timezone.utc)).date() - timedelta(days=self.retention_days)
+        removed = 0
+        # Only the YYYY/MM/DD directories are listed, never the archived files themselves
+        for day in self.archive_dir.glob("[0-9][0-9][0-9][0-9]/[0-9][0-9]/[0-9][0-9]"):
+            try:
+                partition_date = datetime.strptime("/".join(day.parts[-3:]), "%Y/%m/%d").date()
+            except ValueError:
+                continue
+            if partition_date < cutoff:
+                shutil.rmtree(day, ignore_errors=True)
+                self._created.discard(day)
+                removed += 1
+        
+        for empty in sorted(self.archive_dir.glob("*/*"), reverse=True) + sorted(self.archive_dir.glob("*"), reverse=True):
+            if empty.is_dir() and not any(empty.iterdir()):
+                empty.rmdir()
+                self._created.discard(empty)
+        
+        if removed:
+            logger.info("Retenção: {} partições diárias removidas do arquivo (> {} dias)", removed, self.retention_days)
+        return removed
+
+
+def open_archive(inbound_dir: Path) -> InboundArchive | None:
+    archive = InboundArchive(os.getenv("DATA_ARCHIVE_DIR") or inbound_dir / "archive")
+    return archive if archive.enabled else None
@@ -0,0 +1,44 @@
+import gzip
+import hashlib
+import io
+from pathlib import Path
+from typing import BinaryIO, Iterator, Tuple
+
+# Newline-delimited JSON, one work order per line, optionally compressed
+BUNDLE_SUFFIXES = (".ndjson", ".jsonl", ".ndjson.gz", ".jsonl.gz", ".ndjson.zst", ".jsonl.zst")
+READ_BUFFER_SIZE = 1024 * 1024
+
+
+class BundleError(Exception):
+    pass
+
+
+def is_bundle(name: str) -> bool:
+    return name.endswith(BUNDLE_SUFFIXES)
+
+
+def open_bundle(file_path: str | Path) -> BinaryIO:
+    file_path = str(file_path)
+    if file_path.endswith(".gz"):
+        return io.BufferedReader(gzip.open(file_path, "rb"), READ_BUFFER_SIZE)
+    if file_path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise BundleError("zstandard não instalado, bundles .zst não podem ser lidos") from None
+        raw = open(file_path, "rb")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True), READ_BUFFER_SIZE)
+    return open(file_path, "rb", buffering=READ_BUFFER_SIZE)
+
+
+def iter_lines(stream: BinaryIO) -> Iterator[Tuple[int, bytes]]:
+    # Streams the bundle: memory stays bounded by the longest line, not the file size
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if line:
+            yield number, line
+
+
+def file_digest(file_path: str | Path) -> str:
+    with open(file_path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
@@ -1,81 +1,387 @@
-import json
+import hashlib
+import mmap
 import os
 from pathlib import Path
-from typing import List, Dict
-from dotenv import load_dotenv
+from typing import Dict, Iterable, Iterator, List
+from loguru import logger
 
-load_dotenv()
+from src.adapters import codec
+from src.adapters.archive import InboundArchive, open_archive
+from src.adapters.bundles import BundleError, file_digest, is_bundle, iter_lines, open_bundle
+from src.adapters.inbound_manifest import InboundManifest, SourceFile
+from src.adapters.outbound_writer import OutboundWriter
+from src.adapters.quarantine import Quarantine, open_quarantine
+from src.env import load_env
+from src.metrics import metrics, timed
+from src.models.workorders import ClientWorkOrder, ValidationError
+
+load_env()
 
 class ClientAdapter:
-   
-    REQUIRED_FIELDS = ["orderNo", "summary", "creationDate", "lastUpdateDate"]
     
-    def __init__(self):
+    REQUIRED_FIELDS = list(ClientWorkOrder.REQUIRED_FIELDS)
+    
+    def __init__(self, manifest: InboundManifest | None = None):
         self.inbound_dir = Path(os.getenv("DATA_INBOUND_DIR", "./data/inbound"))
         self.outbound_dir = Path(os.getenv("DATA_OUTBOUND_DIR", "./data/outbound"))
+        self.manifest = manifest
+        # Rejected files leave the inbound directory, so later scans never see them again
+        self.quarantine: Quarantine | None = open_quarantine(self.inbound_dir)
+        # Ingested files leave too, once their orders are written
+        self.archive: InboundArchive | None = open_archive(self.inbound_dir)
+        self.writer = OutboundWriter(self.outbound_dir)
+        # orderNo -> files read in this run, recorded in the manifest only after a successful write
+        self._pending_sources: Dict[int, List[SourceFile]] = {}
+        # path -> staged orders not yet written (plus one while a bundle is still being read);
+        # a bundle is recorded and archived only once all of its orders are in
+        self._open_orders: Dict[str, int] = {}
+    
+    def parse_work_order(self, work_order: Dict) -> ClientWorkOrder | None:
+        try:
+            record = ClientWorkOrder.from_dict(work_order)
+        except ValidationError as e:
+            logger.warning("Campo obrigatório {}: {}", e.reason, e.field)
+            return None
+        
+        logger.debug("Validação OK para orderNo #{}", record.orderNo)
+        return record
     
     def validate_work_order(self, work_order: Dict) -> bool:
-        for field in self.REQUIRED_FIELDS:
-            if field not in work_order:
-                print(f" Campo obrigatório faltando: {field}")
-                return False
-            
-            if work_order[field] is None or work_order[field] == "":
-                print(f" Campo obrigatório vazio: {field}")
-                return False
+        return self.parse_work_order(work_order) is not None
+    
+    def list_inbound_files(self) -> Iterator[os.DirEntry]:
+        if not self.inbound_dir.exists():
+            logger.warning("Diretório não encontrado: {}", self.inbound_dir)
+            return
         
-        print(f" Validação OK para orderNo #{work_order.get('orderNo')}")
-        return True
+        with os.scandir(self.inbound_dir) as entries:
+            for entry in entries:
+                if (entry.name.endswith(".json") or is_bundle(entry.name)) and entry.is_file():
+                    yield entry
     
-    def read_inbound_files(self) -> List[Dict]:
-        work_orders = []
+    def iter_changed_files(self, full_resync: bool = False) -> Iterator[os.DirEntry]:
+        skipped = 0
         
-        if not self.inbound_dir.exists():
-            print(f" Diretório não encontrado: {self.inbound_dir}")
-            return work_orders
+        for entry in self.list_inbound_files():
+            if self.quarantine is not None and self.quarantine.is_backing_off(entry):
+                skipped += 1
+                continue
+            if self.manifest is not None and not full_resync:
+                stat = entry.stat()
+                if self.manifest.is_unchanged(entry.path, stat.st_mtime_ns, stat.st_size):
+                    skipped += 1
+                    continue
+            yield entry
         
-        json_files = list(self.inbound_dir.glob("*.json"))
-        print(f" Encontrados {len(json_files)} arquivos JSON")
+        if skipped:
+            logger.info("{} arquivos sem alteração desde a última execução", skipped)
+    
+    def _read_file(self, file_path: str | Path) -> bytes | mmap.mmap | None:
+        name = os.path.basename(file_path)
         
-        for file_path in json_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                if self.validate_work_order(data):
-                    work_orders.append(data)
-                    print(f" Lido e validado: {file_path.name}")
-                else:
-                    print(f" Arquivo ignorado (campos inválidos): {file_path.name}")
-            
-            except json.JSONDecodeError:
-                print(f" Arquivo corrompido (JSON inválido): {file_path.name}")
-            
-            except PermissionError:
-                print(f" Sem permissão para ler: {file_path.name}")
-            
-            except Exception as e:
-                print(f" Erro inesperado ao ler {file_path.name}: {e}")
+        try:
+            with timed("file_read"):
+                raw = codec.read_bytes(file_path)
+        
+        except PermissionError as e:
+            logger.error("Sem permissão para ler: {}", name)
+            self._retry_later(file_path, e)
+            return None
         
-        return work_orders
+        except FileNotFoundError:
+            # Moved or archived between the scan and the read
+            logger.debug("Arquivo removido antes da leitura: {}", name)
+            return None
+        
+        except Exception as e:
+            logger.error("Erro inesperado ao ler {}: {}", name, e)
+            self._retry_later(file_path, e)
+            return None
+        
+        if self.quarantine is not None:
+            self.quarantine.clear(file_path)
+        return raw
     
-    def write_outbound_file(self, work_order: Dict) -> bool:
+    def _retry_later(self, file_path: str | Path, error: Exception):
+        if self.quarantine is not None:
+            self.quarantine.record_failure(file_path, f"{type(error).__name__}: {error}")
+    
+    def _reject(self, file_path: str | Path, reason: str, field: str | None = None, detail: str | None = None):
+        if self.quarantine is not None:
+            self.quarantine.reject(file_path, reason, field, detail)
+    
+    @staticmethod
+    def _parse(raw: bytes | mmap.mmap) -> ClientWorkOrder:
+        with timed("json_decode"):
+            data = codec.loads(raw)
+        with timed("validate"):
+            if not isinstance(data, dict):
+                raise ValidationError("documento", f"esperado objeto JSON, recebido {type(data).__name__}")
+            return ClientWorkOrder.from_dict(data)
+    
+    def _decode_work_order(self, raw: bytes | mmap.mmap, file_path: str | Path) -> ClientWorkOrder | None:
+        name = os.path.basename(file_path)
+        
         try:
-            self.outbound_dir.mkdir(parents=True, exist_ok=True)
-            
-            filename = f"{work_order['orderNo']}.json"
-            file_path = self.outbound_dir / filename
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(work_order, f, indent=2)
-            
-            print(f" Escrito: {filename}")
-            return True
+            record = self._parse(raw)
         
-        except PermissionError:
-            print(f" Sem permissão para escrever: {filename}")
-            return False
+        except codec.DecodeError as e:
+            if self.quarantine is not None and not self.quarantine.is_settled(file_path):
+                # Most likely a file the ERP is still writing: back off instead of moving it away
+                logger.warning("JSON inválido em arquivo modificado há pouco, nova tentativa depois: {}", name)
+                self._retry_later(file_path, e)
+                return None
+            metrics.inc("records_total", stage="inbound_read", outcome="corrupted")
+            logger.warning("Arquivo corrompido (JSON inválido): {}", name)
+            self._reject(file_path, "corrupted", detail=str(e))
+            return None
+        
+        except ValidationError as e:
+            metrics.inc("records_total", stage="inbound_read", outcome="invalid")
+            logger.warning("Campo obrigatório {}: {}", e.reason, e.field)
+            logger.warning("Arquivo ignorado (campos inválidos): {}", name)
+            self._reject(file_path, "invalid", field=e.field, detail=e.reason)
+            return None
+        
+        metrics.inc("records_total", stage="inbound_read", outcome="valid")
+        logger.debug("Lido e validado: {}", name)
+        return record
+    
+    def _decode_line(self, line: bytes, line_no: int, name: str, rejects: List[Dict]) -> ClientWorkOrder | None:
+        try:
+            record = self._parse(line)
+        
+        except codec.DecodeError as e:
+            metrics.inc("records_total", stage="inbound_read", outcome="corrupted")
+            logger.warning("Linha {} corrompida (JSON inválido) em {}", line_no, name)
+            rejects.append({"line": line_no, "reason": "corrupted", "detail": str(e), "raw": line.decode("utf-8", "replace")})
+            return None
+        
+        except ValidationError as e:
+            metrics.inc("records_total", stage="inbound_read", outcome="invalid")
+            logger.warning("Linha {} ignorada em {}: campo obrigatório {}: {}", line_no, name, e.reason, e.field)
+            rejects.append({
+                "line": line_no, "reason": "invalid", "field": e.field, "detail": e.reason,
+                "raw": line.decode("utf-8", "replace"),
+            })
+            return None
+        
+        metrics.inc("records_total", stage="inbound_read", outcome="valid")
+        return record
+    
+    def iter_bundle(self, file_path: str | Path) -> Iterator[ClientWorkOrder]:
+        # One bad line is set aside; the rest of the bundle is still ingested
+        name = os.path.basename(file_path)
+        rejects = []
+        valid = 0
+        
+        try:
+            stream = open_bundle(file_path)
+        except FileNotFoundError:
+            logger.debug("Arquivo removido antes da leitura: {}", name)
+            return
+        except (BundleError, OSError) as e:
+            logger.error("Não foi possível abrir o pacote {}: {}", name, e)
+            self._retry_later(file_path, e)
+            return
+        
+        try:
+            with stream:
+                for line_no, line in iter_lines(stream):
+                    record = self._decode_line(line, line_no, name, rejects)
+                    if record is not None:
+                        valid += 1
+                        yield record
         
         except Exception as e:
-            print(f" Erro ao escrever: {e}")
+            # Truncated gzip/zstd stream, e.g. the ERP is still writing it: the lines read so far
+            # were ingested, the whole bundle is read again once its backoff expires
+            logger.error("Pacote interrompido em {}: {}", name, e)
+            self._retry_later(file_path, e)
+            self._reject_lines(file_path, rejects)
+            raise BundleError(f"{name}: {e}") from e
+        
+        if self.quarantine is not None:
+            self.quarantine.clear(file_path)
+        self._reject_lines(file_path, rejects)
+        if rejects and not valid:
+            self._reject(file_path, "invalid", detail=f"{len(rejects)} linhas rejeitadas, nenhuma válida")
+        logger.debug("{} work orders válidas e {} linhas rejeitadas em {}", valid, len(rejects), name)
+    
+    def _reject_lines(self, file_path: str | Path, rejects: List[Dict]):
+        if self.quarantine is not None and rejects:
+            self.quarantine.reject_lines(file_path, rejects)
+    
+    def load_bundle(self, entry: os.DirEntry, full_resync: bool = False) -> Iterator[ClientWorkOrder]:
+        stat = entry.stat()
+        digest = ""
+        if self.manifest is not None:
+            try:
+                digest = file_digest(entry.path)
+            except FileNotFoundError:
+                return
+            except OSError as e:
+                logger.error("Erro inesperado ao ler {}: {}", entry.name, e)
+                self._retry_later(entry.path, e)
+                return
+            if not full_resync and self.manifest.has_digest(entry.path, digest):
+                self.manifest.refresh(entry.path, stat.st_mtime_ns, stat.st_size)
+                logger.debug("Conteúdo sem alteração: {}", entry.name)
+                return
+        
+        if not self.tracks_sources:
+            try:
+                yield from self.iter_bundle(entry.path)
+            except BundleError:
+                # The lines read so far are kept; iter_bundle already scheduled the retry
+                pass
+            return
+        
+        bundle = SourceFile(entry.path, stat.st_mtime_ns, stat.st_size, digest, None, None)
+        self._open_orders[entry.path] = self._open_orders.get(entry.path, 0) + 1
+        try:
+            for record in self.iter_bundle(entry.path):
+                self.stage_source(bundle._replace(order_no=record.orderNo, last_update=record.lastUpdateDate))
+                yield record
+        except BundleError:
+            # Incomplete read: the bundle stays open, so it is neither recorded nor archived
+            return
+        self._settle([bundle])
+    
+    def has_unchanged_content(self, entry: os.DirEntry, full_resync: bool = False) -> bool:
+        # The digest check load_inbound_file/load_bundle make, for callers that hand the read to another process;
+        # only files already in the manifest are hashed
+        if self.manifest is None or full_resync or not self.manifest.is_known(entry.path):
+            return False
+        try:
+            stat = entry.stat()
+            digest = file_digest(entry.path)
+        except OSError:
+            # The reader reports it
+            return False
+        if not self.manifest.has_digest(entry.path, digest):
             return False
+        self.manifest.refresh(entry.path, stat.st_mtime_ns, stat.st_size)
+        logger.debug("Conteúdo sem alteração: {}", entry.name)
+        return True
+    
+    def load_records(self, entry: os.DirEntry, full_resync: bool = False) -> List[ClientWorkOrder]:
+        if is_bundle(entry.name):
+            return list(self.load_bundle(entry, full_resync))
+        record = self.load_inbound_file(entry, full_resync)
+        return [] if record is None else [record]
+    
+    def read_work_order(self, file_path: str | Path) -> ClientWorkOrder | None:
+        raw = self._read_file(file_path)
+        if raw is None:
+            return None
+        return self._decode_work_order(raw, file_path)
+    
+    def load_inbound_file(self, entry: os.DirEntry, full_resync: bool = False) -> ClientWorkOrder | None:
+        if self.manifest is None:
+            if self.archive is None:
+                return self.read_work_order(entry.path)
+            
+            # Archiving needs the stat seen at read time; the digest is only for the manifest
+            stat = entry.stat()
+            record = self.read_work_order(entry.path)
+            if record is not None:
+                self.stage_source(SourceFile(
+                    entry.path, stat.st_mtime_ns, stat.st_size, "", record.orderNo, record.lastUpdateDate
+                ))
+            return record
+        
+        stat = entry.stat()
+        raw = self._read_file(entry.path)
+        if raw is None:
+            return None
+        
+        digest = hashlib.sha256(raw).hexdigest()
+        if not full_resync and self.manifest.has_digest(entry.path, digest):
+            self.manifest.refresh(entry.path, stat.st_mtime_ns, stat.st_size)
+            logger.debug("Conteúdo sem alteração: {}", entry.name)
+            return None
+        
+        record = self._decode_work_order(raw, entry.path)
+        if record is not None:
+            self.stage_source(SourceFile(
+                entry.path, stat.st_mtime_ns, stat.st_size, digest, record.orderNo, record.lastUpdateDate
+            ))
+        return record
+    
+    def iter_inbound_files(self, full_resync: bool = False) -> Iterator[ClientWorkOrder]:
+        total = 0
+        bundles = 0
+        valid = 0
+        
+        for entry in self.iter_changed_files(full_resync):
+            total += 1
+            if is_bundle(entry.name):
+                bundles += 1
+                for record in self.load_bundle(entry, full_resync):
+                    valid += 1
+                    yield record
+                continue
+            record = self.load_inbound_file(entry, full_resync)
+            if record is not None:
+                valid += 1
+                yield record
+        
+        logger.info("{} work orders válidas lidas de {} arquivos ({} pacotes NDJSON)", valid, total, bundles)
+    
+    def stage_source(self, source: SourceFile):
+        self._pending_sources.setdefault(source.order_no, []).append(source)
+        self._open_orders[source.path] = self._open_orders.get(source.path, 0) + 1
+    
+    def commit_sources(self, order_numbers: Iterable[int]):
+        self._settle([source for number in order_numbers for source in self._pending_sources.pop(number, [])])
+    
+    def _settle(self, sources: List[SourceFile]):
+        # Only files with every staged order written are complete
+        complete = {}
+        for source in sources:
+            remaining = self._open_orders.get(source.path, 1) - 1
+            if remaining > 0:
+                self._open_orders[source.path] = remaining
+            else:
+                self._open_orders.pop(source.path, None)
+                complete[source.path] = source
+        
+        if self.manifest is not None and complete:
+            self.manifest.record(complete.values())
+        if self.archive is not None and complete:
+            self.archive.store(complete.values())
+    
+    def discard_sources(self):
+        self._pending_sources.clear()
+        self._open_orders.clear()
+    
+    @property
+    def tracks_sources(self) -> bool:
+        return self.manifest is not None or self.archive is not None
+    
+    def finish_run(self):
+        # Files of failed orders were discarded above and stay in the inbound directory for the next run
+        if self.archive is not None:
+            self.archive.flush()
+            self.archive.prune()
+    
+    def iter_inbound_batches(self, batch_size: int, full_resync: bool = False) -> Iterator[List[ClientWorkOrder]]:
+        batch = []
+        for record in self.iter_inbound_files(full_resync):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def close(self):
+        if self.quarantine is not None:
+            self.quarantine.close()
+    
+    def read_inbound_files(self) -> List[Dict]:
+        return [record.to_dict() for record in self.iter_inbound_files()]
+    
+    def write_outbound_file(self, work_order: Dict) -> bool:
+        return self.writer.write(work_order)
@@ -0,0 +1,105 @@
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Any
+from loguru import logger
+
+from src.env import load_env
+
+load_env()
+
+# Files at least this large are mapped instead of read into a new bytes object
+MMAP_THRESHOLD = int(os.getenv("JSON_MMAP_THRESHOLD", 1024 * 1024))
+
+
+class DecodeError(ValueError):
+    pass
+
+
+def _stdlib_codec():
+    def loads(data):
+        if not isinstance(data, (bytes, bytearray, str)):
+            data = bytes(data)
+        return json.loads(data)
+    
+    def dumps(obj, indent):
+        if indent:
+            return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    
+    return "json", loads, dumps, (ValueError,)
+
+
+def _orjson_codec():
+    import orjson
+    
+    def loads(data):
+        if isinstance(data, mmap.mmap):
+            with memoryview(data) as view:
+                return orjson.loads(view)
+        return orjson.loads(data)
+    
+    def dumps(obj, indent):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    
+    return "orjson", loads, dumps, (orjson.JSONDecodeError, UnicodeDecodeError)
+
+
+def _msgspec_codec():
+    import msgspec
+    
+    decoder = msgspec.json.Decoder()
+    encoder = msgspec.json.Encoder()
+    
+    def loads(data):
+        return decoder.decode(data)
+    
+    def dumps(obj, indent):
+        data = encoder.encode(obj)
+        return msgspec.json.format(data, indent=2) if indent else data
+    
+    return "msgspec", loads, dumps, (msgspec.DecodeError, UnicodeDecodeError)
+
+
+_BACKENDS = {"orjson": _orjson_codec, "msgspec": _msgspec_codec, "json": _stdlib_codec}
+
+
+def _select_backend(preference: str):
+    names = [preference] if preference != "auto" else ["orjson", "msgspec", "json"]
+    for name in names:
+        if name not in _BACKENDS:
+            logger.warning("JSON_CODEC inválido: {} (use auto, {}); usando json", name, ', '.join(_BACKENDS))
+            continue
+        try:
+            return _BACKENDS[name]()
+        except ImportError:
+            continue
+    return _stdlib_codec()
+
+
+BACKEND, _loads, _dumps, _decode_errors = _select_backend(os.getenv("JSON_CODEC", "auto").lower())
+
+
+def loads(data: bytes | bytearray | memoryview | mmap.mmap | str) -> Any:
+    try:
+        return _loads(data)
+    except _decode_errors as e:
+        raise DecodeError(str(e)) from e
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    return _dumps(obj, indent)
+
+
+def read_bytes(file_path: str | Path) -> bytes | mmap.mmap:
+    # Raw bytes go straight to the decoder, no text-decoding copy in between
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size and size >= MMAP_THRESHOLD:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return f.read()
+
+
+def load_file(file_path: str | Path) -> Any:
+    return loads(read_bytes(file_path))
@@ -0,0 +1,83 @@
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+
+class SourceFile(NamedTuple):
+    path: str
+    mtime_ns: int
+    size: int
+    sha256: str
+    order_no: int
+    last_update: str
+
+
+class InboundManifest:
+    
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Lookups may come from asyncio.to_thread workers
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                order_no INTEGER,
+                last_update TEXT,
+                recorded_at TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+    
+    def is_unchanged(self, path: str, mtime_ns: int, size: int) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM files WHERE path = ? AND mtime_ns = ? AND size = ?",
+                (path, mtime_ns, size),
+            ).fetchone()
+        return row is not None
+    
+    def is_known(self, path: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM files WHERE path = ?", (path,)).fetchone()
+        return row is not None
+    
+    def has_digest(self, path: str, sha256: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM files WHERE path = ? AND sha256 = ?",
+                (path, sha256),
+            ).fetchone()
+        return row is not None
+    
+    def refresh(self, path: str, mtime_ns: int, size: int):
+        # Same content with a new mtime (e.g. the ERP re-exported it): remember the new stat
+        with self._lock:
+            self._conn.execute(
+                "UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?",
+                (mtime_ns, size, path),
+            )
+            self._conn.commit()
+    
+    def record(self, sources: Iterable[SourceFile]):
+        recorded_at = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files (path, mtime_ns, size, sha256, order_no, last_update, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(*source, recorded_at) for source in sources],
+            )
+            self._conn.commit()
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,160 @@
+import hashlib
+import os
+import threading
+from datetime import datetime, timezone
+from itertools import count
+from pathlib import Path
+from typing import Dict, List
+from loguru import logger
+
+from src.adapters import codec
+from src.env import load_env
+from src.metrics import timed
+
+load_env()
+
+
+class OutboundWriter:
+    
+    FSYNC_MODES = ("none", "file", "batch")
+    FORMATS = ("json", "ndjson")
+    
+    def __init__(
+        self,
+        outbound_dir: str | Path,
+        compact: bool | None = None,
+        fsync: str | None = None,
+        output_format: str | None = None,
+    ):
+        self.outbound_dir = Path(outbound_dir)
+        # Indented by default: the ERP-facing files keep their original layout unless an operator opts in
+        self.compact = compact if compact is not None else os.getenv("OUTBOUND_COMPACT", "false").lower() == "true"
+        self.fsync = fsync or os.getenv("OUTBOUND_FSYNC", "none").lower()
+        self.output_format = output_format or os.getenv("OUTBOUND_FORMAT", "json").lower()
+        
+        if self.fsync not in self.FSYNC_MODES:
+            raise ValueError(f"OUTBOUND_FSYNC inválido: {self.fsync} (use {', '.join(self.FSYNC_MODES)})")
+        if self.output_format not in self.FORMATS:
+            raise ValueError(f"OUTBOUND_FORMAT inválido: {self.output_format} (use {', '.join(self.FORMATS)})")
+        
+        self._lock = threading.Lock()
+        self._pending_orders: List[Dict] = []
+        self._unsynced_paths: List[Path] = []
+        self._bundle_sequence = count(1)
+    
+    @property
+    def bundle(self) -> bool:
+        return self.output_format == "ndjson"
+    
+    def serialize(self, work_order: Dict) -> bytes:
+        return codec.dumps(work_order, indent=not self.compact)
+    
+    def _atomic_write(self, file_path: Path, data: bytes):
+        # Readers only ever see the complete file: write to a hidden temp file, then rename over
+        tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with timed("file_write"):
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                    if self.fsync == "file":
+                        f.flush()
+                        os.fsync(f.fileno())
+                os.replace(tmp_path, file_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        
+        if self.fsync == "file":
+            self._sync_directory()
+        elif self.fsync == "batch":
+            with self._lock:
+                self._unsynced_paths.append(file_path)
+    
+    def _sync_directory(self):
+        fd = os.open(self.outbound_dir, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    def write(self, work_order: Dict) -> bool:
+        if self.bundle:
+            with self._lock:
+                self._pending_orders.append(work_order)
+            return True
+        
+        filename = f"{work_order['orderNo']}.json"
+        
+        try:
+            self.outbound_dir.mkdir(parents=True, exist_ok=True)
+            self._atomic_write(self.outbound_dir / filename, self.serialize(work_order))
+            logger.debug("Escrito: {}", filename)
+            return True
+        
+        except PermissionError:
+            logger.error("Sem permissão para escrever: {}", filename)
+            return False
+        
+        except OSError as e:
+            logger.error("Erro de I/O ao escrever {}: {}", filename, e)
+            return False
+        
+        except Exception as e:
+            logger.error("Erro inesperado ao escrever {}: {}", filename, e)
+            return False
+    
+    def write_bundle(self, work_orders: List[Dict]) -> Path | None:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        name = f"bundle-{stamp}-{os.getpid()}-{next(self._bundle_sequence)}"
+        bundle_path = self.outbound_dir / f"{name}.ndjson"
+        
+        try:
+            self.outbound_dir.mkdir(parents=True, exist_ok=True)
+            data = b"".join(codec.dumps(wo) + b"\n" for wo in work_orders)
+            self._atomic_write(bundle_path, data)
+            
+            # The manifest goes last: its presence tells the ERP the bundle is complete
+            manifest = {
+                "bundle": bundle_path.name,
+                "count": len(work_orders),
+                "orderNos": [wo["orderNo"] for wo in work_orders],
+                "sha256": hashlib.sha256(data).hexdigest(),
+                "createdAt": stamp,
+            }
+            self._atomic_write(self.outbound_dir / f"{name}.manifest.json", self.serialize(manifest))
+            
+            logger.info("Escrito bundle: {} ({} work orders)", bundle_path.name, len(work_orders))
+            return bundle_path
+        
+        except OSError as e:
+            logger.error("Erro de I/O ao escrever bundle {}: {}", bundle_path.name, e)
+            return None
+    
+    def flush(self) -> bool:
+        # Called before acknowledging a batch: everything reported as written must be on disk
+        with self._lock:
+            orders, self._pending_orders = self._pending_orders, []
+        
+        if orders and self.write_bundle(orders) is None:
+            return False
+        
+        with self._lock:
+            paths, self._unsynced_paths = self._unsynced_paths, []
+        
+        if not paths:
+            return True
+        
+        try:
+            with timed("file_fsync"):
+                for path in paths:
+                    fd = os.open(path, os.O_RDONLY)
+                    try:
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+                self._sync_directory()
+            return True
+        
+        except OSError as e:
+            logger.error("Erro ao sincronizar arquivos com o disco: {}", e)
+            return False
@@ -0,0 +1,201 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+from loguru import logger
+
+from src.adapters import codec
+from src.env import load_env
+from src.metrics import metrics
+
+load_env()
+
+SIDECAR_SUFFIX = ".error.json"
+REJECTED_LINES_SUFFIX = ".rejected.ndjson"
+
+
+class Quarantine:
+    
+    DEFAULT_RETRY_DELAY = 60.0
+    DEFAULT_RETRY_MAX_DELAY = 3600.0
+    DEFAULT_MAX_FAILURES = 5
+    DEFAULT_MIN_AGE = 30.0
+    
+    def __init__(
+        self,
+        rejected_dir: str | Path,
+        retry_delay: float | None = None,
+        retry_max_delay: float | None = None,
+        max_failures: int | None = None,
+        min_age: float | None = None,
+    ):
+        self.rejected_dir = Path(rejected_dir)
+        self.state_path = self.rejected_dir / "retry_state.sqlite3"
+        self.retry_delay = retry_delay or float(os.getenv("QUARANTINE_RETRY_DELAY", self.DEFAULT_RETRY_DELAY))
+        self.retry_max_delay = retry_max_delay or float(os.getenv("QUARANTINE_RETRY_MAX_DELAY", self.DEFAULT_RETRY_MAX_DELAY))
+        self.max_failures = max_failures or int(os.getenv("QUARANTINE_MAX_FAILURES", self.DEFAULT_MAX_FAILURES))
+        # A file modified more recently than this may still be being written by the ERP
+        self.min_age = min_age if min_age is not None else float(os.getenv("QUARANTINE_MIN_AGE", self.DEFAULT_MIN_AGE))
+        
+        # Transient failures (unreadable files) stay in place; their retry state survives restarts
+        self._lock = threading.Lock()
+        self._conn = None
+        # path -> (next_attempt, mtime_ns, size), so the scan checks backoff without touching the disk
+        self._retries: Dict[str, Tuple[float, int, int]] = {}
+        if self.state_path.exists():
+            self._retries = {
+                path: (next_attempt, mtime_ns, size)
+                for path, next_attempt, mtime_ns, size in self._connection().execute(
+                    "SELECT path, next_attempt, mtime_ns, size FROM retries"
+                )
+            }
+    
+    def _connection(self) -> sqlite3.Connection:
+        # Opened on first use, so a run without rejects creates nothing
+        if self._conn is None:
+            self.rejected_dir.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.state_path, timeout=30, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS retries (
+                    path TEXT PRIMARY KEY,
+                    failures INTEGER NOT NULL,
+                    next_attempt REAL NOT NULL,
+                    mtime_ns INTEGER,
+                    size INTEGER,
+                    reason TEXT
+                )
+                """
+            )
+            self._conn.commit()
+        return self._conn
+    
+    def is_backing_off(self, entry: os.DirEntry) -> bool:
+        state = self._retries.get(entry.path)
+        if state is None:
+            return False
+        next_attempt, mtime_ns, size = state
+        stat = entry.stat()
+        # A file rewritten by the ERP is retried right away
+        return time.time() < next_attempt and (stat.st_mtime_ns, stat.st_size) == (mtime_ns, size)
+    
+    def is_settled(self, file_path: str | Path) -> bool:
+        try:
+            return time.time() - os.stat(file_path).st_mtime >= self.min_age
+        except OSError:
+            return True
+    
+    def retry_due(self) -> bool:
+        # Lets a watcher revisit files whose backoff expired even though nothing changed on disk
+        now = time.time()
+        for path, (next_attempt, _, _) in list(self._retries.items()):
+            if next_attempt <= now:
+                if os.path.exists(path):
+                    return True
+                # Deleted or moved away by the ERP: nothing left to retry
+                self.clear(path)
+        return False
+    
+    def record_failure(self, file_path: str | Path, reason: str):
+        path = str(file_path)
+        try:
+            stat = os.stat(path)
+            mtime_ns, size = stat.st_mtime_ns, stat.st_size
+        except OSError:
+            mtime_ns, size = None, None
+        
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT failures FROM retries WHERE path = ?", (path,)).fetchone()
+            failures = (row[0] if row else 0) + 1
+            delay = min(self.retry_max_delay, self.retry_delay * 2 ** (failures - 1))
+            next_attempt = time.time() + delay
+            conn.execute(
+                "INSERT OR REPLACE INTO retries (path, failures, next_attempt, mtime_ns, size, reason) VALUES (?, ?, ?, ?, ?, ?)",
+                (path, failures, next_attempt, mtime_ns, size, reason),
+            )
+            conn.commit()
+            self._retries[path] = (next_attempt, mtime_ns, size)
+        
+        if failures >= self.max_failures:
+            self.reject(path, "unreadable", detail=reason, failures=failures)
+        else:
+            logger.warning("Nova tentativa de {} em {:.0f}s (falha {}/{})", os.path.basename(path), delay, failures, self.max_failures)
+    
+    def clear(self, file_path: str | Path):
+        path = str(file_path)
+        if path not in self._retries:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM retries WHERE path = ?", (path,))
+            conn.commit()
+            self._retries.pop(path, None)
+    
+    def reject(self, file_path: str | Path, reason: str, field: str | None = None, detail: str | None = None, failures: int = 1) -> Path | None:
+        source = Path(file_path)
+        destination = self.rejected_dir / source.name
+        report = {
+            "file": source.name,
+            "source": str(source),
+            "reason": reason,
+            "field": field,
+            "detail": detail,
+            "failures": failures,
+            "rejectedAt": datetime.now(timezone.utc).isoformat(),
+        }
+        
+        try:
+            self.rejected_dir.mkdir(parents=True, exist_ok=True)
+            # Same filesystem as the inbound directory, so this is a rename; a newer reject of the same name wins
+            os.replace(source, destination)
+            (self.rejected_dir / f"{source.name}{SIDECAR_SUFFIX}").write_bytes(codec.dumps(report, indent=True))
+        except OSError as e:
+            logger.error("Não foi possível mover {} para a quarentena: {}", source.name, e)
+            return None
+        
+        self.clear(source)
+        metrics.inc("quarantined_total", reason=reason)
+        logger.warning("Arquivo em quarentena ({}): {} -> {}", reason, source.name, destination)
+        return destination
+    
+    def reject_lines(self, file_path: str | Path, rejects: List[Dict]) -> Path | None:
+        # Bad lines of a bundle are copied out; the bundle itself stays, its valid lines were ingested
+        source = Path(file_path)
+        destination = self.rejected_dir / f"{source.name}{REJECTED_LINES_SUFFIX}"
+        report = {
+            "file": source.name,
+            "source": str(source),
+            "reason": "partial",
+            "lines": [reject["line"] for reject in rejects],
+            "rejectedAt": datetime.now(timezone.utc).isoformat(),
+        }
+        
+        try:
+            self.rejected_dir.mkdir(parents=True, exist_ok=True)
+            destination.write_bytes(b"".join(codec.dumps(reject) + b"\n" for reject in rejects))
+            (self.rejected_dir / f"{source.name}{SIDECAR_SUFFIX}").write_bytes(codec.dumps(report, indent=True))
+        except OSError as e:
+            logger.error("Não foi possível gravar as linhas rejeitadas de {}: {}", source.name, e)
+            return None
+        
+        metrics.inc("quarantined_total", len(rejects), reason="line")
+        logger.warning("{} linhas de {} em quarentena -> {}", len(rejects), source.name, destination)
+        return destination
+    
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def open_quarantine(inbound_dir: Path, enabled: bool | None = None) -> Quarantine | None:
+    if enabled is None:
+        enabled = os.getenv("INBOUND_QUARANTINE", "true").lower() == "true"
+    if not enabled:
+        return None
+    return Quarantine(os.getenv("DATA_REJECTED_DIR") or inbound_dir / "rejected")
@@ -0,0 +1,216 @@
+"""TracOS <-> Client integration.
+
+    python -m src inbound [--parallel | --async] [--full-resync]
+    python -m src outbound [--watermark | --lease | --tail] [--async]
+    python -m src run [--parallel | --async | --daemon] [--watermark | --lease] [--full-resync]
+    python -m src indexes
+    python -m src bench [bench_pipeline options]
+
+Only the modules a command needs are imported. MongoDB is contacted only once
+there is work: after the inbound scan finds files, or when one indexed
+find_one shows unsynced orders.
+"""
+import argparse
+import os
+from typing import List
+
+PIPELINE_MODES = ("sync", "parallel", "async")
+OUTBOUND_MODES = ("scan", "watermark", "lease")
+LEGACY_RUN_FLAGS = ("--parallel", "--async", "--full-resync", "--watermark", "--lease")
+
+
+def pipeline_mode(args) -> str:
+    if args.parallel:
+        return "parallel"
+    if args.use_async:
+        return "async"
+    mode = os.getenv("PIPELINE_MODE", "sync")
+    return mode if mode in PIPELINE_MODES else "sync"
+
+
+def outbound_mode(args) -> str:
+    if args.watermark:
+        return "watermark"
+    if args.lease:
+        return "lease"
+    mode = os.getenv("OUTBOUND_MODE", "scan")
+    return mode if mode in OUTBOUND_MODES else "scan"
+
+
+def run_inbound(args) -> int:
+    mode = pipeline_mode(args)
+    
+    if mode == "async":
+        import asyncio
+        from src.service.async_inbound_service import AsyncInboundService
+        
+        async def process():
+            service = AsyncInboundService()
+            try:
+                return await service.process(args.full_resync)
+            finally:
+                service.close()
+        
+        totals = asyncio.run(process())
+    else:
+        if mode == "parallel":
+            from src.service.parallel_inbound_service import ParallelInboundService as Service
+        else:
+            from src.service.inbound_service import InboundService as Service
+        
+        service = Service()
+        try:
+            totals = service.process(args.full_resync)
+        finally:
+            service.close()
+    
+    return 1 if totals["failed"] else 0
+
+
+def run_outbound(args) -> int:
+    if args.tail:
+        from src.main import run_tail
+        
+        run_tail()
+        return 0
+    
+    if args.use_async:
+        import asyncio
+        from src.service.async_outbound_service import AsyncOutboundService
+        
+        async def process():
+            service = AsyncOutboundService()
+            try:
+                return await service.process()
+            finally:
+                service.close()
+        
+        results = asyncio.run(process())
+    else:
+        from src.service.outbound_service import OutboundService
+        
+        service = OutboundService()
+        try:
+            mode = outbound_mode(args)
+            if mode == "lease":
+                results = service.process_claimed()
+            elif mode == "watermark":
+                results = service.process_incremental()
+            else:
+                results = service.process()
+        finally:
+            service.close()
+    
+    return 1 if results["falha"] else 0
+
+
+def run_all(args) -> int:
+    if args.daemon:
+        from src.daemon import IntegrationDaemon
+        
+        IntegrationDaemon().run()
+        return 0
+    
+    mode = pipeline_mode(args)
+    if mode == "async":
+        import asyncio
+        from src.main import run_pipeline_async
+        
+        return 0 if asyncio.run(run_pipeline_async(args.full_resync)) else 1
+    
+    from src.main import run_pipeline
+    
+    outbound = outbound_mode(args)
+    ok = run_pipeline(
+        parallel=mode == "parallel",
+        full_resync=args.full_resync,
+        incremental_outbound=outbound == "watermark",
+        leased_outbound=outbound == "lease",
+    )
+    return 0 if ok else 1
+
+
+def run_indexes(args) -> int:
+    from src.database.indexes import check_indexes
+    
+    check_indexes()
+    return 0
+
+
+COMMANDS = {"inbound": run_inbound, "outbound": run_outbound, "run": run_all, "indexes": run_indexes}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log-level", help="padrão: LOG_LEVEL ou INFO")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="comando")
+    
+    inbound = commands.add_parser("inbound", help="arquivos do cliente > TracOS")
+    _add_pipeline_options(inbound)
+    
+    outbound = commands.add_parser("outbound", help="TracOS > arquivos do cliente")
+    _add_outbound_options(outbound)
+    outbound.add_argument("--tail", action="store_true", help="acompanha o change stream (replica set)")
+    outbound.add_argument("--async", dest="use_async", action="store_true")
+    
+    run = commands.add_parser("run", help="inbound e depois outbound")
+    _add_pipeline_options(run)
+    _add_outbound_options(run)
+    run.add_argument("--daemon", action="store_true", help="mantém o pipeline rodando")
+    
+    commands.add_parser("indexes", help="cria os índices e verifica as consultas principais")
+    commands.add_parser("bench", help="benchmark do pipeline (opções de benchmarks.bench_pipeline)", add_help=False)
+    return parser
+
+
+def _add_pipeline_options(parser: argparse.ArgumentParser):
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument("--parallel", action="store_true", help="pool de processos (ou PIPELINE_MODE=parallel)")
+    modes.add_argument("--async", dest="use_async", action="store_true", help="motor (ou PIPELINE_MODE=async)")
+    parser.add_argument("--full-resync", action="store_true", help="ignora o manifesto incremental")
+
+
+def _add_outbound_options(parser: argparse.ArgumentParser):
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument("--watermark", action="store_true", help="ou OUTBOUND_MODE=watermark")
+    modes.add_argument("--lease", action="store_true", help="ou OUTBOUND_MODE=lease")
+
+
+def from_legacy_flags(argv: List[str]) -> List[str]:
+    # `python src/main.py --daemon|--tail|--parallel|...` as it worked before the subcommands
+    if "-h" in argv or "--help" in argv:
+        return ["--help"]
+    if "--daemon" in argv:
+        return ["run", "--daemon"]
+    if "--tail" in argv:
+        return ["outbound", "--tail"]
+    flags = [flag for flag in argv if flag in LEGACY_RUN_FLAGS]
+    if "--async" in flags and "--parallel" in flags:
+        # main.py gave --async precedence
+        flags.remove("--parallel")
+    return ["run", *flags]
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.command != "bench":
+        parser.error(f"argumentos não reconhecidos: {' '.join(extra)}")
+    
+    from src.env import load_env
+    
+    load_env()
+    
+    if args.command == "bench":
+        from benchmarks.bench_pipeline import main as bench
+        
+        return bench(extra)
+    
+    from src.log_config import configure_logging
+    from src.metrics import serve_from_env
+    
+    configure_logging(level=args.log_level)
+    # The daemon starts its own metrics endpoint
+    if args.command != "indexes" and not getattr(args, "daemon", False):
+        serve_from_env()
+    return COMMANDS[args.command](args)
@@ -0,0 +1,134 @@
+import os
+import signal
+import threading
+import time
+from typing import Dict, Tuple
+from loguru import logger
+
+from src.env import load_env
+from src.service.inbound_service import InboundService
+from src.log_config import configure_logging
+from src.metrics import export_from_env, serve_from_env
+from src.service.outbound_service import OutboundService
+
+load_env()
+
+
+class InboundDirectoryWatcher:
+    
+    def __init__(self, directory: str, rescan_interval: float):
+        self.directory = directory
+        self.rescan_interval = rescan_interval
+        self._dir_mtime_ns = None
+        # Last index whose files were all processed; _scanned becomes it only after a successful cycle
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._scanned: Dict[str, Tuple[int, int]] = {}
+        self._last_scan = 0.0
+    
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        index = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    index[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return index
+    
+    def has_changes(self) -> bool:
+        try:
+            dir_mtime_ns = os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        
+        # New, removed or renamed files bump the directory mtime; in-place rewrites
+        # only show up in the periodic full rescan of the (path -> mtime, size) index
+        rescan_due = time.monotonic() - self._last_scan >= self.rescan_interval
+        if dir_mtime_ns == self._dir_mtime_ns and not rescan_due:
+            return False
+        
+        self._dir_mtime_ns = dir_mtime_ns
+        self._last_scan = time.monotonic()
+        self._scanned = self._scan()
+        return self._scanned != self._index
+    
+    def commit(self):
+        # Until called, the files of the last scan keep showing up as changed on every rescan
+        self._index = self._scanned
+
+
+class IntegrationDaemon:
+    
+    DEFAULT_POLL_INTERVAL = 2.0
+    DEFAULT_RESCAN_INTERVAL = 60.0
+    DEFAULT_OUTBOUND_INTERVAL = 60.0
+    
+    def __init__(
+        self,
+        poll_interval: float | None = None,
+        outbound_interval: float | None = None,
+        rescan_interval: float | None = None,
+    ):
+        self.poll_interval = poll_interval or float(os.getenv("DAEMON_POLL_INTERVAL", self.DEFAULT_POLL_INTERVAL))
+        self.outbound_interval = outbound_interval or float(os.getenv("DAEMON_OUTBOUND_INTERVAL", self.DEFAULT_OUTBOUND_INTERVAL))
+        rescan_interval = rescan_interval or float(os.getenv("DAEMON_RESCAN_INTERVAL", self.DEFAULT_RESCAN_INTERVAL))
+        
+        # Long-lived services keep the Mongo connection pool warm between cycles;
+        # the manifest makes each cycle read only new or changed files
+        self.inbound = InboundService(incremental=True)
+        self.outbound = OutboundService()
+        # Several daemons can share one database when outbound claims batches with leases
+        self.leased_outbound = os.getenv("OUTBOUND_MODE") == "lease"
+        self.watcher = InboundDirectoryWatcher(str(self.inbound.client_adapter.inbound_dir), rescan_interval)
+        self._stop = threading.Event()
+    
+    def stop(self, *_):
+        logger.warning("Sinal recebido, encerrando após o ciclo atual...")
+        self._stop.set()
+    
+    def run_cycle(self, last_outbound: float) -> float:
+        wrote = False
+        quarantine = self.inbound.client_adapter.quarantine
+        
+        if self.watcher.has_changes() or (quarantine is not None and quarantine.retry_due()):
+            totals = self.inbound.process()
+            wrote = totals["inserted"] + totals["updated"] > 0
+            # After a failure (or an exception above) the files stay pending and the next rescan runs inbound again
+            if not totals["failed"]:
+                self.watcher.commit()
+        
+        if wrote or time.monotonic() - last_outbound >= self.outbound_interval:
+            if self.leased_outbound:
+                self.outbound.process_claimed()
+            else:
+                self.outbound.process()
+            return time.monotonic()
+        return last_outbound
+    
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        serve_from_env()
+        
+        logger.info(
+            "Daemon iniciado: verificando {} a cada {}s, outbound a cada {}s",
+            self.watcher.directory, self.poll_interval, self.outbound_interval
+        )
+        
+        last_outbound = float("-inf")
+        try:
+            while not self._stop.is_set():
+                try:
+                    last_outbound = self.run_cycle(last_outbound)
+                except Exception as e:
+                    logger.error("Erro no ciclo do daemon: {}", e)
+                self._stop.wait(self.poll_interval)
+        finally:
+            self.inbound.close()
+            self.outbound.close()
+            export_from_env("daemon")
+            logger.info("Daemon encerrado")
+
+
+if __name__ == "__main__":
+    configure_logging()
+    IntegrationDaemon().run()
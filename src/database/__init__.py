@@ -1,4 +1,19 @@
 # src/database/__init__.py
 from .connection import DatabaseConnection, get_db, get_workorders_collection
+from .checkpoints import CheckpointStore
 
-__all__ = ["DatabaseConnection", "get_db", "get_workorders_collection"]
\ No newline at end of file
+# motor is only loaded when the async pipeline asks for these
+ASYNC_EXPORTS = ("AsyncDatabaseConnection", "get_async_db", "get_async_workorders_collection")
+
+__all__ = [
+    "DatabaseConnection", "get_db", "get_workorders_collection",
+    "CheckpointStore",
+    *ASYNC_EXPORTS,
+]
+
+
+def __getattr__(name):
+    if name in ASYNC_EXPORTS:
+        from . import async_connection
+        return getattr(async_connection, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,106 @@
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from loguru import logger
+import asyncio
+import os
+
+from .indexes import ensure_indexes
+from .options import backoff_delays, client_options
+from src.env import load_env
+
+load_env()
+
+
+class AsyncDatabaseConnection:
+    
+    _instance = None
+    _client = None
+    _db = None
+    _refs = 0
+    
+    MAX_RETRIES = 5
+    RETRY_DELAY = 1
+    RETRY_MAX_DELAY = 16
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+    
+    async def connect(self):
+        if self._client is not None:
+            return
+        
+        mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+        mongo_database = os.getenv("MONGO_DATABASE", "tractian")
+        retries = int(os.getenv("MONGO_CONNECT_RETRIES", self.MAX_RETRIES))
+        delays = backoff_delays(
+            retries,
+            float(os.getenv("MONGO_RETRY_DELAY", self.RETRY_DELAY)),
+            float(os.getenv("MONGO_RETRY_MAX_DELAY", self.RETRY_MAX_DELAY)),
+        )
+        
+        for attempt in range(1, retries + 1):
+            try:
+                logger.info("Tentativa {}/{} - Conectando ao MongoDB (async)...", attempt, retries)
+                
+                client = AsyncIOMotorClient(mongo_uri, **client_options())
+                await client.admin.command('ping')
+                AsyncDatabaseConnection._client = client
+                AsyncDatabaseConnection._db = client[mongo_database]
+                
+                logger.info("Conectado ao MongoDB!")
+                
+                if os.getenv("MONGO_ENSURE_INDEXES", "true").lower() == "true":
+                    await self._ensure_indexes()
+                return
+            
+            except (ConnectionFailure, ServerSelectionTimeoutError) as e:
+                logger.warning("Tentativa {}/{} falhou: {}", attempt, retries, e)
+                
+                delay = next(delays, None)
+                if delay is not None:
+                    logger.warning("Aguardando {:.1f}s antes de tentar novamente...", delay)
+                    await asyncio.sleep(delay)
+                else:
+                    logger.error("Todas as tentativas falharam. MongoDB indisponível.")
+    
+    async def _ensure_indexes(self):
+        # Same definitions and per-index error handling as the sync client, through motor's pymongo delegate
+        await asyncio.to_thread(ensure_indexes, self._db["workorders"].delegate)
+    
+    def get_collection(self, collection_name: str) -> AsyncIOMotorCollection | None:
+        if self._db is None:
+            logger.warning("Sem conexão com MongoDB")
+            return None
+        return self._db[collection_name]
+    
+    def is_connected(self) -> bool:
+        return self._client is not None and self._db is not None
+    
+    def acquire(self) -> "AsyncDatabaseConnection":
+        AsyncDatabaseConnection._refs += 1
+        return self
+    
+    def close(self):
+        # Single event loop, no lock needed; the client closes with the last handle
+        AsyncDatabaseConnection._refs = max(0, AsyncDatabaseConnection._refs - 1)
+        if AsyncDatabaseConnection._refs:
+            return
+        
+        if self._client:
+            self._client.close()
+            AsyncDatabaseConnection._client = None
+            AsyncDatabaseConnection._db = None
+            logger.info("Conexão MongoDB fechada")
+
+
+async def get_async_db() -> AsyncDatabaseConnection:
+    db = AsyncDatabaseConnection()
+    await db.connect()
+    return db.acquire()
+
+async def get_async_workorders_collection() -> AsyncIOMotorCollection | None:
+    db = AsyncDatabaseConnection()
+    await db.connect()
+    return db.get_collection("workorders")
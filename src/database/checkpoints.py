@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import Any
+from pymongo.collection import Collection
+from loguru import logger
+
+CHECKPOINTS_COLLECTION = "sync_checkpoints"
+
+
+class CheckpointStore:
+    
+    def __init__(self, collection: Collection | None):
+        self.collection = collection
+    
+    def load(self, name: str) -> Any | None:
+        if self.collection is None:
+            return None
+        
+        try:
+            document = self.collection.find_one({"_id": name})
+            return document["value"] if document else None
+        
+        except Exception as e:
+            logger.error("Erro ao ler checkpoint '{}': {}", name, e)
+            return None
+    
+    def save(self, name: str, value: Any) -> bool:
+        if self.collection is None:
+            return False
+        
+        try:
+            self.collection.update_one(
+                {"_id": name},
+                {"$set": {"value": value, "savedAt": datetime.utcnow()}},
+                upsert=True
+            )
+            return True
+        
+        except Exception as e:
+            logger.error("Erro ao salvar checkpoint '{}': {}", name, e)
+            return False
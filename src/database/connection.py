@@ -1,11 +1,16 @@
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 from pymongo.collection import Collection
-from dotenv import load_dotenv
+from loguru import logger
+import threading
 import time
 import os
 
-load_dotenv()
+from .indexes import ensure_indexes
+from .options import backoff_delays, client_options
+from src.env import load_env
+
+load_env()
 
 
 class DatabaseConnection:
@@ -13,9 +18,13 @@ class DatabaseConnection:
     _instance = None
     _client = None
     _db = None
+    # Open handles from get_db(); the client is only closed when the last one is released
+    _refs = 0
+    _lock = threading.RLock()
     
-    MAX_RETRIES = 3  
-    RETRY_DELAY = 2  
+    MAX_RETRIES = 5
+    RETRY_DELAY = 1
+    RETRY_MAX_DELAY = 16
     
     def __new__(cls):
         if cls._instance is None:
@@ -23,38 +32,56 @@ class DatabaseConnection:
         return cls._instance
     
     def __init__(self):
-        if self._client is None:
+        if DatabaseConnection._client is None:
             self._connect_with_retry()
     
     def _connect_with_retry(self):
-        mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017")
-        mongo_database = os.getenv("MONGO_DATABASE", "tractian")
-        
-        for attempt in range(1, self.MAX_RETRIES + 1):
-            try:
-                print(f" Tentativa {attempt}/{self.MAX_RETRIES} - Conectando ao MongoDB...")
-                
-                self._client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
-                self._client.admin.command('ping')
-                self._db = self._client[mongo_database]
-                
-                print(" Conectado ao MongoDB!")
+        with self._lock:
+            if DatabaseConnection._client is not None:
                 return
+            
+            mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+            mongo_database = os.getenv("MONGO_DATABASE", "tractian")
+            retries = int(os.getenv("MONGO_CONNECT_RETRIES", self.MAX_RETRIES))
+            delays = backoff_delays(
+                retries,
+                float(os.getenv("MONGO_RETRY_DELAY", self.RETRY_DELAY)),
+                float(os.getenv("MONGO_RETRY_MAX_DELAY", self.RETRY_MAX_DELAY)),
+            )
+            
+            for attempt in range(1, retries + 1):
+                try:
+                    logger.info("Tentativa {}/{} - Conectando ao MongoDB...", attempt, retries)
+                    
+                    client = MongoClient(mongo_uri, **client_options())
+                    client.admin.command('ping')
+                    DatabaseConnection._client = client
+                    DatabaseConnection._db = client[mongo_database]
+                    
+                    logger.info("Conectado ao MongoDB!")
+                    
+                    if os.getenv("MONGO_ENSURE_INDEXES", "true").lower() == "true":
+                        ensure_indexes(self._db["workorders"])
+                    return
                 
-            except (ConnectionFailure, ServerSelectionTimeoutError) as e:
-                print(f" Tentativa {attempt}/{self.MAX_RETRIES} falhou: {e}")
-                
-                if attempt < self.MAX_RETRIES:
-                    print(f" Aguardando {self.RETRY_DELAY}s antes de tentar novamente...")
-                    time.sleep(self.RETRY_DELAY)
-                else:
-                    print(" Todas as tentativas falharam. MongoDB indisponível.")
-                    self._client = None
-                    self._db = None
+                except (ConnectionFailure, ServerSelectionTimeoutError) as e:
+                    logger.warning("Tentativa {}/{} falhou: {}", attempt, retries, e)
+                    
+                    delay = next(delays, None)
+                    if delay is not None:
+                        logger.warning("Aguardando {:.1f}s antes de tentar novamente...", delay)
+                        time.sleep(delay)
+                    else:
+                        logger.error("Todas as tentativas falharam. MongoDB indisponível.")
+    
+    def acquire(self) -> "DatabaseConnection":
+        with self._lock:
+            DatabaseConnection._refs += 1
+        return self
     
     def get_collection(self, collection_name: str) -> Collection | None:
         if self._db is None:
-            print(" Sem conexão com MongoDB")
+            logger.warning("Sem conexão com MongoDB")
             return None
         return self._db[collection_name]
     
@@ -62,17 +89,22 @@ class DatabaseConnection:
         return self._client is not None and self._db is not None
     
     def close(self):
-        if self._client:
-            self._client.close()
-            DatabaseConnection._client = None
-            DatabaseConnection._db = None
-            print(" Conexão MongoDB fechada")
+        with self._lock:
+            DatabaseConnection._refs = max(0, DatabaseConnection._refs - 1)
+            if DatabaseConnection._refs:
+                return
+            
+            if self._client:
+                self._client.close()
+                DatabaseConnection._client = None
+                DatabaseConnection._db = None
+                logger.info("Conexão MongoDB fechada")
 
 
-def get_db() -> DatabaseConnection: 
-    return DatabaseConnection()
+def get_db() -> DatabaseConnection:
+    return DatabaseConnection().acquire()
 
 def get_workorders_collection() -> Collection | None:
-    db = get_db()
+    db = DatabaseConnection()
     return db.get_collection("workorders")
-  
+
@@ -0,0 +1,107 @@
+from datetime import datetime
+from typing import Dict, List, Set
+from pymongo import ASCENDING, IndexModel
+from pymongo.collection import Collection
+from pymongo.errors import OperationFailure
+from loguru import logger
+
+WORKORDER_INDEXES = [
+    IndexModel([("number", ASCENDING)], name="number_unique", unique=True),
+    IndexModel(
+        [("isSynced", ASCENDING), ("updatedAt", ASCENDING)],
+        name="unsynced_partial",
+        partialFilterExpression={"isSynced": False},
+    ),
+    # Watermark cursor of the incremental outbound
+    IndexModel([("modifiedAt", ASCENDING), ("number", ASCENDING)], name="modifiedAt_number"),
+    # Lease claiming: free or expired unsynced orders, then the orders of one claim
+    IndexModel(
+        [("isSynced", ASCENDING), ("leaseExpiresAt", ASCENDING)],
+        name="unsynced_lease",
+        partialFilterExpression={"isSynced": False},
+    ),
+    IndexModel([("leaseId", ASCENDING)], name="leaseId", sparse=True),
+]
+
+# Filters used by the inbound upserts and the outbound queries
+HOT_QUERIES = {
+    "upsert por number": {"number": 0},
+    "mark_many_as_synced": {"number": {"$in": [0]}},
+    "work orders não sincronizadas": {"isSynced": False},
+    "incremental por modifiedAt": {"modifiedAt": {"$gt": datetime(1970, 1, 1)}},
+    "claim de lease": {"isSynced": False, "leaseExpiresAt": {"$lte": datetime(1970, 1, 1)}},
+    "work orders de um lease": {"leaseId": ""},
+}
+
+
+def ensure_indexes(collection: Collection) -> List[str]:
+    created = []
+    
+    # One index at a time so a failure (e.g. duplicated numbers) does not block the others
+    for index in WORKORDER_INDEXES:
+        name = index.document["name"]
+        try:
+            collection.create_indexes([index])
+            created.append(name)
+        except OperationFailure as e:
+            logger.warning("Não foi possível criar o índice {}: {}", name, e)
+    
+    logger.info("Índices garantidos: {}", ', '.join(created) or 'nenhum')
+    return created
+
+
+def plan_stages(plan) -> Set[str]:
+    stages = set()
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.add(plan["stage"])
+        for value in plan.values():
+            stages |= plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            stages |= plan_stages(item)
+    return stages
+
+
+def find_collection_scans(collection: Collection, queries: Dict[str, Dict] = HOT_QUERIES) -> List[str]:
+    scans = []
+    
+    for name, query in queries.items():
+        try:
+            explain = collection.find(query).explain()
+        except OperationFailure as e:
+            logger.warning("Não foi possível executar explain para '{}': {}", name, e)
+            continue
+        
+        winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        if "COLLSCAN" in plan_stages(winning_plan):
+            logger.warning("Consulta '{}' ainda faz collection scan: {}", name, query)
+            scans.append(name)
+    
+    if not scans:
+        logger.info("Todas as consultas principais usam índices")
+    return scans
+
+
+def check_indexes() -> List[str]:
+    from src.database.connection import get_db, get_workorders_collection
+    
+    logger.info("Criando e verificando índices da coleção workorders")
+    
+    db = get_db()
+    collection = get_workorders_collection()
+    scans = []
+    
+    if collection is not None:
+        ensure_indexes(collection)
+        scans = find_collection_scans(collection)
+    
+    db.close()
+    return scans
+
+
+if __name__ == "__main__":
+    from src.log_config import configure_logging
+    
+    configure_logging()
+    check_indexes()
@@ -0,0 +1,70 @@
+import os
+import random
+from typing import Dict, Iterator
+from loguru import logger
+from pymongo import ReadPreference
+
+from src.env import load_env
+from src.metrics import mongo_listeners
+
+load_env()
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+
+def _int_env(name: str) -> int | None:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+def client_options() -> Dict:
+    # Shared by the sync and async clients so both pools are tuned the same way
+    options = {
+        "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000)),
+        "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", 100)),
+        "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", 0)),
+        # Counts and times every driver round trip for the metrics endpoint
+        "event_listeners": mongo_listeners(),
+    }
+    
+    max_idle = _int_env("MONGO_MAX_IDLE_TIME_MS")
+    if max_idle is not None:
+        options["maxIdleTimeMS"] = max_idle
+    
+    # e.g. "zstd,snappy,zlib"; pymongo warns and skips codecs whose package is missing
+    compressors = os.getenv("MONGO_COMPRESSORS")
+    if compressors:
+        options["compressors"] = compressors
+    
+    write_concern = os.getenv("MONGO_WRITE_CONCERN")
+    if write_concern:
+        options["w"] = int(write_concern) if write_concern.isdigit() else write_concern
+    
+    journal = os.getenv("MONGO_JOURNAL")
+    if journal:
+        options["journal"] = journal.lower() == "true"
+    
+    return options
+
+
+def outbound_read_preference():
+    name = os.getenv("MONGO_OUTBOUND_READ_PREFERENCE")
+    if not name:
+        return None
+    if name not in READ_PREFERENCES:
+        logger.warning("Read preference desconhecida: {}, usando primary", name)
+        return None
+    return READ_PREFERENCES[name]
+
+
+def backoff_delays(retries: int, base: float, cap: float) -> Iterator[float]:
+    # Exponential with jitter, so workers restarting together do not reconnect in lockstep
+    for attempt in range(retries - 1):
+        delay = min(cap, base * 2 ** attempt)
+        yield random.uniform(delay / 2, delay)
@@ -0,0 +1,21 @@
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_loaded = False
+
+
+def load_env():
+    # Every module calls this at import time; only the first call looks for a .env file,
+    # and python-dotenv is only imported when one exists
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+    
+    for candidate in (ROOT / ".env", Path.cwd() / ".env"):
+        if candidate.is_file():
+            from dotenv import load_dotenv
+            
+            load_dotenv(candidate)
+            return
@@ -0,0 +1,40 @@
+import os
+import sys
+from loguru import logger
+
+from src.env import load_env
+
+load_env()
+
+TEXT_FORMAT = "<green>{time:HH:mm:ss.SSS}</green> <level>{level: <7}</level> <cyan>{name}</cyan> {message}"
+
+
+def configure_logging(level: str | None = None, json_output: bool | None = None, enqueue: bool | None = None):
+    # Per-record messages are DEBUG and use lazy "{}" arguments, so at INFO they cost one level check
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    json_output = json_output if json_output is not None else os.getenv("LOG_JSON", "false").lower() == "true"
+    # enqueue moves formatting and stream I/O to a background thread
+    enqueue = enqueue if enqueue is not None else os.getenv("LOG_ENQUEUE", "true").lower() == "true"
+    
+    logger.remove()
+    logger.add(
+        sys.stderr,
+        level=level,
+        format="{message}" if json_output else TEXT_FORMAT,
+        serialize=json_output,
+        enqueue=enqueue,
+        backtrace=False,
+        diagnose=False,
+    )
+    
+    log_file = os.getenv("LOG_FILE")
+    if log_file:
+        logger.add(
+            log_file,
+            level=level,
+            serialize=json_output,
+            enqueue=enqueue,
+            rotation=os.getenv("LOG_ROTATION", "100 MB"),
+        )
+    
+    return logger
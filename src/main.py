@@ -1,41 +1,133 @@
+import os
 import sys
-sys.path.insert(0, '.')
 
-from service.inbound_service import InboundService
-from service.outbound_service import OutboundService
+from loguru import logger
 
 
-def run_pipeline():
+def run_pipeline(
+    parallel: bool = False,
+    full_resync: bool = False,
+    incremental_outbound: bool = False,
+    leased_outbound: bool = False,
+) -> bool:
+    from src.metrics import export_from_env
     
-    print("\n" + "="*60)
-    print(" TRACTIAN - Sistema de Integração")
-    print("="*60)
+    logger.info("TRACTIAN - Sistema de Integração")
     
-    print("\n" + "="*60)
-    print(" ETAPA 1: INBOUND (Cliente > TracOS)")
-    print("="*60 + "\n")
+    try:
+        ok = _run_stages(parallel, full_resync, incremental_outbound, leased_outbound)
+    finally:
+        export_from_env("pipeline")
     
+    logger.info("PIPELINE COMPLETO!")
+    return ok
+
+
+def _run_stages(parallel: bool, full_resync: bool, incremental_outbound: bool, leased_outbound: bool) -> bool:
+    from src.service.inbound_service import InboundService
+    from src.service.outbound_service import OutboundService
+    
+    # Both services stay open until the end, so outbound reuses the pool inbound opened (if it had work)
+    services = []
+    ok = True
     try:
-        inbound = InboundService()
-        inbound.process()
-        inbound.close()
-    except Exception as e:
-        print(f" Erro no fluxo INBOUND: {e}")
+        logger.info("ETAPA 1: INBOUND (Cliente > TracOS)")
+        
+        try:
+            if parallel:
+                from src.service.parallel_inbound_service import ParallelInboundService
+                
+                inbound = ParallelInboundService()
+            else:
+                inbound = InboundService()
+            services.append(inbound)
+            ok = not inbound.process(full_resync)["failed"]
+        except Exception as e:
+            logger.error("Erro no fluxo INBOUND: {}", e)
+            ok = False
+        
+        logger.info("ETAPA 2: OUTBOUND (TracOS > Cliente)")
+        
+        try:
+            outbound = OutboundService()
+            services.append(outbound)
+            if leased_outbound:
+                results = outbound.process_claimed()
+            elif incremental_outbound:
+                results = outbound.process_incremental()
+            else:
+                results = outbound.process()
+            ok = ok and not results["falha"]
+        except Exception as e:
+            logger.error("Erro no fluxo OUTBOUND: {}", e)
+            ok = False
+    finally:
+        for service in services:
+            service.close()
+    return ok
+
+
+async def run_pipeline_async(full_resync: bool = False) -> bool:
+    from src.metrics import export_from_env
     
-    print("\n" + "="*60)
-    print(" ETAPA 2: OUTBOUND (TracOS > Cliente)")
-    print("="*60 + "\n")
+    logger.info("TRACTIAN - Sistema de Integração (async)")
     
     try:
-        outbound = OutboundService()
-        outbound.process()
-        outbound.close()
-    except Exception as e:
-        print(f" Erro no fluxo OUTBOUND: {e}")
+        ok = await _run_stages_async(full_resync)
+    finally:
+        export_from_env("pipeline_async")
+    
+    logger.info("PIPELINE COMPLETO!")
+    return ok
+
+
+async def _run_stages_async(full_resync: bool) -> bool:
+    from src.service.async_inbound_service import AsyncInboundService
+    from src.service.async_outbound_service import AsyncOutboundService
     
-    print("\n" + "="*60)
-    print(" PIPELINE COMPLETO!")
-    print("="*60)
+    services = []
+    ok = True
+    try:
+        logger.info("ETAPA 1: INBOUND (Cliente > TracOS)")
+        
+        try:
+            inbound = AsyncInboundService()
+            services.append(inbound)
+            ok = not (await inbound.process(full_resync))["failed"]
+        except Exception as e:
+            logger.error("Erro no fluxo INBOUND: {}", e)
+            ok = False
+        
+        logger.info("ETAPA 2: OUTBOUND (TracOS > Cliente)")
+        
+        try:
+            outbound = AsyncOutboundService()
+            services.append(outbound)
+            ok = ok and not (await outbound.process())["falha"]
+        except Exception as e:
+            logger.error("Erro no fluxo OUTBOUND: {}", e)
+            ok = False
+    finally:
+        for service in services:
+            service.close()
+    return ok
+
+
+def run_tail():
+    from src.service.outbound_service import OutboundService
+    
+    outbound = OutboundService()
+    try:
+        outbound.tail()
+    except KeyboardInterrupt:
+        logger.info("Encerrando change stream")
+    finally:
+        outbound.close()
+
 
 if __name__ == "__main__":
-    run_pipeline()
+    # Legacy `python src/main.py [--flags]`, which only has src/ on sys.path; use `python -m src <command>`
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from src.cli import from_legacy_flags, main
+    
+    sys.exit(main(from_legacy_flags(sys.argv[1:])))
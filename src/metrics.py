@@ -0,0 +1,306 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Tuple
+from loguru import logger
+from pymongo import monitoring
+
+from src.env import load_env
+
+load_env()
+
+PREFIX = "tractian"
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Dict | None = None) -> str:
+    pairs = list(labels) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+
+class Histogram:
+    
+    __slots__ = ("buckets", "counts", "count", "sum")
+    
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+    
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+    
+    def quantile(self, q: float) -> float | None:
+        # Upper bound of the bucket holding the q-th observation
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class _Timer:
+    
+    __slots__ = ("registry", "stage", "started")
+    
+    def __init__(self, registry: "MetricsRegistry", stage: str):
+        self.registry = registry
+        self.stage = stage
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe("stage_seconds", time.perf_counter() - self.started, stage=self.stage)
+        if exc_type is not None:
+            self.registry.inc("stage_errors_total", stage=self.stage)
+        return False
+
+
+class _NoopTimer:
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopTimer()
+
+
+class _Span:
+    
+    def __init__(self, registry: "MetricsRegistry", name: str, attributes: Dict):
+        self.registry = registry
+        self.name = name
+        self.attributes = attributes
+        self._otel = None
+    
+    def __enter__(self):
+        tracer = self.registry.tracer
+        if tracer is not None:
+            self._otel = tracer.start_as_current_span(self.name, attributes=self.attributes)
+            self._otel.__enter__()
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe("batch_seconds", time.perf_counter() - self.started, span=self.name)
+        if self._otel is not None:
+            self._otel.__exit__(exc_type, exc, tb)
+        return False
+
+
+class MetricsRegistry:
+    
+    def __init__(self, enabled: bool | None = None, keep_samples: bool = False):
+        self.enabled = enabled if enabled is not None else os.getenv("METRICS_ENABLED", "true").lower() == "true"
+        # Raw observations for exact percentiles (benchmarks); the buckets are too coarse for per-record stages
+        self.keep_samples = keep_samples
+        self.tracer = self._load_tracer()
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def _load_tracer(self):
+        if os.getenv("METRICS_TRACING", "false").lower() != "true":
+            return None
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            logger.warning("METRICS_TRACING=true, mas opentelemetry não está instalado; spans só como histogramas")
+            return None
+        return trace.get_tracer("tractian.integration")
+    
+    def reset(self):
+        with self._lock:
+            self.started = time.monotonic()
+            self.counters: Dict[Tuple[str, Labels], float] = {}
+            self.gauges: Dict[Tuple[str, Labels], float] = {}
+            self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+            self.samples: Dict[Tuple[str, Labels], List[float]] = {}
+    
+    def inc(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+    
+    def set(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.gauges[(name, _labels(labels))] = value
+    
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+            if self.keep_samples:
+                self.samples.setdefault(key, []).append(value)
+    
+    def timer(self, stage: str):
+        return _Timer(self, stage) if self.enabled else _NOOP
+    
+    def span(self, name: str, **attributes):
+        return _Span(self, name, attributes) if self.enabled else _NOOP
+    
+    def records_per_second(self) -> Dict[str, float]:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        rates = {}
+        for (name, labels), value in self.counters.items():
+            if name == "records_total":
+                stage = dict(labels).get("stage", "")
+                rates[stage] = rates.get(stage, 0) + value / elapsed
+        return rates
+    
+    def snapshot(self) -> Dict:
+        with self._lock:
+            def series(items):
+                return [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in items]
+            
+            return {
+                "generatedAt": datetime.now(timezone.utc).isoformat(),
+                "elapsedSeconds": time.monotonic() - self.started,
+                "recordsPerSecond": self.records_per_second(),
+                "counters": series(self.counters.items()),
+                "gauges": series(self.gauges.items()),
+                "histograms": [
+                    {
+                        "name": name,
+                        "labels": dict(labels),
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "p50": histogram.quantile(0.5),
+                        "p99": histogram.quantile(0.99),
+                        "buckets": dict(zip([str(b) for b in histogram.buckets] + ["+Inf"], histogram.counts)),
+                    }
+                    for (name, labels), histogram in self.histograms.items()
+                ],
+            }
+    
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                lines.append(f"{PREFIX}_{name}{_format_labels(labels)} {value}")
+            for (name, labels), value in sorted(self.gauges.items()):
+                lines.append(f"{PREFIX}_{name}{_format_labels(labels)} {value}")
+            for stage, rate in sorted(self.records_per_second().items()):
+                lines.append(f'{PREFIX}_records_per_second{{stage="{stage}"}} {rate}')
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f"{PREFIX}_{name}_bucket{_format_labels(labels, {'le': bound})} {cumulative}")
+                lines.append(f"{PREFIX}_{name}_sum{_format_labels(labels)} {histogram.sum}")
+                lines.append(f"{PREFIX}_{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+    
+    def write_json(self, directory: str | Path, run_name: str = "run") -> Path:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = directory / f"metrics-{run_name}-{stamp}.json"
+        path.write_text(json.dumps(self.snapshot(), indent=2))
+        return path
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    # Every driver round trip (find, getMore, update, ...) is counted and timed
+    
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+    
+    def started(self, event):
+        pass
+    
+    def succeeded(self, event):
+        self.registry.inc("mongo_round_trips_total", command=event.command_name)
+        self.registry.observe("mongo_round_trip_seconds", event.duration_micros / 1e6, command=event.command_name)
+    
+    def failed(self, event):
+        self.registry.inc("mongo_round_trips_total", command=event.command_name)
+        self.registry.inc("mongo_errors_total", command=event.command_name)
+
+
+metrics = MetricsRegistry()
+
+
+def timed(stage: str):
+    return metrics.timer(stage)
+
+
+def span(name: str, **attributes):
+    return metrics.span(name, **attributes)
+
+
+def mongo_listeners() -> list:
+    return [MongoCommandMetrics(metrics)] if metrics.enabled else []
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        body = metrics.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info("Métricas Prometheus em http://{}:{}/metrics", host, server.server_port)
+    return server
+
+
+def serve_from_env() -> ThreadingHTTPServer | None:
+    port = os.getenv("METRICS_PORT")
+    if not port or not metrics.enabled:
+        return None
+    return serve(int(port), os.getenv("METRICS_HOST", "127.0.0.1"))
+
+
+def export_from_env(run_name: str) -> Path | None:
+    directory = os.getenv("METRICS_JSON_DIR")
+    if not directory or not metrics.enabled:
+        return None
+    path = metrics.write_json(directory, run_name)
+    logger.info("Métricas gravadas em {}", path)
+    return path
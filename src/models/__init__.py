@@ -0,0 +1,4 @@
+# src/models/__init__.py
+from .workorders import ClientWorkOrder, TracOSWorkOrder, ValidationError
+
+__all__ = ["ClientWorkOrder", "TracOSWorkOrder", "ValidationError"]
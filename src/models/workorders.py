@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Literal
+
+from src.translators.timestamps import parse_timestamp
+
+TracOSStatus = Literal["pending", "in_progress", "completed", "on_hold", "cancelled"]
+
+
+class ValidationError(ValueError):
+    
+    def __init__(self, field: str, reason: str):
+        super().__init__(f"{field}: {reason}")
+        self.field = field
+        self.reason = reason
+
+
+@dataclass(slots=True, kw_only=True)
+class ClientWorkOrder:
+    orderNo: int
+    isActive: bool = True
+    isCanceled: bool = False
+    isDeleted: bool = False
+    isDone: bool = False
+    isOnHold: bool = False
+    isPending: bool = False
+    isSynced: bool = False
+    summary: str
+    creationDate: str
+    lastUpdateDate: str
+    deletedDate: str | None = None
+    
+    REQUIRED_FIELDS = ("orderNo", "summary", "creationDate", "lastUpdateDate")
+    DATE_FIELDS = ("creationDate", "lastUpdateDate", "deletedDate")
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ClientWorkOrder":
+        # Single pass: each required field is looked up once and checked as it is read
+        required = []
+        for field in cls.REQUIRED_FIELDS:
+            try:
+                value = data[field]
+            except KeyError:
+                raise ValidationError(field, "faltando") from None
+            except TypeError:
+                raise ValidationError(field, "documento inválido") from None
+            if value is None or value == "":
+                raise ValidationError(field, "vazio")
+            required.append(value)
+        
+        order_no, summary, creation_date, last_update_date = required
+        get = data.get
+        
+        # A date the translator cannot parse would fail the order on every run; reject the file instead.
+        # parse_timestamp is cached, so the translator reuses these parses
+        for field in cls.DATE_FIELDS:
+            value = get(field)
+            if value:
+                try:
+                    parse_timestamp(value)
+                except (TypeError, ValueError):
+                    raise ValidationError(field, "data inválida") from None
+        
+        return cls(
+            orderNo=order_no,
+            isActive=get("isActive", True),
+            isCanceled=get("isCanceled", False),
+            isDeleted=get("isDeleted", False),
+            isDone=get("isDone", False),
+            isOnHold=get("isOnHold", False),
+            isPending=get("isPending", False),
+            isSynced=get("isSynced", False),
+            summary=summary,
+            creationDate=creation_date,
+            lastUpdateDate=last_update_date,
+            deletedDate=get("deletedDate"),
+        )
+    
+    def to_dict(self) -> Dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+@dataclass(slots=True, kw_only=True)
+class TracOSWorkOrder:
+    number: int
+    status: TracOSStatus = "in_progress"
+    title: str
+    description: str | None = None
+    createdAt: datetime | str
+    updatedAt: datetime | str
+    deleted: bool = False
+    deletedAt: datetime | str | None = None
+    isSynced: bool = False
+    syncedAt: datetime | None = None
+    contentHash: str | None = None
+    
+    @classmethod
+    def from_document(cls, document: Dict) -> "TracOSWorkOrder":
+        get = document.get
+        return cls(
+            number=document["number"],
+            status=get("status", "in_progress"),
+            title=document["title"],
+            description=get("description"),
+            createdAt=document["createdAt"],
+            updatedAt=document["updatedAt"],
+            deleted=get("deleted", False),
+            deletedAt=get("deletedAt"),
+            isSynced=get("isSynced", False),
+            syncedAt=get("syncedAt"),
+            contentHash=get("contentHash"),
+        )
+    
+    def to_document(self) -> Dict:
+        return {field: getattr(self, field) for field in self.__slots__}
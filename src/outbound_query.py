@@ -1,6 +1,68 @@
 from src.database.connection import get_db, get_workorders_collection
-from typing import List, Dict
-from datetime import datetime
+from src.database.checkpoints import CHECKPOINTS_COLLECTION, CheckpointStore
+from src.database.options import outbound_read_preference
+from typing import AsyncIterator, Iterator, List, Dict, Tuple
+from datetime import datetime, timedelta
+from uuid import uuid4
+from pymongo.errors import OperationFailure
+from loguru import logger
+
+# Only what TracOSToClientTranslator reads
+TRANSLATOR_PROJECTION = {
+    "_id": 0,
+    "number": 1,
+    "status": 1,
+    "title": 1,
+    "createdAt": 1,
+    "updatedAt": 1,
+    "deleted": 1,
+    "deletedAt": 1,
+}
+
+# The watermark cursor travels with each document
+WATERMARK_PROJECTION = {**TRANSLATOR_PROJECTION, "modifiedAt": 1}
+WATERMARK_SORT = [("modifiedAt", 1), ("number", 1)]
+
+DEFAULT_BATCH_SIZE = 1000
+
+LEASE_FIELDS = {"leaseOwner": "", "leaseId": "", "leaseExpiresAt": ""}
+
+# isSynced is read to skip the change events caused by our own mark_as_synced
+CHANGE_STREAM_PIPELINE = [
+    {"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}},
+    {"$project": {**{f"fullDocument.{field}": 1 for field in TRANSLATOR_PROJECTION if field != "_id"}, "fullDocument.isSynced": 1}},
+]
+
+
+def after_watermark(watermark: Dict | None) -> Dict:
+    # (modifiedAt, number) is unique, so orders sharing a modifiedAt are resumed exactly where the last run stopped
+    if not watermark:
+        return {}
+    modified_at, number = watermark["modifiedAt"], watermark["number"]
+    if modified_at is None:
+        # Orders written before modifiedAt existed sort first, by number
+        return {"$or": [{"modifiedAt": {"$ne": None}}, {"modifiedAt": None, "number": {"$gt": number}}]}
+    return {"$or": [{"modifiedAt": {"$gt": modified_at}}, {"modifiedAt": modified_at, "number": {"$gt": number}}]}
+
+
+def at_or_before_watermark(watermark: Dict) -> Dict:
+    # The complement of after_watermark, where orders without modifiedAt also land
+    modified_at, number = watermark["modifiedAt"], watermark["number"]
+    if modified_at is None:
+        return {"modifiedAt": None, "number": {"$lte": number}}
+    return {"$or": [
+        {"modifiedAt": None},
+        {"modifiedAt": {"$lt": modified_at}},
+        {"modifiedAt": modified_at, "number": {"$lte": number}},
+    ]}
+
+
+def with_read_preference(collection):
+    # Outbound scans may go to secondaries; acknowledgements keep using the primary collection
+    read_preference = outbound_read_preference()
+    if collection is None or read_preference is None:
+        return collection
+    return collection.with_options(read_preference=read_preference)
 
 
 class OutboundQuery:
@@ -8,24 +70,182 @@ class OutboundQuery:
     def __init__(self):
         self.db = get_db()
         self.collection = get_workorders_collection()
+        self.reads = with_read_preference(self.collection)
+        self.checkpoints = CheckpointStore(self.db.get_collection(CHECKPOINTS_COLLECTION))
     
     def get_unsynced_work_orders(self) -> List[Dict]:
         if self.collection is None:
-            print(" Sem conexão com MongoDB")
+            logger.warning("Sem conexão com MongoDB")
             return []
         
         try:
-            unsynced = list(self.collection.find({"isSynced": False}))
-            print(f" Encontradas {len(unsynced)} work orders não sincronizadas")
+            unsynced = list(self.reads.find({"isSynced": False}))
+            logger.info("Encontradas {} work orders não sincronizadas", len(unsynced))
             return unsynced
         
         except Exception as e:
-            print(f" Erro ao buscar work orders: {e}")
+            logger.error("Erro ao buscar work orders: {}", e)
             return []
     
+    def has_unsynced(self) -> bool:
+        if self.collection is None:
+            logger.warning("Sem conexão com MongoDB")
+            return False
+        
+        try:
+            # Covered by the unsynced_partial index: an idle run costs one index probe
+            return self.reads.find_one({"isSynced": False}, {"_id": 1}) is not None
+        
+        except Exception as e:
+            # Let the full scan run and report the error
+            logger.error("Erro ao verificar work orders pendentes: {}", e)
+            return True
+    
+    def iter_unsynced_work_orders(self, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Dict]:
+        if self.collection is None:
+            logger.warning("Sem conexão com MongoDB")
+            return
+        
+        try:
+            yield from self.reads.find({"isSynced": False}, TRANSLATOR_PROJECTION, batch_size=batch_size)
+        
+        except Exception as e:
+            logger.error("Erro ao buscar work orders: {}", e)
+    
+    def iter_modified_since(self, watermark: Dict | None, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Dict]:
+        if self.collection is None:
+            logger.warning("Sem conexão com MongoDB")
+            return
+        
+        try:
+            cursor = self.reads.find(after_watermark(watermark), WATERMARK_PROJECTION, batch_size=batch_size).sort(WATERMARK_SORT)
+            yield from cursor
+        
+        except Exception as e:
+            logger.error("Erro ao buscar work orders atualizadas: {}", e)
+    
+    def iter_unsynced_behind(self, watermark: Dict, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Dict]:
+        if self.collection is None:
+            logger.warning("Sem conexão com MongoDB")
+            return
+        
+        try:
+            # Served by the unsynced_partial index: only unsynced orders are read
+            query = {"isSynced": False, **at_or_before_watermark(watermark)}
+            yield from self.reads.find(query, WATERMARK_PROJECTION, batch_size=batch_size)
+        
+        except Exception as e:
+            logger.error("Erro ao buscar work orders atrás do watermark: {}", e)
+    
+    def watch_changes(self, resume_token: Dict | None = None) -> Iterator[Tuple[Dict, Dict]]:
+        if self.collection is None:
+            logger.warning("Sem conexão com MongoDB")
+            return
+        
+        try:
+            with self.reads.watch(
+                CHANGE_STREAM_PIPELINE,
+                full_document="updateLookup",
+                resume_after=resume_token
+            ) as stream:
+                for change in stream:
+                    yield change.get("fullDocument"), stream.resume_token
+        
+        except OperationFailure as e:
+            # Standalone servers do not support change streams; an expired token also lands here
+            logger.warning("Change stream indisponível: {}", e)
+    
+    def claim_batch(self, owner: str, batch_size: int, lease_seconds: float) -> Tuple[str, List[Dict]] | None:
+        # Returns None when nothing is claimable; an empty list means other workers won every candidate
+        if self.collection is None:
+            logger.warning("Sem conexão com MongoDB")
+            return None
+        
+        now = datetime.utcnow()
+        # null also matches documents that were never leased
+        claimable = {"isSynced": False, "$or": [{"leaseExpiresAt": None}, {"leaseExpiresAt": {"$lte": now}}]}
+        lease_id = uuid4().hex
+        
+        try:
+            # Claims always go to the primary: a stale secondary would hand out orders already leased
+            candidates = [doc["number"] for doc in self.collection.find(claimable, {"_id": 0, "number": 1}, limit=batch_size)]
+            if not candidates:
+                return None
+            
+            # Each document is claimed atomically; the filter is re-checked so a concurrent claim wins or loses whole
+            self.collection.update_many(
+                {**claimable, "number": {"$in": candidates}},
+                {"$set": {"leaseOwner": owner, "leaseId": lease_id, "leaseExpiresAt": now + timedelta(seconds=lease_seconds)}}
+            )
+            claimed = list(self.collection.find({"leaseId": lease_id}, TRANSLATOR_PROJECTION, batch_size=batch_size))
+            logger.info("Lease {}: {} de {} work orders reivindicadas por {}", lease_id, len(claimed), len(candidates), owner)
+            return lease_id, claimed
+        
+        except Exception as e:
+            logger.error("Erro ao reivindicar work orders: {}", e)
+            return None
+    
+    def complete_lease(self, lease_id: str, work_order_numbers: List[int]) -> bool:
+        if self.collection is None:
+            logger.warning("Sem conexão com MongoDB")
+            return False
+        
+        try:
+            # Guarded by leaseId: after an expiry another worker owns the order and acknowledges it itself
+            result = self.collection.update_many(
+                {"number": {"$in": work_order_numbers}, "leaseId": lease_id},
+                {"$set": {"isSynced": True, "syncedAt": datetime.utcnow()}, "$unset": LEASE_FIELDS}
+            )
+            if result.matched_count < len(work_order_numbers):
+                logger.warning(
+                    "Lease {} expirou para {} work orders; outro worker vai reprocessá-las",
+                    lease_id, len(work_order_numbers) - result.matched_count
+                )
+            logger.info("{} work orders marcadas como sincronizadas (lease {})", result.matched_count, lease_id)
+            return True
+        
+        except Exception as e:
+            logger.error("Erro ao concluir lease {}: {}", lease_id, e)
+            return False
+    
+    def release_lease(self, lease_id: str) -> bool:
+        if self.collection is None:
+            return False
+        
+        try:
+            self.collection.update_many({"leaseId": lease_id, "isSynced": False}, {"$unset": LEASE_FIELDS})
+            logger.info("Lease {} liberado", lease_id)
+            return True
+        
+        except Exception as e:
+            logger.error("Erro ao liberar lease {}: {}", lease_id, e)
+            return False
+    
+    def mark_many_as_synced(self, work_order_numbers: List[int]) -> bool:
+        if self.collection is None:
+            logger.warning("Sem conexão com MongoDB")
+            return False
+        
+        try:
+            self.collection.update_many(
+                {"number": {"$in": work_order_numbers}},
+                {
+                    "$set": {
+                        "isSynced": True,
+                        "syncedAt": datetime.utcnow()
+                    }
+                }
+            )
+            logger.info("{} work orders marcadas como sincronizadas", len(work_order_numbers))
+            return True
+        
+        except Exception as e:
+            logger.error("Erro ao marcar {} work orders como sincronizadas: {}", len(work_order_numbers), e)
+            return False
+    
     def mark_as_synced(self, work_order_number: int) -> bool:
         if self.collection is None:
-            print(" Sem conexão com MongoDB")
+            logger.warning("Sem conexão com MongoDB")
             return False
         
         try:
@@ -38,29 +258,124 @@ class OutboundQuery:
                     }
                 }
             )
-            print(f" Work Order #{work_order_number} marcada como sincronizada")
+            logger.debug("Work Order #{} marcada como sincronizada", work_order_number)
             return True
         
         except Exception as e:
-            print(f" Erro ao marcar como sincronizada #{work_order_number}: {e}")
+            logger.error("Erro ao marcar como sincronizada #{}: {}", work_order_number, e)
             return False
     
     def close(self):
         self.db.close()
 
 
+
+class AsyncOutboundQuery:
+    
+    def __init__(self):
+        self.db = None
+        self.collection = None
+        self.reads = None
+    
+    async def connect(self):
+        # motor is only imported by the async pipeline
+        from src.database.async_connection import get_async_db
+        
+        if self.db is not None:
+            # Release the handle of a failed connection before trying again
+            self.db.close()
+        self.db = await get_async_db()
+        self.collection = self.db.get_collection("workorders")
+        self.reads = with_read_preference(self.collection)
+    
+    async def has_unsynced(self) -> bool:
+        if self.collection is None:
+            logger.warning("Sem conexão com MongoDB")
+            return False
+        
+        try:
+            return await self.reads.find_one({"isSynced": False}, {"_id": 1}) is not None
+        
+        except Exception as e:
+            logger.error("Erro ao verificar work orders pendentes: {}", e)
+            return True
+    
+    async def iter_unsynced_work_orders(self, batch_size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[Dict]:
+        if self.collection is None:
+            logger.warning("Sem conexão com MongoDB")
+            return
+        
+        try:
+            async for work_order in self.reads.find({"isSynced": False}, TRANSLATOR_PROJECTION, batch_size=batch_size):
+                yield work_order
+        
+        except Exception as e:
+            logger.error("Erro ao buscar work orders: {}", e)
+    
+    async def mark_many_as_synced(self, work_order_numbers: List[int]) -> bool:
+        if self.collection is None:
+            logger.warning("Sem conexão com MongoDB")
+            return False
+        
+        try:
+            await self.collection.update_many(
+                {"number": {"$in": work_order_numbers}},
+                {
+                    "$set": {
+                        "isSynced": True,
+                        "syncedAt": datetime.utcnow()
+                    }
+                }
+            )
+            logger.info("{} work orders marcadas como sincronizadas", len(work_order_numbers))
+            return True
+        
+        except Exception as e:
+            logger.error("Erro ao marcar {} work orders como sincronizadas: {}", len(work_order_numbers), e)
+            return False
+    
+    async def mark_as_synced(self, work_order_number: int) -> bool:
+        if self.collection is None:
+            logger.warning("Sem conexão com MongoDB")
+            return False
+        
+        try:
+            await self.collection.update_one(
+                {"number": work_order_number},
+                {
+                    "$set": {
+                        "isSynced": True,
+                        "syncedAt": datetime.utcnow()
+                    }
+                }
+            )
+            logger.debug("Work Order #{} marcada como sincronizada", work_order_number)
+            return True
+        
+        except Exception as e:
+            logger.error("Erro ao marcar como sincronizada #{}: {}", work_order_number, e)
+            return False
+    
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+
+
 if __name__ == "__main__":
-    print(" Testando Busca de Work Orders Não Sincronizadas\n")
+    from src.log_config import configure_logging
+    
+    configure_logging()
+    logger.info("Testando Busca de Work Orders Não Sincronizadas")
     
     query = OutboundQuery()
     
     unsynced = query.get_unsynced_work_orders()
     
     if unsynced:
-        print(f"\n Work orders não sincronizadas:")
+        logger.info("Work orders não sincronizadas:")
         for wo in unsynced:
-            print(f"   - #{wo['number']}: {wo.get('title', 'Sem título')}")
+            logger.info("- #{}: {}", wo['number'], wo.get('title', 'Sem título'))
     else:
-        print("\n Todas as work orders já estão sincronizadas!")
+        logger.info("Todas as work orders já estão sincronizadas!")
     
     query.close()
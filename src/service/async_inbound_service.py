@@ -0,0 +1,171 @@
+import asyncio
+import os
+from typing import Dict, List, Set
+from loguru import logger
+from pymongo.errors import BulkWriteError
+
+from src.adapters.client_adapter import ClientAdapter
+from src.env import load_env
+from src.models.workorders import ClientWorkOrder
+from src.translators.client_to_tracos import ClientToTracOSTranslator
+from src.database.async_connection import get_async_db
+from src.log_config import configure_logging
+from src.metrics import metrics, span, timed
+from src.service.inbound_service import (
+    HASH_PROJECTION, build_upsert_batch, bulk_write_error_details, chunked, count_outcomes, latest_by_number,
+    open_inbound_manifest, report_bulk_outcomes, report_unchanged, unchanged_numbers
+)
+
+load_env()
+
+
+class AsyncInboundService:
+    
+    DEFAULT_BATCH_SIZE = 1000
+    DEFAULT_CONCURRENCY = 16
+    
+    def __init__(self, batch_size: int | None = None, concurrency: int | None = None, incremental: bool | None = None):
+        self.manifest = open_inbound_manifest(incremental)
+        self.client_adapter = ClientAdapter(self.manifest)
+        self.translator = ClientToTracOSTranslator()
+        self.batch_size = batch_size or int(os.getenv("INBOUND_BATCH_SIZE", self.DEFAULT_BATCH_SIZE))
+        self.concurrency = concurrency or int(os.getenv("PIPELINE_CONCURRENCY", self.DEFAULT_CONCURRENCY))
+        
+        # Caps in-flight file reads and Mongo operations together
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.db = None
+        self.collection = None
+    
+    async def connect(self):
+        if self.db is not None:
+            # Release the handle of a failed connection before trying again
+            self.db.close()
+        self.db = await get_async_db()
+        self.collection = self.db.get_collection("workorders")
+    
+    async def load_inbound_file(self, entry: os.DirEntry, full_resync: bool = False) -> List[ClientWorkOrder]:
+        # A bundle is read whole in its thread, so all of its orders are staged before any write settles
+        async with self.semaphore:
+            return await asyncio.to_thread(self.client_adapter.load_records, entry, full_resync)
+    
+    async def find_unchanged(self, latest: Dict[int, Dict]) -> Set[int]:
+        try:
+            async with self.semaphore:
+                with timed("mongo_hash_lookup"):
+                    stored = await self.collection.find({"number": {"$in": list(latest)}}, HASH_PROJECTION).to_list(None)
+            return unchanged_numbers(latest, stored)
+        except Exception as e:
+            logger.error("Erro ao consultar hashes existentes: {}", e)
+            return set()
+    
+    async def save_batch_to_mongodb(self, work_orders: List[Dict]) -> Dict[int, str]:
+        latest = latest_by_number(work_orders)
+        
+        if self.collection is None:
+            logger.warning("Sem conexão com MongoDB")
+            return {number: "failed" for number in latest}
+        
+        unchanged = await self.find_unchanged(latest)
+        outcomes = report_unchanged(unchanged)
+        numbers, operations = build_upsert_batch(wo for number, wo in latest.items() if number not in unchanged)
+        
+        if not operations:
+            return outcomes
+        
+        try:
+            async with self.semaphore:
+                with timed("mongo_write"):
+                    result = await self.collection.bulk_write(operations, ordered=False)
+            upserted, failed = set(result.upserted_ids), {}
+        
+        except BulkWriteError as e:
+            upserted, failed = bulk_write_error_details(e)
+        
+        except Exception as e:
+            logger.error("Erro ao salvar lote de {} work orders: {}", len(numbers), e)
+            outcomes.update({number: "failed" for number in numbers})
+            return outcomes
+        
+        outcomes.update(report_bulk_outcomes(numbers, upserted, failed))
+        return outcomes
+    
+    async def process(self, full_resync: bool = False) -> Dict[str, int]:
+        logger.info("Iniciando fluxo INBOUND (async)")
+        logger.info("Processando work orders em lotes de {}, concorrência {}...", self.batch_size, self.concurrency)
+        
+        totals = {"inserted": 0, "updated": 0, "unchanged": 0, "failed": 0}
+        writes = set()
+        
+        for entries in chunked(self.client_adapter.iter_changed_files(full_resync), self.batch_size):
+            loaded = await asyncio.gather(*(self.load_inbound_file(entry, full_resync) for entry in entries))
+            batch = []
+            
+            for client_data in (record for records in loaded for record in records):
+                try:
+                    with timed("translate_inbound"):
+                        batch.append(self.translator.translate_record(client_data).to_document())
+                    logger.debug("Traduzido: orderNo #{}", client_data.orderNo)
+                except Exception as e:
+                    logger.error("Erro ao processar #{}: {}", client_data.orderNo, e)
+                    metrics.inc("records_total", stage="inbound", outcome="failed")
+                    totals["failed"] += 1
+            
+            # Connected only once the scan has produced something to write
+            if batch and self.collection is None:
+                await self.connect()
+            
+            # Bundles can make a chunk of files much larger than one write batch
+            for part in chunked(batch, self.batch_size):
+                # Writes run in the background while the next chunk is read; bound how many can queue up
+                if len(writes) >= self.concurrency:
+                    done, writes = await asyncio.wait(writes, return_when=asyncio.FIRST_COMPLETED)
+                    self._collect(done, totals)
+                writes.add(asyncio.create_task(self._save_batch(part)))
+                metrics.set("queue_depth", len(writes), queue="inbound_writes")
+        
+        if writes:
+            done, _ = await asyncio.wait(writes)
+            self._collect(done, totals)
+        
+        self.client_adapter.discard_sources()
+        self.client_adapter.finish_run()
+        
+        if not any(totals.values()):
+            logger.info("Nenhuma work order válida encontrada!")
+            return totals
+        
+        logger.info("Fluxo INBOUND concluído!")
+        logger.info(
+            "Resultado: {inserted} inseridas, {updated} atualizadas, {unchanged} sem alteração, {failed} falha",
+            **totals
+        )
+        return totals
+    
+    async def _save_batch(self, batch: List[Dict]) -> Dict[int, str]:
+        with span("inbound.batch", size=len(batch)):
+            return await self.save_batch_to_mongodb(batch)
+    
+    def _collect(self, done, totals: Dict[str, int]):
+        for task in done:
+            outcomes = task.result()
+            count_outcomes(outcomes, totals)
+            self.client_adapter.commit_sources(number for number, outcome in outcomes.items() if outcome != "failed")
+    
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+        self.client_adapter.close()
+        if self.manifest is not None:
+            self.manifest.close()
+
+
+if __name__ == "__main__":
+    configure_logging()
+    logger.info("TESTE COMPLETO: INBOUND SERVICE (ASYNC)")
+    
+    async def main():
+        service = AsyncInboundService()
+        await service.process()
+        service.close()
+    
+    asyncio.run(main())
@@ -0,0 +1,128 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import Dict, List
+from loguru import logger
+
+from src.adapters.outbound_writer import OutboundWriter
+from src.env import load_env
+from src.log_config import configure_logging
+from src.metrics import metrics, span, timed
+from src.outbound_query import AsyncOutboundQuery
+from src.translators.tracos_to_client import TracOSToClientTranslator
+
+load_env()
+
+
+class AsyncOutboundService:
+    
+    DEFAULT_BATCH_SIZE = 1000
+    DEFAULT_CONCURRENCY = 16
+    
+    def __init__(self, batch_size: int | None = None, concurrency: int | None = None):
+        self.query = AsyncOutboundQuery()
+        self.translator = TracOSToClientTranslator()
+        self.outbound_dir = Path(os.getenv("DATA_OUTBOUND_DIR", "./data/outbound"))
+        self.outbound_dir.mkdir(parents=True, exist_ok=True)
+        self.writer = OutboundWriter(self.outbound_dir)
+        self.batch_size = batch_size or int(os.getenv("OUTBOUND_BATCH_SIZE", self.DEFAULT_BATCH_SIZE))
+        self.concurrency = concurrency or int(os.getenv("PIPELINE_CONCURRENCY", self.DEFAULT_CONCURRENCY))
+        
+        # Caps in-flight file writes and Mongo operations together
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+    
+    async def write_json(self, work_order: Dict) -> bool:
+        async with self.semaphore:
+            return await asyncio.to_thread(self.writer.write, work_order)
+    
+    async def mark_many_as_synced(self, work_order_numbers: List[int]) -> bool:
+        async with self.semaphore:
+            with timed("mark_synced"):
+                return await self.query.mark_many_as_synced(work_order_numbers)
+    
+    async def write_work_order(self, tracos_wo: Dict) -> int | None:
+        try:
+            with timed("translate_outbound"):
+                client_wo = self.translator.translate(tracos_wo)
+            
+            if await self.write_json(client_wo):
+                return tracos_wo['number']
+            return None
+        
+        except Exception as e:
+            logger.error("Erro ao processar #{}: {}", tracos_wo.get('number'), e)
+            return None
+    
+    async def process(self) -> Dict[str, int]:
+        logger.info("Iniciando fluxo OUTBOUND (async)")
+        
+        if self.query.collection is None:
+            await self.query.connect()
+        
+        results = {"sucesso": 0, "falha": 0}
+        if not await self.query.has_unsynced():
+            logger.info("Nenhuma work order para sincronizar!")
+            return results
+        
+        pending = set()
+        written = []
+        
+        async for tracos_wo in self.query.iter_unsynced_work_orders(self.batch_size):
+            # Stop pulling from the cursor while too many orders are in flight
+            if len(pending) >= self.concurrency * 2:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                self._collect(done, written, results)
+            pending.add(asyncio.create_task(self.write_work_order(tracos_wo)))
+            metrics.set("queue_depth", len(pending), queue="outbound_writes")
+            
+            if len(written) >= self.batch_size:
+                await self._acknowledge(written, results)
+                written = []
+        
+        if pending:
+            done, _ = await asyncio.wait(pending)
+            self._collect(done, written, results)
+        
+        if written:
+            await self._acknowledge(written, results)
+        
+        if not any(results.values()):
+            logger.info("Nenhuma work order para sincronizar!")
+            return results
+        
+        logger.info("Fluxo OUTBOUND concluído!")
+        logger.info("Resultado: {} sucesso, {} falha", results['sucesso'], results['falha'])
+        return results
+    
+    def _collect(self, done, written: List[int], results: Dict[str, int]):
+        for task in done:
+            number = task.result()
+            if number is None:
+                results["falha"] += 1
+                metrics.inc("records_total", stage="outbound", outcome="failed")
+            else:
+                written.append(number)
+    
+    async def _acknowledge(self, numbers: List[int], results: Dict[str, int]):
+        with span("outbound.batch", size=len(numbers)):
+            flushed = await asyncio.to_thread(self.writer.flush)
+            acknowledged = flushed and await self.mark_many_as_synced(numbers)
+        
+        outcome = "synced" if acknowledged else "failed"
+        results["sucesso" if acknowledged else "falha"] += len(numbers)
+        metrics.inc("records_total", len(numbers), stage="outbound", outcome=outcome)
+    
+    def close(self):
+        self.query.close()
+
+
+if __name__ == "__main__":
+    configure_logging()
+    logger.info("TESTE COMPLETO: OUTBOUND SERVICE (ASYNC)")
+    
+    async def main():
+        service = AsyncOutboundService()
+        await service.process()
+        service.close()
+    
+    asyncio.run(main())
@@ -1,84 +1,254 @@
-import sys
-sys.path.insert(0, '.')
+import os
+from collections import Counter
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+from loguru import logger
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 from src.adapters.client_adapter import ClientAdapter
+from src.adapters.inbound_manifest import InboundManifest
+from src.env import load_env
 from src.translators.client_to_tracos import ClientToTracOSTranslator
 from src.database.connection import get_db, get_workorders_collection
-from typing import Dict
+from src.log_config import configure_logging
+from src.metrics import metrics, span, timed
+
+load_env()
+
+HASH_PROJECTION = {"_id": 0, "number": 1, "contentHash": 1}
+
+
+def open_inbound_manifest(incremental: bool | None = None) -> InboundManifest | None:
+    if incremental is None:
+        incremental = os.getenv("INBOUND_INCREMENTAL", "false").lower() == "true"
+    if not incremental:
+        return None
+    return InboundManifest(os.getenv("INBOUND_MANIFEST_PATH", "./data/inbound_manifest.sqlite3"))
+
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def latest_by_number(work_orders: Iterable[Dict]) -> Dict[int, Dict]:
+    # Last occurrence wins, so one order number never gets two upserts in the same batch
+    return {wo["number"]: wo for wo in work_orders}
+
+
+def unchanged_numbers(latest: Dict[int, Dict], stored: Iterable[Dict]) -> Set[int]:
+    stored_hashes = {doc["number"]: doc.get("contentHash") for doc in stored}
+    return {
+        number for number, wo in latest.items()
+        if wo.get("contentHash") is not None and stored_hashes.get(number) == wo["contentHash"]
+    }
+
+
+def conditional_update(work_order: Dict) -> List[Dict]:
+    # Pipeline update: fields only change when the stored contentHash differs, so a
+    # re-ingested identical order is a no-op and keeps its isSynced/syncedAt
+    changed = {"$ne": ["$contentHash", work_order["contentHash"]]}
+    return [{
+        "$set": {
+            **{
+                field: {"$cond": [changed, {"$literal": value}, f"${field}"]}
+                for field, value in work_order.items()
+            },
+            # Server time of the last real change; updatedAt is the client's business date and can go backwards
+            "modifiedAt": {"$cond": [changed, "$$NOW", "$modifiedAt"]},
+        }
+    }]
+
+
+def build_upsert_batch(work_orders: Iterable[Dict]) -> Tuple[List[int], List[UpdateOne]]:
+    latest = latest_by_number(work_orders)
+    operations = [
+        UpdateOne({"number": number}, conditional_update(wo), upsert=True)
+        for number, wo in latest.items()
+    ]
+    return list(latest), operations
+
+
+def bulk_write_error_details(error: BulkWriteError) -> Tuple[Set[int], Dict[int, str]]:
+    upserted = {item["index"] for item in error.details.get("upserted", [])}
+    failed = {item["index"]: item.get("errmsg") for item in error.details.get("writeErrors", [])}
+    return upserted, failed
+
+
+def report_unchanged(unchanged: Set[int]) -> Dict[int, str]:
+    for number in unchanged:
+        logger.debug("Sem alteração: Work Order #{}", number)
+    return {number: "unchanged" for number in unchanged}
+
+
+def count_outcomes(outcomes: Dict[int, str], totals: Dict[str, int]):
+    for outcome, count in Counter(outcomes.values()).items():
+        totals[outcome] += count
+        metrics.inc("records_total", count, stage="inbound", outcome=outcome)
+
+
+def report_bulk_outcomes(numbers: List[int], upserted: Set[int], failed: Dict[int, str]) -> Dict[int, str]:
+    outcomes = {}
+    for index, number in enumerate(numbers):
+        if index in failed:
+            outcomes[number] = "failed"
+            logger.error("Erro ao salvar Work Order #{}: {}", number, failed[index])
+        elif index in upserted:
+            outcomes[number] = "inserted"
+            logger.debug("Inserida: Work Order #{}", number)
+        else:
+            outcomes[number] = "updated"
+            logger.debug("Atualizada: Work Order #{}", number)
+    return outcomes
 
 
 class InboundService:
     
-    def __init__(self):
-        self.client_adapter = ClientAdapter()
+    DEFAULT_BATCH_SIZE = 1000
+    
+    def __init__(self, batch_size: int | None = None, incremental: bool | None = None):
+        self.manifest = open_inbound_manifest(incremental)
+        self.client_adapter = ClientAdapter(self.manifest)
         self.translator = ClientToTracOSTranslator()
+        self.batch_size = batch_size or int(os.getenv("INBOUND_BATCH_SIZE", self.DEFAULT_BATCH_SIZE))
         
-        self.db = get_db()
-        self.collection = get_workorders_collection()
+        self.db = None
+        self.collection = None
+    
+    def connect(self):
+        # Opened by the first write, so a scan that finds no work never touches MongoDB;
+        # a failed connection is tried again on the next write, so a long-running daemon recovers
+        if self.collection is None:
+            if self.db is not None:
+                self.db.close()
+            self.db = get_db()
+            self.collection = get_workorders_collection()
     
     def save_to_mongodb(self, work_order: Dict) -> bool:
+        self.connect()
         if self.collection is None:
-            print("Sem conexão com MongoDB")
+            logger.warning("Sem conexão com MongoDB")
             return False
         
         try:
             result = self.collection.update_one(
                 {"number": work_order["number"]},
-                {"$set": work_order},
+                conditional_update(work_order),
                 upsert=True
             )
             
             if result.upserted_id:
-                print(f"Inserida: Work Order #{work_order['number']}")
+                logger.debug("Inserida: Work Order #{}", work_order['number'])
+            elif result.modified_count:
+                logger.debug("Atualizada: Work Order #{}", work_order['number'])
             else:
-                print(f"Atualizada: Work Order #{work_order['number']}")
+                logger.debug("Sem alteração: Work Order #{}", work_order['number'])
             return True
         
         except Exception as e:
-            print(f"Erro ao salvar: {e}")
+            logger.error("Erro ao salvar: {}", e)
             return False
     
-    def process(self):
-        print("Iniciando fluxo INBOUND\n")
+    def find_unchanged(self, latest: Dict[int, Dict]) -> Set[int]:
+        try:
+            with timed("mongo_hash_lookup"):
+                stored = list(self.collection.find({"number": {"$in": list(latest)}}, HASH_PROJECTION))
+            return unchanged_numbers(latest, stored)
+        except Exception as e:
+            # The conditional update still protects unchanged documents, only slower
+            logger.error("Erro ao consultar hashes existentes: {}", e)
+            return set()
+    
+    def save_batch_to_mongodb(self, work_orders: List[Dict]) -> Dict[int, str]:
+        latest = latest_by_number(work_orders)
         
-        work_orders = self.client_adapter.read_inbound_files()
+        self.connect()
+        if self.collection is None:
+            logger.warning("Sem conexão com MongoDB")
+            return {number: "failed" for number in latest}
         
-        if not work_orders:
-            print("\n Nenhuma work order válida encontrada!")
-            return
+        unchanged = self.find_unchanged(latest)
+        outcomes = report_unchanged(unchanged)
+        numbers, operations = build_upsert_batch(wo for number, wo in latest.items() if number not in unchanged)
         
-        print(f"\n Processando {len(work_orders)} work orders...\n")
+        if not operations:
+            return outcomes
         
-        sucesso = 0
-        falha = 0
+        try:
+            with timed("mongo_write"):
+                result = self.collection.bulk_write(operations, ordered=False)
+            upserted, failed = set(result.upserted_ids), {}
         
-        for client_data in work_orders:
-            try:
-                tracos_data = self.translator.translate(client_data)
-                print(f" Traduzido: orderNo #{client_data['orderNo']}")
-                
-                if self.save_to_mongodb(tracos_data):
-                    sucesso += 1
-                else:
-                    falha += 1
-                    
-            except Exception as e:
-                print(f" Erro ao processar #{client_data.get('orderNo')}: {e}")
-                falha += 1
+        except BulkWriteError as e:
+            upserted, failed = bulk_write_error_details(e)
         
-        print(f"\n Fluxo INBOUND concluído!")
-        print(f" Resultado: {sucesso} sucesso, {falha} falha")
+        except Exception as e:
+            logger.error("Erro ao salvar lote de {} work orders: {}", len(numbers), e)
+            outcomes.update({number: "failed" for number in numbers})
+            return outcomes
+        
+        outcomes.update(report_bulk_outcomes(numbers, upserted, failed))
+        return outcomes
+    
+    def process(self, full_resync: bool = False) -> Dict[str, int]:
+        logger.info("Iniciando fluxo INBOUND")
+        logger.info("Processando work orders em lotes de {}...", self.batch_size)
+        
+        totals = {"inserted": 0, "updated": 0, "unchanged": 0, "failed": 0}
+        
+        for work_orders in self.client_adapter.iter_inbound_batches(self.batch_size, full_resync):
+            batch = []
+            
+            for client_data in work_orders:
+                try:
+                    with timed("translate_inbound"):
+                        batch.append(self.translator.translate_record(client_data).to_document())
+                    logger.debug("Traduzido: orderNo #{}", client_data.orderNo)
+                except Exception as e:
+                    logger.error("Erro ao processar #{}: {}", client_data.orderNo, e)
+                    metrics.inc("records_total", stage="inbound", outcome="failed")
+                    totals["failed"] += 1
+            
+            if batch:
+                self._flush(batch, totals)
+        
+        self.client_adapter.discard_sources()
+        self.client_adapter.finish_run()
+        
+        if not any(totals.values()):
+            logger.info("Nenhuma work order válida encontrada!")
+            return totals
+        
+        logger.info("Fluxo INBOUND concluído!")
+        logger.info(
+            "Resultado: {inserted} inseridas, {updated} atualizadas, {unchanged} sem alteração, {failed} falha",
+            **totals
+        )
+        return totals
+    
+    def _flush(self, batch: List[Dict], totals: Dict[str, int]):
+        with span("inbound.batch", size=len(batch)):
+            outcomes = self.save_batch_to_mongodb(batch)
+        count_outcomes(outcomes, totals)
+        self.client_adapter.commit_sources(number for number, outcome in outcomes.items() if outcome != "failed")
     
     def close(self):
-        self.db.close()
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+            self.collection = None
+        self.client_adapter.close()
+        if self.manifest is not None:
+            self.manifest.close()
 
 
 if __name__ == "__main__":
-    print("="*60)
-    print(" TESTE COMPLETO: INBOUND SERVICE")
-    print("="*60 + "\n")
+    configure_logging()
+    logger.info("TESTE COMPLETO: INBOUND SERVICE")
     
     service = InboundService()
     service.process()
     service.close()
-    
+
@@ -1,90 +1,304 @@
-import sys
-sys.path.insert(0, '.')
-
 import os
-import json
+import queue
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import Callable, Dict, Iterable, List
+from loguru import logger
 
+from src.adapters.outbound_writer import OutboundWriter
+from src.env import load_env
+from src.log_config import configure_logging
+from src.metrics import metrics, span, timed
 from src.outbound_query import OutboundQuery
 from src.translators.tracos_to_client import TracOSToClientTranslator
 
-load_dotenv()
+load_env()
 
 
 class OutboundService:
     
-    def __init__(self):
-        self.query = OutboundQuery()
+    DEFAULT_BATCH_SIZE = 1000
+    DEFAULT_WORKERS = 4
+    DEFAULT_QUEUE_SIZE = 256
+    DEFAULT_LEASE_SECONDS = 300
+    WATERMARK_CHECKPOINT = "outbound_watermark"
+    RESUME_TOKEN_CHECKPOINT = "outbound_resume_token"
+    
+    def __init__(self, batch_size: int | None = None, workers: int | None = None, queue_size: int | None = None):
+        # Connected on first use, so building the service (e.g. in the daemon) costs no round trip
+        self._query: OutboundQuery | None = None
         self.translator = TracOSToClientTranslator()
         self.outbound_dir = Path(os.getenv("DATA_OUTBOUND_DIR", "./data/outbound"))
         self.outbound_dir.mkdir(parents=True, exist_ok=True)
+        self.writer = OutboundWriter(self.outbound_dir)
+        self.batch_size = batch_size or int(os.getenv("OUTBOUND_BATCH_SIZE", self.DEFAULT_BATCH_SIZE))
+        self.workers = workers or int(os.getenv("OUTBOUND_WORKERS", self.DEFAULT_WORKERS))
+        self.queue_size = queue_size or int(os.getenv("OUTBOUND_QUEUE_SIZE", self.DEFAULT_QUEUE_SIZE))
+        self.worker_id = os.getenv("OUTBOUND_WORKER_ID") or f"{socket.gethostname()}:{os.getpid()}"
+        # Must exceed the time to write and acknowledge one batch, or another worker reclaims it mid-flight
+        self.lease_seconds = float(os.getenv("OUTBOUND_LEASE_SECONDS", self.DEFAULT_LEASE_SECONDS))
+    
+    @property
+    def query(self) -> OutboundQuery:
+        if self._query is None:
+            self._query = OutboundQuery()
+        return self._query
+    
+    def connect(self):
+        # A query whose connection failed is not reused, so the next run (e.g. the daemon's next cycle) tries again
+        if self._query is not None and self._query.collection is None:
+            self._query.close()
+            self._query = None
     
     def write_json(self, work_order: dict) -> bool:
-        filename = f"{work_order['orderNo']}.json"
-        file_path = self.outbound_dir / filename
+        return self.writer.write(work_order)
+    
+    def process(self) -> Dict[str, int]:
+        logger.info("Iniciando fluxo OUTBOUND")
+        logger.info("Processando work orders em lotes de {} ({} threads de escrita)...", self.batch_size, self.workers)
         
-        try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(work_order, f, indent=2)
-            
-            print(f" Escrito: {filename}")
-            return True
+        self.connect()
+        results = {"sucesso": 0, "falha": 0}
+        # An idle run stops at one indexed find_one instead of starting the writer pipeline
+        if not self.query.has_unsynced():
+            logger.info("Nenhuma work order para sincronizar!")
+            return results
         
-        except PermissionError:
-            print(f" Sem permissão para escrever: {filename}")
-            return False
+        self._run_pipeline(self.query.iter_unsynced_work_orders(self.batch_size), results)
         
-        except OSError as e:
-            print(f" Erro de I/O ao escrever {filename}: {e}")
-            return False
+        if not any(results.values()):
+            logger.info("Nenhuma work order para sincronizar!")
+            return results
         
-        except Exception as e:
-            print(f" Erro inesperado ao escrever {filename}: {e}")
-            return False
+        logger.info("Fluxo OUTBOUND concluído!")
+        logger.info("Resultado: {} sucesso, {} falha", results['sucesso'], results['falha'])
+        return results
     
-    def process(self):
-        print(" Iniciando fluxo OUTBOUND\n")
+    def process_incremental(self) -> Dict[str, int]:
+        logger.info("Iniciando fluxo OUTBOUND incremental (watermark)")
+        
+        self.connect()
+        watermark = self.query.checkpoints.load(self.WATERMARK_CHECKPOINT)
+        if watermark is not None and not isinstance(watermark, dict):
+            # A bare updatedAt from before the (modifiedAt, number) cursor: orders behind it may have been skipped
+            logger.warning("Watermark em formato antigo ({}); exportando tudo novamente", watermark)
+            watermark = None
+        logger.info("Buscando work orders modificadas após {}", watermark)
+        
+        results = {"sucesso": 0, "falha": 0}
+        # Only advance past orders that were all written and acknowledged: a failure pins the watermark before it
+        state = {"safe": watermark, "pending": watermark, "blocked": False}
         
-        unsynced = self.query.get_unsynced_work_orders()
+        def on_written(tracos_wo: Dict, written: bool):
+            if not written:
+                state["blocked"] = True
+            elif not state["blocked"]:
+                state["pending"] = {"modifiedAt": tracos_wo.get('modifiedAt'), "number": tracos_wo['number']}
         
-        if not unsynced:
-            print("\n Nenhuma work order para sincronizar!")
-            return
+        def on_acknowledged(acknowledged: bool):
+            if not acknowledged:
+                state["blocked"] = True
+                state["pending"] = state["safe"]
+            elif state["pending"] != state["safe"]:
+                state["safe"] = state["pending"]
+                self.query.checkpoints.save(self.WATERMARK_CHECKPOINT, state["safe"])
         
-        print(f"\n Processando {len(unsynced)} work orders...\n")
+        self._run_pipeline(self.query.iter_modified_since(watermark, self.batch_size), results, on_written, on_acknowledged)
         
-        sucesso = 0
-        falha = 0
+        if state["safe"] is not None:
+            # The cursor never reaches orders without modifiedAt (setup.py, loadgen, TracOS writers) or stamped
+            # behind it by a concurrent $$NOW; isSynced, which every writer maintains, still flags them
+            self._run_pipeline(self.query.iter_unsynced_behind(state["safe"], self.batch_size), results)
         
-        for tracos_wo in unsynced:
+        if not any(results.values()):
+            logger.info("Nenhuma work order para sincronizar!")
+            return results
+        
+        logger.info("Fluxo OUTBOUND incremental concluído! Watermark: {}", state['safe'])
+        logger.info("Resultado: {} sucesso, {} falha", results['sucesso'], results['falha'])
+        return results
+    
+    def process_claimed(self) -> Dict[str, int]:
+        logger.info("Iniciando fluxo OUTBOUND com leases (worker {}, lease de {}s)", self.worker_id, self.lease_seconds)
+        
+        self.connect()
+        results = {"sucesso": 0, "falha": 0}
+        
+        while (claim := self.query.claim_batch(self.worker_id, self.batch_size, self.lease_seconds)) is not None:
+            lease_id, documents = claim
             try:
-                if '_id' in tracos_wo:
-                    del tracos_wo['_id']
-                
+                self._run_pipeline(documents, results, lease_id=lease_id)
+            except BaseException:
+                # Interrupted mid-batch: hand the unacknowledged orders back instead of waiting for the expiry
+                self.query.release_lease(lease_id)
+                raise
+            # Failed orders keep their lease until it expires, which is their retry backoff
+        
+        if not any(results.values()):
+            logger.info("Nenhuma work order para sincronizar!")
+            return results
+        
+        logger.info("Fluxo OUTBOUND com leases concluído!")
+        logger.info("Resultado: {} sucesso, {} falha", results['sucesso'], results['falha'])
+        return results
+    
+    def _emit(self, tracos_wo: Dict) -> Dict | None:
+        # Runs on the writer pool; in bundle mode the ordered stage buffers the order instead
+        try:
+            with timed("translate_outbound"):
                 client_wo = self.translator.translate(tracos_wo)
+        except Exception as e:
+            logger.error("Erro ao processar #{}: {}", tracos_wo.get('number'), e)
+            return None
+        
+        if self.writer.bundle or self.write_json(client_wo):
+            return client_wo
+        return None
+    
+    def _run_pipeline(
+        self,
+        documents: Iterable[Dict],
+        results: Dict[str, int],
+        on_written: Callable[[Dict, bool], None] | None = None,
+        on_acknowledged: Callable[[bool], None] | None = None,
+        lease_id: str | None = None,
+    ):
+        # cursor (this thread) -> writer pool -> ordered acknowledgement thread
+        pending = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        errors: List[BaseException] = []
+        acknowledger = threading.Thread(
+            target=self._acknowledge_in_order,
+            args=(pending, results, on_written, on_acknowledged, lease_id, stop, errors),
+            name="outbound-ack",
+        )
+        acknowledger.start()
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="outbound-write") as pool:
+                for tracos_wo in documents:
+                    if stop.is_set():
+                        break
+                    # Blocks while the acknowledgement stage is a full queue behind
+                    pending.put((tracos_wo, pool.submit(self._emit, tracos_wo)))
+                    metrics.set("queue_depth", pending.qsize(), queue="outbound_ack")
+        finally:
+            pending.put(None)
+            acknowledger.join()
+        
+        if errors:
+            # Orders written but not acknowledged stay unsynced and are sent again next run
+            raise errors[0]
+    
+    def _acknowledge_in_order(
+        self,
+        pending: queue.Queue,
+        results: Dict[str, int],
+        on_written: Callable[[Dict, bool], None] | None,
+        on_acknowledged: Callable[[bool], None] | None,
+        lease_id: str | None,
+        stop: threading.Event,
+        errors: List[BaseException],
+    ):
+        # Futures are consumed in cursor order, so each order is acknowledged once and in sequence
+        written = []
+        drained = False
+        
+        try:
+            while (item := pending.get()) is not None:
+                tracos_wo, future = item
+                
+                try:
+                    client_wo = future.result()
+                    ok = client_wo is not None and (not self.writer.bundle or self.write_json(client_wo))
+                except Exception as e:
+                    logger.error("Erro ao processar #{}: {}", tracos_wo.get('number'), e)
+                    ok = False
                 
-                if self.write_json(client_wo):
-                    self.query.mark_as_synced(tracos_wo['number'])
-                    sucesso += 1
+                if ok:
+                    written.append(tracos_wo['number'])
                 else:
-                    falha += 1
+                    results["falha"] += 1
+                    metrics.inc("records_total", stage="outbound", outcome="failed")
+                if on_written:
+                    on_written(tracos_wo, ok)
                 
-            except Exception as e:
-                print(f" Erro ao processar #{tracos_wo.get('number')}: {e}")
-                falha += 1
+                if len(written) >= self.batch_size:
+                    self._acknowledge_batch(written, results, on_acknowledged, lease_id)
+                    written = []
+            
+            drained = True
+            if written:
+                self._acknowledge_batch(written, results, on_acknowledged, lease_id)
+        
+        except BaseException as e:
+            logger.error("Erro na confirmação das work orders, interrompendo o fluxo OUTBOUND: {}", e)
+            errors.append(e)
+            stop.set()
+            # Keep taking items until the cursor thread's sentinel, so it never blocks on a full queue
+            while not drained and pending.get() is not None:
+                pass
+    
+    def _acknowledge_batch(
+        self,
+        numbers: List[int],
+        results: Dict[str, int],
+        on_acknowledged: Callable[[bool], None] | None,
+        lease_id: str | None = None,
+    ):
+        with span("outbound.batch", size=len(numbers)):
+            acknowledged = self._acknowledge(numbers, results, lease_id)
+        if on_acknowledged:
+            on_acknowledged(acknowledged)
+    
+    def tail(self):
+        logger.info("Acompanhando mudanças em workorders (change stream)...")
+        
+        self.connect()
+        resume_token = self.query.checkpoints.load(self.RESUME_TOKEN_CHECKPOINT)
+        if resume_token:
+            logger.info("Retomando a partir do último resume token salvo")
         
-        print(f"\n Fluxo OUTBOUND concluído!")
-        print(f" Resultado: {sucesso} sucesso, {falha} falha")
+        for tracos_wo, resume_token in self.query.watch_changes(resume_token):
+            # Deleted documents and our own mark_as_synced updates have nothing to send
+            if tracos_wo is not None and not tracos_wo.pop("isSynced", False):
+                try:
+                    client_wo = self.translator.translate(tracos_wo)
+                    if self.write_json(client_wo) and self.writer.flush():
+                        with timed("mark_synced"):
+                            self.query.mark_as_synced(tracos_wo['number'])
+                        metrics.inc("records_total", stage="outbound", outcome="synced")
+                
+                except Exception as e:
+                    logger.error("Erro ao processar #{}: {}", tracos_wo.get('number'), e)
+            
+            self.query.checkpoints.save(self.RESUME_TOKEN_CHECKPOINT, resume_token)
+    
+    def _acknowledge(self, numbers: List[int], results: Dict[str, int], lease_id: str | None = None) -> bool:
+        if self.writer.flush():
+            with timed("mark_synced"):
+                if lease_id is None:
+                    marked = self.query.mark_many_as_synced(numbers)
+                else:
+                    marked = self.query.complete_lease(lease_id, numbers)
+            if marked:
+                results["sucesso"] += len(numbers)
+                metrics.inc("records_total", len(numbers), stage="outbound", outcome="synced")
+                return True
+        results["falha"] += len(numbers)
+        metrics.inc("records_total", len(numbers), stage="outbound", outcome="failed")
+        return False
     
     def close(self):
-        self.query.close()
+        if self._query is not None:
+            self._query.close()
 
 
 if __name__ == "__main__":
-    print("="*60)
-    print(" TESTE COMPLETO: OUTBOUND SERVICE")
-    print("="*60 + "\n")
+    configure_logging()
+    logger.info("TESTE COMPLETO: OUTBOUND SERVICE")
     
     service = OutboundService()
     service.process()
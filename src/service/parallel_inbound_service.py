@@ -0,0 +1,195 @@
+import hashlib
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Tuple
+from loguru import logger
+
+from src.adapters.bundles import BundleError, file_digest, is_bundle
+from src.adapters.client_adapter import ClientAdapter
+from src.adapters.inbound_manifest import SourceFile
+from src.env import load_env
+from src.translators.client_to_tracos import ClientToTracOSTranslator
+from src.translators.columnar import client_columns
+from src.log_config import configure_logging
+from src.metrics import metrics
+from src.service.inbound_service import InboundService, chunked
+
+load_env()
+
+_worker_adapter = None
+_worker_translator = None
+
+
+def _init_worker():
+    global _worker_adapter, _worker_translator
+    _worker_adapter = ClientAdapter()
+    _worker_translator = ClientToTracOSTranslator()
+
+
+def _read_bundle(file_path: str, records: List, sources: List[SourceFile] | None):
+    bundle = None
+    if sources is not None:
+        try:
+            stat = os.stat(file_path)
+            bundle = SourceFile(file_path, stat.st_mtime_ns, stat.st_size, file_digest(file_path), None, None)
+        except OSError as e:
+            logger.error("Erro inesperado ao ler {}: {}", os.path.basename(file_path), e)
+            return
+    
+    read = []
+    try:
+        for client_data in _worker_adapter.iter_bundle(file_path):
+            records.append(client_data)
+            read.append(client_data)
+    except BundleError:
+        # Its orders are still written, but the bundle is not recorded or archived until it reads cleanly
+        return
+    
+    if bundle is not None:
+        sources.extend(bundle._replace(order_no=wo.orderNo, last_update=wo.lastUpdateDate) for wo in read)
+
+
+def translate_chunk(file_paths: List[str], with_sources: bool = False) -> Tuple[List[Dict], List[SourceFile], int]:
+    # Runs inside a worker process: read, validate and translate, send back only TracOS documents
+    records = []
+    sources = []
+    
+    for file_path in file_paths:
+        if is_bundle(file_path):
+            _read_bundle(file_path, records, sources if with_sources else None)
+            continue
+        
+        raw = _worker_adapter._read_file(file_path)
+        if raw is None:
+            continue
+        client_data = _worker_adapter._decode_work_order(raw, file_path)
+        if client_data is None:
+            continue
+        
+        records.append(client_data)
+        if with_sources:
+            stat = os.stat(file_path)
+            sources.append(SourceFile(
+                file_path, stat.st_mtime_ns, stat.st_size, hashlib.sha256(raw).hexdigest(),
+                client_data.orderNo, client_data.lastUpdateDate
+            ))
+    
+    try:
+        return _worker_translator.translate_batch(client_columns(records)), sources, 0
+    except Exception as e:
+        logger.warning("Tradução em lote falhou ({}), traduzindo registro a registro", e)
+    
+    translated = []
+    failed_numbers = set()
+    for client_data in records:
+        try:
+            translated.append(_worker_translator.translate_record(client_data).to_document())
+        except Exception as e:
+            logger.error("Erro ao processar #{}: {}", client_data.orderNo, e)
+            failed_numbers.add(client_data.orderNo)
+    
+    # Like the sequential path, a file with any failed order is neither recorded nor archived, so it is read again
+    failed_paths = {source.path for source in sources if source.order_no in failed_numbers}
+    sources = [source for source in sources if source.path not in failed_paths]
+    return translated, sources, len(records) - len(translated)
+
+
+class ParallelInboundService(InboundService):
+    
+    DEFAULT_CHUNK_SIZE = 500
+    
+    def __init__(
+        self,
+        batch_size: int | None = None,
+        workers: int | None = None,
+        chunk_size: int | None = None,
+        incremental: bool | None = None,
+    ):
+        super().__init__(batch_size, incremental)
+        self.workers = workers or int(os.getenv("INBOUND_WORKERS", os.cpu_count() or 1))
+        self.chunk_size = chunk_size or int(os.getenv("INBOUND_CHUNK_SIZE", self.DEFAULT_CHUNK_SIZE))
+    
+    def process(self, full_resync: bool = False) -> Dict[str, int]:
+        logger.info("Iniciando fluxo INBOUND (paralelo)")
+        logger.info("{} processos, blocos de {} arquivos, lotes de {}...", self.workers, self.chunk_size, self.batch_size)
+        
+        totals = {"inserted": 0, "updated": 0, "unchanged": 0, "failed": 0}
+        batch = []
+        paths = (
+            entry.path for entry in self.client_adapter.iter_changed_files(full_resync)
+            if not self.client_adapter.has_unchanged_content(entry, full_resync)
+        )
+        with_sources = self.client_adapter.tracks_sources
+        
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as executor:
+            pending = deque()
+            chunks = chunked(paths, self.chunk_size)
+            
+            # Keep a bounded number of chunks in flight and consume them in submission order
+            for chunk in chunks:
+                pending.append((chunk, self._submit(executor, chunk, with_sources)))
+                if len(pending) >= self.workers * 2:
+                    batch = self._consume(pending.popleft(), batch, totals)
+            
+            while pending:
+                batch = self._consume(pending.popleft(), batch, totals)
+        
+        if batch:
+            self._flush(batch, totals)
+        
+        self.client_adapter.discard_sources()
+        self.client_adapter.finish_run()
+        
+        if not any(totals.values()):
+            logger.info("Nenhuma work order válida encontrada!")
+            return totals
+        
+        logger.info("Fluxo INBOUND concluído!")
+        logger.info(
+            "Resultado: {inserted} inseridas, {updated} atualizadas, {unchanged} sem alteração, {failed} falha",
+            **totals
+        )
+        return totals
+    
+    @staticmethod
+    def _submit(executor: ProcessPoolExecutor, chunk: List[str], with_sources: bool) -> Future:
+        try:
+            return executor.submit(translate_chunk, chunk, with_sources)
+        except BrokenProcessPool as e:
+            # A crashed worker breaks the pool; the remaining chunks fail the same way instead of aborting the run
+            future = Future()
+            future.set_exception(e)
+            return future
+    
+    def _consume(self, submitted: Tuple[List[str], Future], batch: List[Dict], totals: Dict[str, int]) -> List[Dict]:
+        chunk, future = submitted
+        try:
+            translated, sources, failed = future.result()
+        except Exception as e:
+            # Nothing from the chunk was staged, so its files stay in place and are read again next run
+            logger.error("Erro em processo de leitura, {} arquivos não processados: {}", len(chunk), e)
+            totals["failed"] += len(chunk)
+            metrics.inc("records_total", len(chunk), stage="inbound", outcome="failed")
+            return batch
+        
+        for source in sources:
+            self.client_adapter.stage_source(source)
+        totals["failed"] += failed
+        metrics.inc("records_total", failed, stage="inbound", outcome="failed")
+        batch.extend(translated)
+        
+        while len(batch) >= self.batch_size:
+            self._flush(batch[:self.batch_size], totals)
+            batch = batch[self.batch_size:]
+        return batch
+
+
+if __name__ == "__main__":
+    configure_logging()
+    logger.info("TESTE COMPLETO: INBOUND SERVICE (PARALELO)")
+    
+    service = ParallelInboundService()
+    service.process()
+    service.close()
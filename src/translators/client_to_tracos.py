@@ -1,43 +1,91 @@
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List
+
+from src.models.workorders import ClientWorkOrder, TracOSWorkOrder
+from src.translators.fingerprint import fingerprint
+from src.translators.columnar import (
+    STATUS_PRIORITY, as_list, batch_size, column, normalize, required_column, status_column
+)
+from src.translators.timestamps import parse_timestamp, parse_timestamps, utc_now
 
 
 class ClientToTracOSTranslator:
     
     def translate(self, client_data: Dict) -> Dict:
+        return self.translate_record(ClientWorkOrder.from_dict(client_data)).to_document()
+    
+    def translate_record(self, client: ClientWorkOrder) -> TracOSWorkOrder:
+        created_at = self._parse_date(client.creationDate)
+        updated_at = self._parse_date(client.lastUpdateDate)
+        deleted_at = self._parse_date(client.deletedDate) if client.deletedDate else None
+        status = self._calculate_status(client)
         
-        status = self._calculate_status(client_data)
+        return TracOSWorkOrder(
+            number=client.orderNo,
+            status=status,
+            title=client.summary,
+            description=client.summary,
+            createdAt=created_at,
+            updatedAt=updated_at,
+            deleted=client.isDeleted,
+            deletedAt=deleted_at,
+            isSynced=False,
+            syncedAt=None,
+            contentHash=fingerprint((
+                client.orderNo, status, client.summary, client.summary,
+                created_at, updated_at, client.isDeleted, deleted_at
+            )),
+        )
+    
+    def translate_batch(self, batch) -> List[Dict]:
+        columns = normalize(batch)
+        size = batch_size(columns)
         
-        tracos_data = {
-            "number": client_data["orderNo"],
-            "status": status,
-            "title": client_data["summary"],
-            "description": client_data["summary"],
-            "createdAt": self._parse_date(client_data["creationDate"]),
-            "updatedAt": self._parse_date(client_data["lastUpdateDate"]),
-            "deleted": client_data.get("isDeleted", False),
-            "deletedAt": self._parse_date(client_data.get("deletedDate")) if client_data.get("deletedDate") else None,
-            "isSynced": False,
-            "syncedAt": None
-        }
+        numbers = required_column(columns, "orderNo")
+        summaries = required_column(columns, "summary")
+        created = parse_timestamps(required_column(columns, "creationDate"))
+        updated = parse_timestamps(required_column(columns, "lastUpdateDate"))
+        deleted_at = parse_timestamps(as_list(column(columns, "deletedDate", size)))
+        deleted = as_list(column(columns, "isDeleted", size, False))
+        statuses = status_column({flag: column(columns, flag, size, False) for flag, _ in STATUS_PRIORITY}, size)
+        # The fingerprint serializes datetimes with isoformat(); doing it once per distinct value
+        # keeps the hash byte-identical to translate_record
+        iso = {value: value.isoformat() for value in {*created, *updated, *deleted_at} if value is not None}
         
-        return tracos_data
+        return [
+            {
+                "number": number,
+                "status": status,
+                "title": summary,
+                "description": summary,
+                "createdAt": created_at,
+                "updatedAt": updated_at,
+                "deleted": is_deleted,
+                "deletedAt": deleted_date,
+                "isSynced": False,
+                "syncedAt": None,
+                "contentHash": fingerprint((
+                    number, status, summary, summary,
+                    iso[created_at], iso[updated_at], is_deleted, iso.get(deleted_date)
+                )),
+            }
+            for number, status, summary, created_at, updated_at, is_deleted, deleted_date
+            in zip(numbers, statuses, summaries, created, updated, deleted, deleted_at)
+        ]
     
-    def _calculate_status(self, data: Dict) -> str:
-        if data.get("isCanceled"):
+    def _calculate_status(self, client: ClientWorkOrder) -> str:
+        if client.isCanceled:
             return "cancelled"
-        elif data.get("isDone"):
+        elif client.isDone:
             return "completed"
-        elif data.get("isOnHold"):
+        elif client.isOnHold:
             return "on_hold"
-        elif data.get("isPending"):
+        elif client.isPending:
             return "pending"
         else:
             return "in_progress"
     
     def _parse_date(self, date_str: str) -> datetime:
         if not date_str:
-            return datetime.utcnow()
-        return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-
-
+            return utc_now()
+        return parse_timestamp(date_str)
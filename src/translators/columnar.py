@@ -0,0 +1,103 @@
+import sys
+from dataclasses import MISSING, fields
+from typing import Dict, Iterable, List, Sequence
+
+from src.models.workorders import ClientWorkOrder, TracOSWorkOrder, ValidationError
+
+Columns = Dict[str, Sequence]
+
+STATUS_PRIORITY = (
+    ("isCanceled", "cancelled"),
+    ("isDone", "completed"),
+    ("isOnHold", "on_hold"),
+    ("isPending", "pending"),
+)
+DEFAULT_STATUS = "in_progress"
+
+
+def to_columns(rows: Iterable, record_type) -> Columns:
+    rows = list(rows)
+    names = record_type.__slots__
+    if rows and isinstance(rows[0], record_type):
+        return {name: [getattr(row, name) for row in rows] for name in names}
+    
+    # Missing keys get the record defaults, exactly as from_dict/from_document would
+    defaults = {field.name: field.default for field in fields(record_type) if field.default is not MISSING}
+    return {name: [row.get(name, defaults.get(name)) for row in rows] for name in names}
+
+
+def client_columns(records: Iterable[ClientWorkOrder | Dict]) -> Columns:
+    return to_columns(records, ClientWorkOrder)
+
+
+def tracos_columns(documents: Iterable[TracOSWorkOrder | Dict]) -> Columns:
+    return to_columns(documents, TracOSWorkOrder)
+
+
+def normalize(batch) -> Columns:
+    # Accepts a dict of lists / NumPy arrays or a pyarrow Table
+    if hasattr(batch, "to_pydict"):
+        batch = batch.to_pydict()
+    return dict(batch)
+
+
+def as_list(values) -> List:
+    # Document values must be plain int/bool/str, which BSON and the fingerprint accept
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
+def _numpy():
+    # Arrays only come from callers that already imported NumPy, so it is never loaded here
+    return sys.modules.get("numpy")
+
+
+def is_array(values) -> bool:
+    np = _numpy()
+    return np is not None and isinstance(values, np.ndarray)
+
+
+def batch_size(columns: Columns) -> int:
+    sizes = {len(values) for values in columns.values()}
+    if len(sizes) > 1:
+        raise ValueError(f"Colunas com tamanhos diferentes: {sorted(sizes)}")
+    return sizes.pop() if sizes else 0
+
+
+def column(columns: Columns, name: str, size: int, default=None) -> Sequence:
+    if name not in columns:
+        return [default] * size
+    return columns[name]
+
+
+def required_column(columns: Columns, name: str) -> List:
+    if name not in columns:
+        raise ValidationError(name, "faltando")
+    values = as_list(columns[name])
+    for value in values:
+        if value is None or value == "":
+            raise ValidationError(name, "vazio")
+    return values
+
+
+def status_column(flags: Dict[str, Sequence[bool]], size: int) -> List[str]:
+    # Vectorized masks pay off only when the flags already arrive as arrays; converting
+    # Python lists to arrays costs more than the loop below
+    if size and any(is_array(values) for values in flags.values()):
+        np = _numpy()
+        masks = [np.asarray(flags[flag], dtype=bool) for flag, _ in STATUS_PRIORITY]
+        labels = [status for _, status in STATUS_PRIORITY]
+        return np.select(masks, labels, default=DEFAULT_STATUS).tolist()
+    
+    statuses = [DEFAULT_STATUS] * size
+    # Lowest priority first, so higher-priority flags overwrite it
+    for flag, status in reversed(STATUS_PRIORITY):
+        for index, value in enumerate(flags[flag]):
+            if value:
+                statuses[index] = status
+    return statuses
+
+
+def status_flag_columns(statuses: Sequence[str]) -> Dict[str, List[bool]]:
+    if is_array(statuses):
+        return {flag: (statuses == status).tolist() for flag, status in STATUS_PRIORITY}
+    return {flag: [value == status for value in statuses] for flag, status in STATUS_PRIORITY}
@@ -0,0 +1,27 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, Sequence
+
+# Business fields only: sync bookkeeping (isSynced, syncedAt) must not change the fingerprint
+HASHED_FIELDS = ("number", "status", "title", "description", "createdAt", "updatedAt", "deleted", "deletedAt")
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+# One shared encoder: json.dumps with custom options builds a new JSONEncoder per call
+_ENCODER = json.JSONEncoder(default=_default, separators=(",", ":"))
+
+
+def fingerprint(values: Sequence) -> str:
+    # values must follow HASHED_FIELDS order
+    payload = _ENCODER.encode(list(values))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def content_hash(tracos_data: Dict) -> str:
+    return fingerprint([tracos_data.get(field) for field in HASHED_FIELDS])
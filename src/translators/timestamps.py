@@ -0,0 +1,58 @@
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Iterable, List
+
+UTC = timezone.utc
+CACHE_SIZE = int(os.getenv("TIMESTAMP_CACHE_SIZE", 4096))
+
+
+def _to_utc(value: datetime) -> datetime:
+    # fromisoformat maps both "Z" and "+00:00" to the timezone.utc singleton
+    if value.tzinfo is UTC:
+        return value
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_timestamp(value: str) -> datetime:
+    return _to_utc(datetime.fromisoformat(value))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _format_datetime(value: datetime) -> str:
+    return _to_utc(value).isoformat()[:-6] + "Z"
+
+
+def format_timestamp(value) -> str | None:
+    if isinstance(value, datetime):
+        return _format_datetime(value)
+    if isinstance(value, str):
+        return value
+    return None
+
+
+def utc_now() -> datetime:
+    return datetime.now(UTC)
+
+
+def cache_info() -> dict:
+    return {"parse": parse_timestamp.cache_info(), "format": _format_datetime.cache_info()}
+
+
+def parse_timestamps(values: Iterable[str | None]) -> List[datetime | None]:
+    # Bulk variant: each distinct value is parsed once, without churning the shared cache
+    values = list(values)
+    parsed = {value: _to_utc(datetime.fromisoformat(value)) for value in set(values) if value}
+    return [parsed.get(value) if value else None for value in values]
+
+
+def format_timestamps(values: Iterable) -> List[str | None]:
+    values = list(values)
+    formatted = {
+        value: _to_utc(value).isoformat()[:-6] + "Z"
+        for value in set(values) if isinstance(value, datetime)
+    }
+    return [formatted[value] if isinstance(value, datetime) else format_timestamp(value) for value in values]
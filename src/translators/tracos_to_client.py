@@ -1,29 +1,66 @@
-from datetime import datetime
-from typing import Dict
+from typing import Dict, List
+
+from src.models.workorders import ClientWorkOrder, TracOSWorkOrder
+from src.translators.columnar import as_list, batch_size, column, normalize, status_flag_columns
+from src.translators.timestamps import format_timestamp, format_timestamps
 
 
 class TracOSToClientTranslator:
     
     def translate(self, tracos_data: Dict) -> Dict:
-     
-        status_flags = self._calculate_status_flags(tracos_data.get("status", "in_progress"))
+        return self.translate_record(TracOSWorkOrder.from_document(tracos_data)).to_dict()
+    
+    def translate_record(self, tracos: TracOSWorkOrder) -> ClientWorkOrder:
+        status_flags = self._calculate_status_flags(tracos.status)
         
-        client_data = {
-            "orderNo": tracos_data["number"],
-            "isActive": True,
-            "isCanceled": status_flags["isCanceled"],
-            "isDeleted": tracos_data.get("deleted", False),
-            "isDone": status_flags["isDone"],
-            "isOnHold": status_flags["isOnHold"],
-            "isPending": status_flags["isPending"],
-            "isSynced": True,
-            "summary": tracos_data["title"],
-            "creationDate": self._format_date(tracos_data["createdAt"]),
-            "lastUpdateDate": self._format_date(tracos_data["updatedAt"]),
-            "deletedDate": self._format_date(tracos_data.get("deletedAt")) if tracos_data.get("deletedAt") else None,
-        }
+        return ClientWorkOrder(
+            orderNo=tracos.number,
+            isActive=True,
+            isCanceled=status_flags["isCanceled"],
+            isDeleted=tracos.deleted,
+            isDone=status_flags["isDone"],
+            isOnHold=status_flags["isOnHold"],
+            isPending=status_flags["isPending"],
+            isSynced=True,
+            summary=tracos.title,
+            creationDate=self._format_date(tracos.createdAt),
+            lastUpdateDate=self._format_date(tracos.updatedAt),
+            deletedDate=self._format_date(tracos.deletedAt) if tracos.deletedAt else None,
+        )
+    
+    def translate_batch(self, batch) -> List[Dict]:
+        columns = normalize(batch)
+        size = batch_size(columns)
+        
+        numbers = as_list(columns["number"])
+        titles = as_list(columns["title"])
+        created = format_timestamps(as_list(columns["createdAt"]))
+        updated = format_timestamps(as_list(columns["updatedAt"]))
+        deleted_at = format_timestamps(as_list(column(columns, "deletedAt", size)))
+        deleted = as_list(column(columns, "deleted", size, False))
+        flags = status_flag_columns(column(columns, "status", size, "in_progress"))
         
-        return client_data
+        return [
+            {
+                "orderNo": number,
+                "isActive": True,
+                "isCanceled": is_canceled,
+                "isDeleted": is_deleted,
+                "isDone": is_done,
+                "isOnHold": is_on_hold,
+                "isPending": is_pending,
+                "isSynced": True,
+                "summary": title,
+                "creationDate": created_date,
+                "lastUpdateDate": updated_date,
+                "deletedDate": deleted_date or None,
+            }
+            for number, is_canceled, is_deleted, is_done, is_on_hold, is_pending, title, created_date, updated_date, deleted_date
+            in zip(
+                numbers, flags["isCanceled"], deleted, flags["isDone"], flags["isOnHold"], flags["isPending"],
+                titles, created, updated, deleted_at
+            )
+        ]
     
     def _calculate_status_flags(self, status: str) -> Dict[str, bool]:
         flags = {
@@ -45,11 +82,4 @@ class TracOSToClientTranslator:
         return flags
     
     def _format_date(self, date_value) -> str:
-        if date_value is None:
-            return None
-        if isinstance(date_value, str):
-            return date_value
-        if isinstance(date_value, datetime):
-            return date_value.isoformat().replace('+00:00', 'Z')
-        return None
-      
+        return format_timestamp(date_value)
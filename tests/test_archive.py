@@ -0,0 +1,94 @@
+import gzip
+import json
+import sys
+import os
+import tarfile
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.adapters.archive import InboundArchive
+from src.adapters.client_adapter import ClientAdapter
+from src.adapters.inbound_manifest import SourceFile
+
+
+def write_order(directory, order_no):
+    path = directory / f"{order_no}.json"
+    path.write_text(json.dumps({
+        "orderNo": order_no,
+        "summary": f"Test {order_no}",
+        "creationDate": "2024-12-08T10:00:00Z",
+        "lastUpdateDate": "2024-12-08T11:00:00Z"
+    }))
+    return path
+
+
+def source(path, order_no):
+    stat = path.stat()
+    return SourceFile(str(path), stat.st_mtime_ns, stat.st_size, "", order_no, "")
+
+
+def today(archive_dir):
+    now = datetime.now(timezone.utc)
+    return archive_dir / f"{now:%Y}" / f"{now:%m}" / f"{now:%d}"
+
+
+def test_only_committed_files_are_archived(monkeypatch, tmp_path):
+    for order_no in (1, 2):
+        write_order(tmp_path, order_no)
+    monkeypatch.setenv("DATA_INBOUND_DIR", str(tmp_path))
+    monkeypatch.setenv("INBOUND_ARCHIVE", "move")
+    adapter = ClientAdapter()
+    
+    assert sorted(wo.orderNo for wo in adapter.iter_inbound_files()) == [1, 2]
+    # Order 2 failed to write, so its file stays pending
+    adapter.commit_sources([1])
+    adapter.discard_sources()
+    adapter.finish_run()
+    
+    assert [p.name for p in tmp_path.glob("*.json")] == ["2.json"]
+    assert (today(tmp_path / "archive") / "1.json").exists()
+
+
+def test_gzip_mode_skips_files_rewritten_after_read(tmp_path):
+    inbound = tmp_path / "inbound"
+    inbound.mkdir()
+    kept, rewritten = write_order(inbound, 1), write_order(inbound, 2)
+    sources = [source(kept, 1), source(rewritten, 2)]
+    rewritten.write_text(rewritten.read_text() + "\n")
+    archive = InboundArchive(tmp_path / "archive", mode="gzip")
+    
+    assert archive.store(sources) == 1
+    
+    assert not kept.exists() and rewritten.exists()
+    with gzip.open(today(tmp_path / "archive") / "1.json.gz") as archived:
+        assert json.load(archived)["orderNo"] == 1
+
+
+def test_tar_mode_bundles_the_run(tmp_path):
+    inbound = tmp_path / "inbound"
+    inbound.mkdir()
+    paths = [write_order(inbound, n) for n in (1, 2, 3)]
+    archive = InboundArchive(tmp_path / "archive", mode="tar", compression="gz")
+    
+    archive.store(source(path, n) for n, path in zip((1, 2, 3), paths))
+    assert all(path.exists() for path in paths)
+    bundle = archive.flush()
+    
+    assert not any(path.exists() for path in paths)
+    with tarfile.open(bundle) as tar:
+        assert sorted(tar.getnames()) == ["1.json", "2.json", "3.json"]
+    assert archive.flush() is None
+
+
+def test_retention_removes_old_partitions(tmp_path):
+    archive = InboundArchive(tmp_path, mode="move", retention_days=7)
+    old = archive.partition(datetime(2024, 1, 1, tzinfo=timezone.utc))
+    recent = archive.partition(datetime(2024, 1, 20, tzinfo=timezone.utc))
+    (old / "1.json").write_text("{}")
+    (recent / "2.json").write_text("{}")
+    
+    assert archive.prune(datetime(2024, 1, 21, tzinfo=timezone.utc)) == 1
+    
+    assert not old.exists()
+    assert (recent / "2.json").exists()
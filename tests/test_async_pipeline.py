@@ -0,0 +1,276 @@
+import asyncio
+import json
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo.errors import BulkWriteError
+from pymongo.results import BulkWriteResult
+
+import src.service.async_inbound_service as async_inbound_module
+import src.service.async_outbound_service as async_outbound_module
+from src.service.async_inbound_service import AsyncInboundService
+from src.service.async_outbound_service import AsyncOutboundService
+
+
+class FakeCursor:
+    
+    def __init__(self, documents):
+        self.documents = documents
+    
+    async def to_list(self, length):
+        return self.documents
+
+
+class FakeAsyncCollection:
+    
+    def __init__(self, failing=(), delay=0):
+        self.failing = set(failing)
+        self.delay = delay
+        self.written = []
+        self.active = 0
+        self.max_active = 0
+    
+    def find(self, query, projection=None):
+        return FakeCursor([])
+    
+    async def bulk_write(self, operations, ordered=True):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        
+        numbers = [op._filter["number"] for op in operations]
+        self.written.extend(n for n in numbers if n not in self.failing)
+        errors = [i for i, n in enumerate(numbers) if n in self.failing]
+        if errors:
+            raise BulkWriteError({
+                "writeErrors": [{"index": i, "code": 121, "errmsg": "validation failed"} for i in errors],
+                "upserted": [],
+            })
+        return BulkWriteResult({"upserted": []}, acknowledged=True)
+
+
+class FakeAsyncDb:
+    
+    def __init__(self, collection):
+        self.collection = collection
+        self.closed = False
+    
+    def get_collection(self, name):
+        return self.collection
+    
+    def close(self):
+        self.closed = True
+
+
+class FakeAsyncQuery:
+    
+    def __init__(self, work_orders, events):
+        self.work_orders = work_orders
+        self.events = events
+        self.collection = None
+        self.pending = True
+    
+    async def connect(self):
+        self.collection = object()
+    
+    async def has_unsynced(self):
+        return self.pending
+    
+    async def iter_unsynced_work_orders(self, batch_size):
+        for work_order in self.work_orders:
+            yield work_order
+    
+    async def mark_many_as_synced(self, numbers):
+        self.events.append(("ack", sorted(numbers)))
+        return True
+    
+    def close(self):
+        pass
+
+
+def write_orders(directory, numbers):
+    for order_no in numbers:
+        (directory / f"{order_no}.json").write_text(json.dumps({
+            "orderNo": order_no,
+            "summary": f"Test {order_no}",
+            "creationDate": "2024-12-08T10:00:00Z",
+            "lastUpdateDate": "2024-12-08T11:00:00Z"
+        }))
+
+
+def make_inbound(monkeypatch, tmp_path, collection, archive="move", **options):
+    db = FakeAsyncDb(collection)
+    
+    async def get_async_db():
+        return db
+    
+    monkeypatch.setenv("DATA_INBOUND_DIR", str(tmp_path))
+    monkeypatch.setenv("INBOUND_ARCHIVE", archive)
+    monkeypatch.setattr(async_inbound_module, "get_async_db", get_async_db)
+    return AsyncInboundService(incremental=False, **options), db
+
+
+def tracos_order(number):
+    return {
+        "number": number,
+        "status": "pending",
+        "title": f"Example workorder #{number}",
+        "createdAt": datetime(2024, 12, 8, 10, 0, 0),
+        "updatedAt": datetime(2024, 12, 8, 11, number, 0),
+        "deleted": False,
+        "deletedAt": None,
+    }
+
+
+def make_outbound(monkeypatch, tmp_path, work_orders, **options):
+    events = []
+    query = FakeAsyncQuery(work_orders, events)
+    monkeypatch.setenv("DATA_OUTBOUND_DIR", str(tmp_path))
+    monkeypatch.setenv("OUTBOUND_FORMAT", "ndjson")
+    monkeypatch.setattr(async_outbound_module, "AsyncOutboundQuery", lambda: query)
+    service = AsyncOutboundService(**options)
+    
+    flush = service.writer.flush
+    
+    def recorded_flush():
+        flushed = flush()
+        events.append(("flush", sorted(p.name for p in tmp_path.glob("*.ndjson"))))
+        return flushed
+    
+    service.writer.flush = recorded_flush
+    return service, query, events
+
+
+def test_async_inbound_commits_only_written_orders(monkeypatch, tmp_path):
+    write_orders(tmp_path, range(1, 6))
+    collection = FakeAsyncCollection(failing=[3])
+    service, db = make_inbound(monkeypatch, tmp_path, collection, batch_size=2)
+    
+    totals = asyncio.run(service.process())
+    service.close()
+    
+    assert totals == {"inserted": 0, "updated": 4, "unchanged": 0, "failed": 1}
+    assert sorted(collection.written) == [1, 2, 4, 5]
+    # Only the failed order's file stays behind for the next run
+    assert sorted(p.name for p in tmp_path.glob("*.json")) == ["3.json"]
+    assert sorted(p.name for p in (tmp_path / "archive").rglob("*.json")) == ["1.json", "2.json", "4.json", "5.json"]
+    assert db.closed
+
+
+def test_async_inbound_without_files_does_not_connect(monkeypatch, tmp_path):
+    service, db = make_inbound(monkeypatch, tmp_path, FakeAsyncCollection())
+    
+    assert asyncio.run(service.process()) == {"inserted": 0, "updated": 0, "unchanged": 0, "failed": 0}
+    assert service.db is None
+
+
+def test_async_inbound_keeps_the_lines_of_a_truncated_bundle(monkeypatch, tmp_path):
+    import gzip
+    
+    lines = (
+        json.dumps({
+            "orderNo": order_no,
+            "summary": os.urandom(64).hex(),
+            "creationDate": "2024-12-08T10:00:00Z",
+            "lastUpdateDate": "2024-12-08T11:00:00Z"
+        }) + "\n"
+        for order_no in range(1, 20001)
+    )
+    compressed = gzip.compress("".join(lines).encode())
+    (tmp_path / "export.ndjson.gz").write_bytes(compressed[:len(compressed) // 2])
+    collection = FakeAsyncCollection()
+    service, _ = make_inbound(monkeypatch, tmp_path, collection, archive="none", batch_size=1000)
+    
+    totals = asyncio.run(service.process())
+    
+    assert totals["failed"] == 0
+    assert collection.written and sorted(collection.written) == list(range(1, len(collection.written) + 1))
+    # The bundle backs off instead of being read again right away
+    assert [entry.name for entry in service.client_adapter.iter_changed_files()] == []
+    service.close()
+
+
+def test_async_inbound_bounds_concurrent_writes(monkeypatch, tmp_path):
+    write_orders(tmp_path, range(1, 13))
+    collection = FakeAsyncCollection(delay=0.01)
+    service, _ = make_inbound(monkeypatch, tmp_path, collection, batch_size=1, concurrency=3)
+    
+    totals = asyncio.run(service.process())
+    service.close()
+    
+    assert totals["updated"] == 12
+    assert collection.max_active == 3
+
+
+def test_async_outbound_acknowledges_after_flush(monkeypatch, tmp_path):
+    service, query, events = make_outbound(monkeypatch, tmp_path, [tracos_order(n) for n in range(1, 6)], batch_size=2)
+    
+    results = asyncio.run(service.process())
+    
+    assert results == {"sucesso": 5, "falha": 0}
+    acknowledged = [numbers for kind, numbers in events if kind == "ack"]
+    assert sorted(sum(acknowledged, [])) == [1, 2, 3, 4, 5]
+    # Every acknowledgement follows a flush that put one more bundle on disk
+    for index, (kind, _) in enumerate(events):
+        if kind == "ack":
+            assert events[index - 1][0] == "flush"
+    bundles = [names for kind, names in events if kind == "flush"]
+    assert [len(names) for names in bundles] == list(range(1, len(acknowledged) + 1))
+
+
+def test_async_outbound_does_not_acknowledge_when_flush_fails(monkeypatch, tmp_path):
+    service, query, events = make_outbound(monkeypatch, tmp_path, [tracos_order(n) for n in range(1, 4)], batch_size=10)
+    service.writer.write_bundle = lambda work_orders: None
+    
+    results = asyncio.run(service.process())
+    
+    assert results == {"sucesso": 0, "falha": 3}
+    assert [kind for kind, _ in events] == ["flush"]
+
+
+def test_async_outbound_does_not_acknowledge_failed_orders(monkeypatch, tmp_path):
+    broken = {"number": 2, "status": "pending"}
+    service, query, events = make_outbound(monkeypatch, tmp_path, [tracos_order(1), broken, tracos_order(3)], batch_size=10)
+    
+    results = asyncio.run(service.process())
+    
+    assert results == {"sucesso": 2, "falha": 1}
+    assert [numbers for kind, numbers in events if kind == "ack"] == [[1, 3]]
+
+
+def test_idle_async_outbound_skips_the_cursor(monkeypatch, tmp_path):
+    service, query, events = make_outbound(monkeypatch, tmp_path, [tracos_order(1)])
+    query.pending = False
+    
+    assert asyncio.run(service.process()) == {"sucesso": 0, "falha": 0}
+    assert events == []
+
+
+def test_async_connection_creates_the_shared_indexes(monkeypatch):
+    import src.database.async_connection as async_connection_module
+    from types import SimpleNamespace
+    
+    delegate = object()
+    received = []
+    monkeypatch.setattr(async_connection_module, "ensure_indexes", lambda collection: received.append(collection) or [])
+    connection = async_connection_module.AsyncDatabaseConnection()
+    monkeypatch.setattr(async_connection_module.AsyncDatabaseConnection, "_db", {"workorders": SimpleNamespace(delegate=delegate)})
+    
+    asyncio.run(connection._ensure_indexes())
+    
+    assert received == [delegate]
+
+
+def test_async_outbound_only_creates_the_outbound_directory(monkeypatch, tmp_path):
+    monkeypatch.setenv("DATA_INBOUND_DIR", str(tmp_path / "inbound"))
+    monkeypatch.setenv("INBOUND_ARCHIVE", "move")
+    service, _, _ = make_outbound(monkeypatch, tmp_path / "outbound", [])
+    service.close()
+    
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["outbound"]
@@ -0,0 +1,85 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from loguru import logger
+
+from benchmarks.bench_pipeline import compare, compare_cold_start, percentile, run_scenario
+from benchmarks.loadgen import LoadProfile, client_work_orders, parse_mix
+from src.metrics import metrics
+
+
+@pytest.fixture
+def isolated_env(monkeypatch):
+    # run_scenario points the services at its own directories and database
+    for name in ("MONGO_DATABASE", "MONGO_ENSURE_INDEXES", "DATA_INBOUND_DIR", "DATA_OUTBOUND_DIR", "INBOUND_INCREMENTAL", "QUARANTINE_MIN_AGE"):
+        monkeypatch.setenv(name, os.getenv(name, ""))
+    monkeypatch.setattr(metrics, "keep_samples", False)
+    yield
+    metrics.reset()
+    logger.remove()
+    logger.add(sys.stderr)
+
+
+def test_load_profile_is_deterministic_and_follows_mix():
+    profile = LoadProfile(2000, parse_mix("completed=3,pending=1"), deleted_ratio=0.0, seed=7)
+    
+    first = list(client_work_orders(profile))
+    assert first == list(client_work_orders(profile))
+    
+    done = sum(order["isDone"] for order in first)
+    assert sum(order["isPending"] for order in first) + done == 2000
+    assert 1400 < done < 1600
+    assert not any(order["isDeleted"] for order in first)
+
+
+def test_roundtrip_on_memory_backend(isolated_env):
+    profile = LoadProfile(300, parse_mix("pending=1,completed=1"), malformed_ratio=0.1)
+    
+    result = run_scenario("roundtrip", profile, "memory", "tractian_bench", parallel=False, log_level="ERROR")
+    
+    inbound = result["stages"]["inbound"]["totals"]
+    outbound = result["stages"]["outbound"]
+    assert inbound["inserted"] == result["generated"]["valid"]
+    assert outbound["records"] == outbound["totals"]["sucesso"] == result["generated"]["valid"]
+    
+    translate = result["latency"]["stage_seconds:translate_inbound"]
+    assert translate["count"] == result["generated"]["valid"]
+    assert translate["p50Ms"] <= translate["p99Ms"]
+
+
+def test_compare_flags_throughput_regressions():
+    baseline = {"scenarios": {"inbound": {"stages": {"inbound": {"recordsPerSecond": 1000}}}}}
+    
+    slower = {"inbound": {"stages": {"inbound": {"recordsPerSecond": 850}}}}
+    noise = {"inbound": {"stages": {"inbound": {"recordsPerSecond": 950}}}}
+    
+    assert compare(slower, baseline, tolerance=0.10) == ["inbound/inbound: -15.0% registros/s"]
+    assert compare(noise, baseline, tolerance=0.10) == []
+    assert percentile([3.0, 1.0, 2.0], 0.5) == 2.0
+
+
+def test_compare_cold_start_flags_slower_starts():
+    baseline = {"coldStart": {"inbound-idle": {"minMs": 200.0}, "help": {"minMs": 100.0}}}
+    current = {"inbound-idle": {"minMs": 250.0}, "help": {"minMs": 105.0}, "python": {"minMs": 20.0}}
+    
+    assert compare_cold_start(current, baseline, tolerance=0.10) == ["cold-start/inbound-idle: +25.0% ms"]
+
+
+def test_memory_store_fails_loudly_on_unsupported_operators():
+    from datetime import datetime
+    from benchmarks.memory_store import MemoryCollection
+    
+    collection = MemoryCollection("workorders")
+    collection.insert_many([{"number": 1, "isSynced": False}])
+    claimable = {"isSynced": False, "$or": [{"leaseExpiresAt": None}, {"leaseExpiresAt": {"$lte": datetime(2024, 1, 1)}}]}
+    
+    with pytest.raises(NotImplementedError):
+        collection.find(claimable)
+    with pytest.raises(NotImplementedError):
+        collection.find({"leaseExpiresAt": {"$lte": datetime(2024, 1, 1)}})
+    with pytest.raises(NotImplementedError):
+        collection.update_many({"number": {"$in": [1]}}, {"$unset": {"leaseId": ""}})
+    assert collection.count_documents({"number": {"$in": [1]}, "isSynced": {"$ne": True}}) == 1
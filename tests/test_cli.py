@@ -0,0 +1,82 @@
+import subprocess
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import src.cli as cli
+import src.service.inbound_service as inbound_module
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_legacy_flags_map_to_subcommands():
+    assert cli.from_legacy_flags([]) == ["run"]
+    assert cli.from_legacy_flags(["--help"]) == ["--help"]
+    assert cli.from_legacy_flags(["--daemon", "--parallel"]) == ["run", "--daemon"]
+    assert cli.from_legacy_flags(["--tail"]) == ["outbound", "--tail"]
+    assert cli.from_legacy_flags(["--parallel", "--async", "--lease"]) == ["run", "--async", "--lease"]
+
+
+def test_modes_come_from_flags_then_environment(monkeypatch):
+    parser = cli.build_parser()
+    monkeypatch.setenv("PIPELINE_MODE", "parallel")
+    monkeypatch.setenv("OUTBOUND_MODE", "lease")
+    
+    assert cli.pipeline_mode(parser.parse_args(["run"])) == "parallel"
+    assert cli.pipeline_mode(parser.parse_args(["run", "--async"])) == "async"
+    assert cli.outbound_mode(parser.parse_args(["run", "--watermark"])) == "watermark"
+    assert cli.outbound_mode(parser.parse_args(["outbound"])) == "lease"
+    with pytest.raises(SystemExit):
+        parser.parse_args(["inbound", "--parallel", "--async"])
+
+
+def test_idle_inbound_never_connects(monkeypatch, tmp_path):
+    monkeypatch.setenv("DATA_INBOUND_DIR", str(tmp_path / "inbound"))
+    monkeypatch.setenv("DATA_OUTBOUND_DIR", str(tmp_path / "outbound"))
+    monkeypatch.setenv("INBOUND_INCREMENTAL", "false")
+    monkeypatch.delenv("PIPELINE_MODE", raising=False)
+    (tmp_path / "inbound").mkdir()
+    
+    def connect():
+        raise AssertionError("MongoDB contacted without inbound work")
+    
+    monkeypatch.setattr(inbound_module, "get_db", connect)
+    
+    assert cli.run_inbound(cli.build_parser().parse_args(["inbound"])) == 0
+
+
+def test_run_exits_non_zero_when_a_stage_fails(monkeypatch):
+    import src.main as main_module
+    
+    monkeypatch.delenv("PIPELINE_MODE", raising=False)
+    monkeypatch.setattr(main_module, "run_pipeline", lambda **options: False)
+    assert cli.run_all(cli.build_parser().parse_args(["run", "--parallel"])) == 1
+    
+    monkeypatch.setattr(main_module, "run_pipeline", lambda **options: True)
+    assert cli.run_all(cli.build_parser().parse_args(["run"])) == 0
+
+
+def test_bench_options_are_passed_through(monkeypatch):
+    import benchmarks.bench_pipeline as bench_module
+    
+    received = []
+    monkeypatch.setattr(bench_module, "main", lambda argv: received.append(argv) or 0)
+    
+    assert cli.main(["bench", "--records", "100", "--scenario", "inbound"]) == 0
+    assert received == [["--records", "100", "--scenario", "inbound"]]
+    with pytest.raises(SystemExit):
+        cli.main(["inbound", "--records", "100"])
+
+
+def test_sync_services_do_not_import_async_or_numpy_stacks():
+    # A fresh interpreter, since this test process may already have them loaded
+    code = (
+        "import sys, src.cli, src.main, src.service.inbound_service, src.service.outbound_service; "
+        "print(sorted(name for name in ('motor', 'numpy') if name in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    
+    assert result.stdout.strip() == "[]"
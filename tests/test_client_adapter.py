@@ -0,0 +1,59 @@
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.adapters.client_adapter import ClientAdapter
+
+
+def write_inbound(directory, name, content):
+    path = directory / name
+    if isinstance(content, dict):
+        content = json.dumps(content)
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def valid_order(order_no):
+    return {
+        "orderNo": order_no,
+        "summary": f"Test {order_no}",
+        "creationDate": "2024-12-08T10:00:00Z",
+        "lastUpdateDate": "2024-12-08T11:00:00Z"
+    }
+
+
+def make_adapter(monkeypatch, inbound_dir):
+    monkeypatch.setenv("DATA_INBOUND_DIR", str(inbound_dir))
+    return ClientAdapter()
+
+
+def test_iter_inbound_files_skips_invalid_files(monkeypatch, tmp_path):
+    write_inbound(tmp_path, "1.json", valid_order(1))
+    write_inbound(tmp_path, "2.json", valid_order(2))
+    write_inbound(tmp_path, "corrupted.json", "{not json")
+    write_inbound(tmp_path, "missing.json", {"orderNo": 3})
+    write_inbound(tmp_path, "notes.txt", "ignored")
+    
+    adapter = make_adapter(monkeypatch, tmp_path)
+    orders = adapter.iter_inbound_files()
+    
+    assert not isinstance(orders, list)
+    assert sorted(wo.orderNo for wo in orders) == [1, 2]
+
+
+def test_iter_inbound_batches_chunks_work_orders(monkeypatch, tmp_path):
+    for order_no in range(1, 6):
+        write_inbound(tmp_path, f"{order_no}.json", valid_order(order_no))
+    
+    adapter = make_adapter(monkeypatch, tmp_path)
+    batches = list(adapter.iter_inbound_batches(2))
+    
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+
+
+def test_iter_inbound_files_missing_directory(monkeypatch, tmp_path):
+    adapter = make_adapter(monkeypatch, tmp_path / "missing")
+    
+    assert list(adapter.iter_inbound_files()) == []
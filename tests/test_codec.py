@@ -0,0 +1,41 @@
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.adapters import codec
+
+
+WORK_ORDER = {"orderNo": 1, "summary": "Troca de rolamento", "isDone": False, "deletedDate": None}
+
+
+def test_round_trip():
+    assert codec.loads(codec.dumps(WORK_ORDER)) == WORK_ORDER
+    assert codec.loads(codec.dumps(WORK_ORDER, indent=True)) == WORK_ORDER
+
+
+def test_invalid_json_raises_decode_error():
+    with pytest.raises(codec.DecodeError):
+        codec.loads(b"{not json")
+    
+    with pytest.raises(codec.DecodeError):
+        codec.loads(b'{"summary": "\xff"}')
+
+
+def test_load_file_uses_mmap_for_large_files(monkeypatch, tmp_path):
+    path = tmp_path / "1.json"
+    path.write_bytes(codec.dumps(WORK_ORDER))
+    (tmp_path / "empty.json").write_bytes(b"")
+    monkeypatch.setattr(codec, "MMAP_THRESHOLD", 1)
+    
+    assert codec.load_file(path) == WORK_ORDER
+    assert codec.read_bytes(tmp_path / "empty.json") == b""
+
+
+def test_unknown_backend_falls_back_to_stdlib_json():
+    backend, loads, dumps, _ = codec._select_backend("simdjson")
+    
+    assert backend == "json"
+    assert loads(dumps(WORK_ORDER, False)) == WORK_ORDER
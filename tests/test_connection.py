@@ -0,0 +1,105 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from pymongo.errors import ServerSelectionTimeoutError
+
+import src.database.connection as connection_module
+from src.database.connection import DatabaseConnection, get_db
+from src.database.options import backoff_delays, client_options
+
+
+class FakeAdmin:
+    
+    def __init__(self, client):
+        self.client = client
+    
+    def command(self, name):
+        if self.client.fail:
+            raise ServerSelectionTimeoutError("sem servidor")
+
+
+class FakeMongoClient:
+    
+    instances = []
+    failures = 0
+    
+    def __init__(self, uri, **options):
+        self.options = options
+        self.closed = False
+        self.fail = FakeMongoClient.failures > 0
+        FakeMongoClient.failures -= 1
+        self.admin = FakeAdmin(self)
+        FakeMongoClient.instances.append(self)
+    
+    def __getitem__(self, name):
+        return {"workorders": None}
+    
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    monkeypatch.setattr(connection_module, "MongoClient", FakeMongoClient)
+    monkeypatch.setattr(connection_module.time, "sleep", lambda seconds: None)
+    monkeypatch.setenv("MONGO_ENSURE_INDEXES", "false")
+    monkeypatch.setattr(DatabaseConnection, "_instance", None)
+    monkeypatch.setattr(DatabaseConnection, "_client", None)
+    monkeypatch.setattr(DatabaseConnection, "_db", None)
+    monkeypatch.setattr(DatabaseConnection, "_refs", 0)
+    FakeMongoClient.instances = []
+    FakeMongoClient.failures = 0
+    return FakeMongoClient
+
+
+def test_client_is_shared_until_last_handle_closes(fake_client):
+    inbound = get_db()
+    outbound = get_db()
+    
+    inbound.close()
+    assert outbound.is_connected()
+    assert not fake_client.instances[0].closed
+    
+    outbound.close()
+    assert fake_client.instances[0].closed
+    assert len(fake_client.instances) == 1
+    
+    # Reconnecting after the pool was closed must not reuse the closed client
+    get_db()
+    assert len(fake_client.instances) == 2 and not fake_client.instances[1].closed
+
+
+def test_connect_retries_with_backoff(fake_client, monkeypatch):
+    fake_client.failures = 2
+    monkeypatch.setenv("MONGO_CONNECT_RETRIES", "3")
+    
+    db = get_db()
+    
+    assert db.is_connected()
+    assert len(fake_client.instances) == 3
+
+
+def test_client_options_from_env(monkeypatch):
+    monkeypatch.setenv("MONGO_MAX_POOL_SIZE", "50")
+    monkeypatch.setenv("MONGO_MIN_POOL_SIZE", "5")
+    monkeypatch.setenv("MONGO_COMPRESSORS", "zstd,snappy")
+    monkeypatch.setenv("MONGO_WRITE_CONCERN", "majority")
+    
+    options = client_options()
+    
+    assert options["maxPoolSize"] == 50
+    assert options["minPoolSize"] == 5
+    assert options["compressors"] == "zstd,snappy"
+    assert options["w"] == "majority"
+
+
+def test_backoff_delays_grow_and_are_capped():
+    delays = list(backoff_delays(6, 1, 4))
+    
+    assert len(delays) == 5
+    assert 0.5 <= delays[0] <= 1
+    assert 2 <= delays[2] <= 4
+    assert all(delay <= 4 for delay in delays)
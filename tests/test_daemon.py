@@ -0,0 +1,116 @@
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import src.daemon as daemon_module
+from src.adapters.quarantine import Quarantine
+from src.daemon import InboundDirectoryWatcher, IntegrationDaemon
+
+SUCCESS = {"inserted": 1, "updated": 0, "unchanged": 0, "failed": 0}
+FAILURE = {"inserted": 0, "updated": 0, "unchanged": 0, "failed": 1}
+
+
+class FakeInbound:
+    
+    def __init__(self, directory, outcomes, quarantine=None):
+        self.client_adapter = SimpleNamespace(inbound_dir=directory, quarantine=quarantine)
+        self.outcomes = list(outcomes)
+        self.runs = 0
+    
+    def process(self):
+        self.runs += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class FakeOutbound:
+    
+    def process(self):
+        return {"sucesso": 0, "falha": 0}
+
+
+def make_daemon(monkeypatch, inbound):
+    monkeypatch.setattr(daemon_module, "InboundService", lambda incremental: inbound)
+    monkeypatch.setattr(daemon_module, "OutboundService", FakeOutbound)
+    return IntegrationDaemon(poll_interval=1, outbound_interval=3600, rescan_interval=3600)
+
+
+def test_watcher_detects_new_and_rewritten_files(tmp_path):
+    watcher = InboundDirectoryWatcher(str(tmp_path), rescan_interval=3600)
+    
+    assert watcher.has_changes() is False
+    
+    (tmp_path / "1.json").write_text("{}")
+    assert watcher.has_changes() is True
+    watcher.commit()
+    assert watcher.has_changes() is False
+    
+    # In-place rewrites do not touch the directory mtime: only the periodic rescan sees them
+    (tmp_path / "1.json").write_text('{"orderNo": 1}')
+    assert watcher.has_changes() is False
+    watcher.rescan_interval = 0
+    assert watcher.has_changes() is True
+
+
+def test_watcher_missing_directory(tmp_path):
+    watcher = InboundDirectoryWatcher(str(tmp_path / "missing"), rescan_interval=0)
+    
+    assert watcher.has_changes() is False
+
+
+@pytest.mark.parametrize("first_run", [FAILURE, RuntimeError("MongoDB indisponível")])
+def test_daemon_retries_files_of_a_failed_inbound_cycle(monkeypatch, tmp_path, first_run):
+    inbound = FakeInbound(tmp_path, [first_run, SUCCESS])
+    daemon = make_daemon(monkeypatch, inbound)
+    (tmp_path / "1.json").write_text("{}")
+    
+    try:
+        daemon.run_cycle(0.0)
+    except RuntimeError:
+        pass
+    daemon.run_cycle(0.0)
+    assert inbound.runs == 1
+    
+    # Nothing changed on disk, but the failed files are still pending at the next rescan
+    daemon.watcher.rescan_interval = 0
+    daemon.run_cycle(0.0)
+    daemon.run_cycle(0.0)
+    assert inbound.runs == 2
+
+
+def test_daemon_revisits_a_file_once_its_backoff_expires(monkeypatch, tmp_path):
+    quarantine = Quarantine(tmp_path / "rejected", retry_delay=0.05)
+    inbound = FakeInbound(tmp_path, [SUCCESS, SUCCESS], quarantine)
+    daemon = make_daemon(monkeypatch, inbound)
+    locked = tmp_path / "locked.json"
+    locked.write_text("{}")
+    
+    quarantine.record_failure(locked, "PermissionError")
+    daemon.run_cycle(0.0)
+    daemon.run_cycle(0.0)
+    assert inbound.runs == 1
+    
+    time.sleep(0.06)
+    daemon.run_cycle(0.0)
+    assert inbound.runs == 2
+    quarantine.close()
+
+
+def test_retry_due_forgets_files_that_disappeared(tmp_path):
+    quarantine = Quarantine(tmp_path / "rejected", retry_delay=0.01)
+    gone = tmp_path / "gone.json"
+    gone.write_text("{}")
+    quarantine.record_failure(gone, "PermissionError")
+    gone.unlink()
+    time.sleep(0.02)
+    
+    assert quarantine.retry_due() is False
+    assert quarantine._retries == {}
+    quarantine.close()
@@ -0,0 +1,326 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo.errors import BulkWriteError
+from pymongo.results import BulkWriteResult
+
+import src.service.inbound_service as inbound_module
+from src.service.inbound_service import InboundService
+from src.translators.client_to_tracos import ClientToTracOSTranslator
+
+
+class FakeCollection:
+    
+    def __init__(self, error_indexes=(), upserted_indexes=(), stored=()):
+        self.error_indexes = error_indexes
+        self.upserted_indexes = upserted_indexes
+        self.stored = list(stored)
+        self.calls = []
+    
+    def find(self, query, projection=None):
+        numbers = query["number"]["$in"]
+        return [doc for doc in self.stored if doc["number"] in numbers]
+    
+    def bulk_write(self, operations, ordered=True):
+        self.calls.append((operations, ordered))
+        upserted = [{"index": i, "_id": i} for i in self.upserted_indexes]
+        
+        if self.error_indexes:
+            raise BulkWriteError({
+                "writeErrors": [{"index": i, "code": 11000, "errmsg": "duplicate key"} for i in self.error_indexes],
+                "upserted": upserted,
+            })
+        
+        return BulkWriteResult({"upserted": upserted}, acknowledged=True)
+
+
+def order(number, summary="Test"):
+    return ClientToTracOSTranslator().translate({
+        "orderNo": number,
+        "summary": summary,
+        "creationDate": "2024-12-08T10:00:00Z",
+        "lastUpdateDate": "2024-12-08T11:00:00Z"
+    })
+
+
+def make_service(monkeypatch, collection, batch_size=2):
+    monkeypatch.setattr(inbound_module, "get_db", lambda: None)
+    monkeypatch.setattr(inbound_module, "get_workorders_collection", lambda: collection)
+    return InboundService(batch_size=batch_size)
+
+
+def test_save_batch_reports_inserted_and_updated(monkeypatch):
+    collection = FakeCollection(upserted_indexes=[1])
+    service = make_service(monkeypatch, collection)
+    
+    outcomes = service.save_batch_to_mongodb([order(1), order(2)])
+    
+    assert outcomes == {1: "updated", 2: "inserted"}
+    operations, ordered = collection.calls[0]
+    assert ordered is False
+    assert len(operations) == 2
+
+
+def test_save_batch_reports_failures_per_order(monkeypatch):
+    collection = FakeCollection(error_indexes=[0], upserted_indexes=[2])
+    service = make_service(monkeypatch, collection)
+    
+    outcomes = service.save_batch_to_mongodb([order(7), order(8), order(9)])
+    
+    assert outcomes == {7: "failed", 8: "updated", 9: "inserted"}
+
+
+def test_save_batch_deduplicates_order_numbers(monkeypatch):
+    collection = FakeCollection()
+    service = make_service(monkeypatch, collection)
+    
+    outcomes = service.save_batch_to_mongodb([order(1, "old"), order(1, "new")])
+    
+    operations, _ = collection.calls[0]
+    assert outcomes == {1: "updated"}
+    assert len(operations) == 1
+    assert operations[0]._doc[0]["$set"]["title"]["$cond"][1] == {"$literal": "new"}
+
+
+def test_save_batch_skips_unchanged_orders(monkeypatch):
+    collection = FakeCollection(stored=[
+        {"number": 1, "contentHash": order(1)["contentHash"]},
+        {"number": 2, "contentHash": "outdated"},
+    ])
+    service = make_service(monkeypatch, collection)
+    
+    outcomes = service.save_batch_to_mongodb([order(1), order(2)])
+    
+    operations, _ = collection.calls[0]
+    assert outcomes == {1: "unchanged", 2: "updated"}
+    assert [op._filter for op in operations] == [{"number": 2}]
+
+
+def test_save_batch_without_changes_does_not_write(monkeypatch):
+    collection = FakeCollection(stored=[{"number": 1, "contentHash": order(1)["contentHash"]}])
+    service = make_service(monkeypatch, collection)
+    
+    assert service.save_batch_to_mongodb([order(1)]) == {1: "unchanged"}
+    assert collection.calls == []
+
+
+def test_inbound_reconnects_after_a_failed_connection(monkeypatch):
+    class FakeDb:
+        closed = False
+        
+        def close(self):
+            self.closed = True
+    
+    handles = []
+    collections = iter([None, FakeCollection(upserted_indexes=[0])])
+    monkeypatch.setattr(inbound_module, "get_db", lambda: handles.append(FakeDb()) or handles[-1])
+    monkeypatch.setattr(inbound_module, "get_workorders_collection", lambda: next(collections))
+    service = InboundService(batch_size=2)
+    
+    # MongoDB was down on the first write; the daemon's next cycle gets through
+    assert service.save_batch_to_mongodb([order(1)]) == {1: "failed"}
+    assert service.save_batch_to_mongodb([order(1)]) == {1: "inserted"}
+    assert len(handles) == 2
+    assert handles[0].closed
+
+
+def test_parallel_inbound_translates_in_workers_and_writes_in_batches(monkeypatch, tmp_path):
+    import json
+    import src.service.parallel_inbound_service as parallel_module
+    
+    for order_no in range(1, 6):
+        (tmp_path / f"{order_no}.json").write_text(json.dumps({
+            "orderNo": order_no,
+            "summary": f"Test {order_no}",
+            "creationDate": "2024-12-08T10:00:00Z",
+            "lastUpdateDate": "2024-12-08T11:00:00Z",
+            "isDone": True
+        }))
+    (tmp_path / "corrupted.json").write_text("{not json")
+    monkeypatch.setenv("DATA_INBOUND_DIR", str(tmp_path))
+    
+    collection = FakeCollection()
+    monkeypatch.setattr(inbound_module, "get_db", lambda: None)
+    monkeypatch.setattr(inbound_module, "get_workorders_collection", lambda: collection)
+    service = parallel_module.ParallelInboundService(batch_size=2, workers=2, chunk_size=2)
+    
+    service.process()
+    
+    written = [op._doc[0]["$set"] for operations, _ in collection.calls for op in operations]
+    assert [len(operations) for operations, _ in collection.calls] == [2, 2, 1]
+    assert sorted(doc["number"]["$cond"][1]["$literal"] for doc in written) == [1, 2, 3, 4, 5]
+    assert all(doc["status"]["$cond"][1] == {"$literal": "completed"} for doc in written)
+
+
+def test_parallel_inbound_counts_files_of_a_crashed_chunk_as_failed(monkeypatch, tmp_path):
+    import json
+    from concurrent.futures import Future
+    from concurrent.futures.process import BrokenProcessPool
+    import src.service.parallel_inbound_service as parallel_module
+    
+    class CrashingExecutor:
+        # Runs chunks in-process; the chunk holding 3.json dies like a killed worker
+        def __init__(self, max_workers, initializer):
+            initializer()
+        
+        def __enter__(self):
+            return self
+        
+        def __exit__(self, *exc):
+            return False
+        
+        def submit(self, fn, chunk, with_sources):
+            future = Future()
+            if any(path.endswith("3.json") for path in chunk):
+                future.set_exception(BrokenProcessPool("worker morreu"))
+            else:
+                future.set_result(fn(chunk, with_sources))
+            return future
+    
+    for order_no in range(1, 6):
+        (tmp_path / f"{order_no}.json").write_text(json.dumps({
+            "orderNo": order_no,
+            "summary": f"Test {order_no}",
+            "creationDate": "2024-12-08T10:00:00Z",
+            "lastUpdateDate": "2024-12-08T11:00:00Z"
+        }))
+    monkeypatch.setenv("DATA_INBOUND_DIR", str(tmp_path))
+    monkeypatch.setattr(parallel_module, "ProcessPoolExecutor", CrashingExecutor)
+    
+    collection = FakeCollection()
+    monkeypatch.setattr(inbound_module, "get_db", lambda: None)
+    monkeypatch.setattr(inbound_module, "get_workorders_collection", lambda: collection)
+    service = parallel_module.ParallelInboundService(batch_size=10, workers=1, chunk_size=1)
+    
+    totals = service.process()
+    
+    assert totals["failed"] == 1
+    assert totals["updated"] == 4
+
+
+class InProcessExecutor:
+    # Runs chunks in the test process, so monkeypatched translators reach the "workers"
+    submitted = []
+    
+    def __init__(self, max_workers, initializer):
+        initializer()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def submit(self, fn, chunk, with_sources):
+        from concurrent.futures import Future
+        
+        InProcessExecutor.submitted.append(chunk)
+        future = Future()
+        future.set_result(fn(chunk, with_sources))
+        return future
+
+
+def test_parallel_inbound_keeps_a_bundle_with_a_failed_order(monkeypatch, tmp_path):
+    import json
+    import src.service.parallel_inbound_service as parallel_module
+    
+    lines = [
+        json.dumps({
+            "orderNo": order_no,
+            "summary": f"Test {order_no}",
+            "creationDate": "2024-12-08T10:00:00Z",
+            "lastUpdateDate": "2024-12-08T11:00:00Z"
+        })
+        for order_no in (1, 2)
+    ]
+    (tmp_path / "orders.ndjson").write_text("\n".join(lines) + "\n")
+    monkeypatch.setenv("DATA_INBOUND_DIR", str(tmp_path))
+    monkeypatch.setenv("INBOUND_ARCHIVE", "move")
+    monkeypatch.setattr(parallel_module, "ProcessPoolExecutor", InProcessExecutor)
+    
+    translate_record = ClientToTracOSTranslator.translate_record
+    
+    def failing_batch(self, columns):
+        raise ValueError("lote inválido")
+    
+    def failing_record(self, client_data):
+        if client_data.orderNo == 2:
+            raise ValueError("registro inválido")
+        return translate_record(self, client_data)
+    
+    monkeypatch.setattr(ClientToTracOSTranslator, "translate_batch", failing_batch)
+    monkeypatch.setattr(ClientToTracOSTranslator, "translate_record", failing_record)
+    
+    collection = FakeCollection()
+    monkeypatch.setattr(inbound_module, "get_db", lambda: None)
+    monkeypatch.setattr(inbound_module, "get_workorders_collection", lambda: collection)
+    service = parallel_module.ParallelInboundService(batch_size=10, workers=1, chunk_size=1)
+    
+    totals = service.process()
+    service.close()
+    
+    assert totals["failed"] == 1
+    assert totals["updated"] == 1
+    # The good order is written, but the bundle stays to be read again
+    assert (tmp_path / "orders.ndjson").exists()
+    assert list((tmp_path / "archive").rglob("*.ndjson")) == []
+
+
+def test_parallel_inbound_skips_touched_files_with_the_same_content(monkeypatch, tmp_path):
+    import json
+    import src.service.parallel_inbound_service as parallel_module
+    
+    inbound = tmp_path / "inbound"
+    inbound.mkdir()
+    for order_no in (1, 2):
+        (inbound / f"{order_no}.json").write_text(json.dumps({
+            "orderNo": order_no,
+            "summary": f"Test {order_no}",
+            "creationDate": "2024-12-08T10:00:00Z",
+            "lastUpdateDate": "2024-12-08T11:00:00Z"
+        }))
+    monkeypatch.setenv("DATA_INBOUND_DIR", str(inbound))
+    monkeypatch.setenv("INBOUND_MANIFEST_PATH", str(tmp_path / "manifest.sqlite3"))
+    monkeypatch.setattr(parallel_module, "ProcessPoolExecutor", InProcessExecutor)
+    monkeypatch.setattr(InProcessExecutor, "submitted", [])
+    
+    collection = FakeCollection()
+    monkeypatch.setattr(inbound_module, "get_db", lambda: None)
+    monkeypatch.setattr(inbound_module, "get_workorders_collection", lambda: collection)
+    
+    service = parallel_module.ParallelInboundService(batch_size=10, workers=1, chunk_size=10, incremental=True)
+    service.process()
+    service.close()
+    assert InProcessExecutor.submitted == [[str(inbound / "1.json"), str(inbound / "2.json")]]
+    
+    later = os.stat(inbound / "1.json").st_mtime + 60
+    os.utime(inbound / "1.json", (later, later))
+    InProcessExecutor.submitted.clear()
+    
+    service = parallel_module.ParallelInboundService(batch_size=10, workers=1, chunk_size=10, incremental=True)
+    service.process()
+    # Only the mtime changed: the manifest is refreshed and no worker reads the file
+    assert InProcessExecutor.submitted == []
+    assert service.client_adapter.manifest.is_unchanged(
+        str(inbound / "1.json"), os.stat(inbound / "1.json").st_mtime_ns, os.stat(inbound / "1.json").st_size
+    )
+    service.close()
+
+
+def test_upsert_stamps_modified_at_only_when_the_order_changes():
+    from benchmarks.memory_store import MemoryCollection
+    from src.service.inbound_service import build_upsert_batch
+    
+    collection = MemoryCollection("workorders")
+    collection.bulk_write(build_upsert_batch([order(1)])[1])
+    stamped = collection.find_one({"number": 1})["modifiedAt"]
+    
+    collection.bulk_write(build_upsert_batch([order(1)])[1])
+    assert collection.find_one({"number": 1})["modifiedAt"] is stamped
+    
+    collection.bulk_write(build_upsert_batch([order(1, "changed")])[1])
+    document = collection.find_one({"number": 1})
+    assert document["title"] == "changed"
+    assert document["modifiedAt"] is not stamped
@@ -0,0 +1,126 @@
+import gzip
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.adapters import bundles
+from src.adapters.client_adapter import ClientAdapter
+
+
+def order(order_no):
+    return {
+        "orderNo": order_no,
+        "summary": f"Test {order_no}",
+        "creationDate": "2024-12-08T10:00:00Z",
+        "lastUpdateDate": "2024-12-08T11:00:00Z"
+    }
+
+
+def ndjson(*lines):
+    return "".join((line if isinstance(line, str) else json.dumps(line)) + "\n" for line in lines).encode()
+
+
+def make_adapter(monkeypatch, inbound_dir, **env):
+    monkeypatch.setenv("DATA_INBOUND_DIR", str(inbound_dir))
+    monkeypatch.delenv("DATA_REJECTED_DIR", raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return ClientAdapter()
+
+
+def test_bad_lines_are_isolated_and_reported(monkeypatch, tmp_path):
+    payload = ndjson(order(1), "{broken", "", {"orderNo": 3, "summary": "x"}, order(4))
+    (tmp_path / "export.ndjson").write_bytes(payload)
+    adapter = make_adapter(monkeypatch, tmp_path)
+    
+    assert [wo.orderNo for wo in adapter.iter_inbound_files()] == [1, 4]
+    
+    # The bundle stays put, only its bad lines are copied to the rejected directory
+    assert (tmp_path / "export.ndjson").read_bytes() == payload
+    rejected = [json.loads(line) for line in (tmp_path / "rejected" / "export.ndjson.rejected.ndjson").read_text().splitlines()]
+    assert [(r["line"], r["reason"]) for r in rejected] == [(2, "corrupted"), (4, "invalid")]
+    assert rejected[0]["raw"] == "{broken"
+    report = json.loads((tmp_path / "rejected" / "export.ndjson.error.json").read_text())
+    assert (report["reason"], report["lines"]) == ("partial", [2, 4])
+    adapter.close()
+
+
+def test_gzip_bundles_are_streamed(monkeypatch, tmp_path):
+    (tmp_path / "export.jsonl.gz").write_bytes(gzip.compress(ndjson(*(order(n) for n in range(1, 6)))))
+    (tmp_path / "6.json").write_text(json.dumps(order(6)))
+    adapter = make_adapter(monkeypatch, tmp_path)
+    
+    assert sorted(wo.orderNo for wo in adapter.iter_inbound_files()) == [1, 2, 3, 4, 5, 6]
+    adapter.close()
+
+
+def test_bundle_with_no_valid_line_is_quarantined(monkeypatch, tmp_path):
+    (tmp_path / "junk.ndjson").write_bytes(ndjson("{a", "[1, 2]"))
+    adapter = make_adapter(monkeypatch, tmp_path)
+    
+    assert list(adapter.iter_inbound_files()) == []
+    
+    assert not (tmp_path / "junk.ndjson").exists()
+    assert (tmp_path / "rejected" / "junk.ndjson").exists()
+    adapter.close()
+
+
+def test_bundle_is_archived_only_after_all_its_orders_are_written(monkeypatch, tmp_path):
+    (tmp_path / "export.ndjson").write_bytes(ndjson(order(1), order(2)))
+    adapter = make_adapter(monkeypatch, tmp_path, INBOUND_ARCHIVE="move")
+    
+    assert [wo.orderNo for wo in adapter.iter_inbound_files()] == [1, 2]
+    adapter.commit_sources([1])
+    assert (tmp_path / "export.ndjson").exists()
+    adapter.commit_sources([2])
+    
+    assert not (tmp_path / "export.ndjson").exists()
+    assert list((tmp_path / "archive").rglob("export.ndjson"))
+    adapter.close()
+
+
+def truncated_gzip(path):
+    # Incompressible summaries, so the cut lands past the first read buffer
+    compressed = gzip.compress(ndjson(*({**order(n), "summary": os.urandom(64).hex()} for n in range(1, 20001))))
+    path.write_bytes(compressed[:len(compressed) // 2])
+
+
+def test_truncated_gzip_keeps_read_lines_and_retries_the_bundle(monkeypatch, tmp_path):
+    truncated_gzip(tmp_path / "export.ndjson.gz")
+    adapter = make_adapter(monkeypatch, tmp_path, INBOUND_ARCHIVE="move")
+    
+    read = [wo.orderNo for wo in adapter.iter_inbound_files()]
+    adapter.commit_sources(read)
+    
+    assert read and read == list(range(1, len(read) + 1))
+    assert (tmp_path / "export.ndjson.gz").exists()
+    assert [entry.name for entry in adapter.iter_changed_files()] == []
+    adapter.close()
+
+
+def test_truncated_gzip_without_archive_or_manifest_backs_off(monkeypatch, tmp_path):
+    truncated_gzip(tmp_path / "export.ndjson.gz")
+    adapter = make_adapter(monkeypatch, tmp_path, INBOUND_ARCHIVE="none")
+    
+    read = [wo.orderNo for wo in adapter.iter_inbound_files()]
+    
+    assert read and read == list(range(1, len(read) + 1))
+    assert [entry.name for entry in adapter.iter_changed_files()] == []
+    adapter.close()
+
+
+def test_zstd_bundle_without_zstandard_backs_off(monkeypatch, tmp_path):
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+    (tmp_path / "export.ndjson.zst").write_bytes(b"not read")
+    adapter = make_adapter(monkeypatch, tmp_path)
+    
+    with pytest.raises(bundles.BundleError):
+        bundles.open_bundle(tmp_path / "export.ndjson.zst")
+    assert list(adapter.iter_inbound_files()) == []
+    assert (tmp_path / "export.ndjson.zst").exists()
+    assert [entry.name for entry in adapter.iter_changed_files()] == []
+    adapter.close()
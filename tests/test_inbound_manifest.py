@@ -0,0 +1,63 @@
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.adapters.client_adapter import ClientAdapter
+from src.adapters.inbound_manifest import InboundManifest
+
+
+def write_order(directory, order_no, summary="Test"):
+    (directory / f"{order_no}.json").write_text(json.dumps({
+        "orderNo": order_no,
+        "summary": summary,
+        "creationDate": "2024-12-08T10:00:00Z",
+        "lastUpdateDate": "2024-12-08T11:00:00Z"
+    }))
+
+
+def make_adapter(monkeypatch, tmp_path):
+    inbound = tmp_path / "inbound"
+    inbound.mkdir()
+    monkeypatch.setenv("DATA_INBOUND_DIR", str(inbound))
+    manifest = InboundManifest(tmp_path / "manifest.sqlite3")
+    return ClientAdapter(manifest), inbound
+
+
+def read_and_commit(adapter, **kwargs):
+    numbers = [wo.orderNo for wo in adapter.iter_inbound_files(**kwargs)]
+    adapter.commit_sources(numbers)
+    return sorted(numbers)
+
+
+def test_unchanged_files_are_skipped(monkeypatch, tmp_path):
+    adapter, inbound = make_adapter(monkeypatch, tmp_path)
+    write_order(inbound, 1)
+    write_order(inbound, 2)
+    
+    assert read_and_commit(adapter) == [1, 2]
+    assert read_and_commit(adapter) == []
+    assert read_and_commit(adapter, full_resync=True) == [1, 2]
+
+
+def test_changed_content_is_read_again(monkeypatch, tmp_path):
+    adapter, inbound = make_adapter(monkeypatch, tmp_path)
+    write_order(inbound, 1)
+    write_order(inbound, 2)
+    read_and_commit(adapter)
+    
+    write_order(inbound, 2, summary="Changed")
+    os.utime(inbound / "1.json", ns=(0, 0))
+    
+    assert read_and_commit(adapter) == [2]
+
+
+def test_uncommitted_files_are_retried(monkeypatch, tmp_path):
+    adapter, inbound = make_adapter(monkeypatch, tmp_path)
+    write_order(inbound, 1)
+    
+    assert [wo.orderNo for wo in adapter.iter_inbound_files()] == [1]
+    adapter.discard_sources()
+    
+    assert read_and_commit(adapter) == [1]
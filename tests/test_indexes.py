@@ -0,0 +1,49 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.indexes import find_collection_scans, plan_stages
+
+
+IXSCAN_PLAN = {
+    "stage": "FETCH",
+    "inputStage": {"stage": "IXSCAN", "indexName": "number_unique"},
+}
+
+COLLSCAN_PLAN = {
+    "queryPlan": {"stage": "COLLSCAN", "filter": {"isSynced": {"$eq": False}}},
+}
+
+
+class FakeCursor:
+    
+    def __init__(self, plan):
+        self.plan = plan
+    
+    def explain(self):
+        return {"queryPlanner": {"winningPlan": self.plan}}
+
+
+class FakeCollection:
+    
+    def __init__(self, plans):
+        self.plans = plans
+    
+    def find(self, query):
+        return FakeCursor(self.plans[repr(query)])
+
+
+def test_plan_stages_walks_nested_plans():
+    assert plan_stages(IXSCAN_PLAN) == {"FETCH", "IXSCAN"}
+    assert plan_stages({"stage": "OR", "inputStages": [IXSCAN_PLAN, COLLSCAN_PLAN]}) == {"OR", "FETCH", "IXSCAN", "COLLSCAN"}
+
+
+def test_find_collection_scans_reports_unindexed_queries():
+    queries = {"by number": {"number": 1}, "unsynced": {"isSynced": False}}
+    collection = FakeCollection({
+        repr({"number": 1}): IXSCAN_PLAN,
+        repr({"isSynced": False}): COLLSCAN_PLAN,
+    })
+    
+    assert find_collection_scans(collection, queries) == ["unsynced"]
@@ -0,0 +1,45 @@
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from loguru import logger
+
+from src.log_config import configure_logging
+
+
+@pytest.fixture(autouse=True)
+def restore_default_sink():
+    yield
+    logger.remove()
+    logger.add(sys.stderr)
+
+
+def test_json_output_is_one_object_per_line(capsys):
+    configure_logging(level="INFO", json_output=True, enqueue=False)
+    
+    logger.info("Resultado: {} inseridas", 3)
+    
+    record = json.loads(capsys.readouterr().err.strip())
+    assert record["text"].strip() == "Resultado: 3 inseridas"
+    assert record["record"]["level"]["name"] == "INFO"
+
+
+def test_debug_records_suppressed_at_info(capsys):
+    configure_logging(level="INFO", json_output=False, enqueue=False)
+    formatted = []
+    
+    class Lazy:
+        def __str__(self):
+            formatted.append(True)
+            return "WO-1"
+    
+    logger.debug("Traduzido: {}", Lazy())
+    logger.warning("Arquivo inválido: {}", "a.json")
+    
+    err = capsys.readouterr().err
+    assert "Traduzido" not in err
+    assert "Arquivo inválido: a.json" in err
+    assert formatted == []
@@ -0,0 +1,91 @@
+import json
+import sys
+import os
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import src.metrics as metrics_module
+from src.metrics import MetricsRegistry, MongoCommandMetrics
+
+
+class FakeCommandEvent:
+    
+    def __init__(self, command_name, duration_micros=1500):
+        self.command_name = command_name
+        self.duration_micros = duration_micros
+
+
+def test_timer_records_latency_and_errors():
+    registry = MetricsRegistry(enabled=True)
+    
+    with registry.timer("file_read"):
+        pass
+    with pytest.raises(ValueError):
+        with registry.timer("json_decode"):
+            raise ValueError("corrompido")
+    
+    histogram = registry.histograms[("stage_seconds", (("stage", "file_read"),))]
+    assert histogram.count == 1
+    assert registry.counters[("stage_errors_total", (("stage", "json_decode"),))] == 1
+
+
+def test_prometheus_text_has_counters_and_cumulative_buckets():
+    registry = MetricsRegistry(enabled=True)
+    registry.inc("records_total", 3, stage="inbound", outcome="inserted")
+    registry.set("queue_depth", 7, queue="outbound_ack")
+    registry.observe("stage_seconds", 0.002, stage="mongo_write")
+    registry.observe("stage_seconds", 2.0, stage="mongo_write")
+    
+    text = registry.render_prometheus()
+    
+    assert 'tractian_records_total{outcome="inserted",stage="inbound"} 3' in text
+    assert 'tractian_queue_depth{queue="outbound_ack"} 7' in text
+    assert 'tractian_stage_seconds_bucket{stage="mongo_write",le="0.005"} 1' in text
+    assert 'tractian_stage_seconds_bucket{stage="mongo_write",le="+Inf"} 2' in text
+    assert 'tractian_stage_seconds_count{stage="mongo_write"} 2' in text
+    assert 'tractian_records_per_second{stage="inbound"}' in text
+
+
+def test_mongo_listener_counts_round_trips():
+    registry = MetricsRegistry(enabled=True)
+    listener = MongoCommandMetrics(registry)
+    
+    listener.succeeded(FakeCommandEvent("find"))
+    listener.succeeded(FakeCommandEvent("getMore"))
+    listener.failed(FakeCommandEvent("update"))
+    
+    assert registry.counters[("mongo_round_trips_total", (("command", "find"),))] == 1
+    assert registry.counters[("mongo_errors_total", (("command", "update"),))] == 1
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    
+    with registry.timer("file_read"), registry.span("inbound.batch", size=10):
+        registry.inc("records_total", stage="inbound")
+    
+    assert registry.snapshot()["counters"] == [] and registry.histograms == {}
+
+
+def test_json_export_and_http_endpoint(monkeypatch, tmp_path):
+    registry = MetricsRegistry(enabled=True)
+    registry.inc("records_total", 5, stage="outbound", outcome="synced")
+    with registry.span("outbound.batch", size=5):
+        pass
+    monkeypatch.setattr(metrics_module, "metrics", registry)
+    
+    report = json.loads(registry.write_json(tmp_path, "pipeline").read_text())
+    assert report["counters"][0]["value"] == 5
+    assert report["histograms"][0]["labels"] == {"span": "outbound.batch"}
+    
+    server = metrics_module.serve(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        body = urllib.request.urlopen(url, timeout=5).read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 'tractian_records_total{outcome="synced",stage="outbound"} 5' in body
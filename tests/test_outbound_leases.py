@@ -0,0 +1,146 @@
+import sys
+import os
+import threading
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import src.service.outbound_service as outbound_module
+from src.outbound_query import OutboundQuery
+from src.service.outbound_service import OutboundService
+
+
+class LeaseStore:
+    # Shared state standing in for the workorders collection across workers
+    
+    def __init__(self, numbers):
+        self.lock = threading.Lock()
+        self.orders = {number: {"isSynced": False, "leaseId": None, "leaseExpiresAt": None} for number in numbers}
+        self.acknowledged = []
+        self.claims = 0
+    
+    def claimable(self, order, now):
+        return not order["isSynced"] and (order["leaseExpiresAt"] is None or order["leaseExpiresAt"] <= now)
+
+
+class FakeLeaseQuery:
+    
+    def __init__(self, store):
+        self.store = store
+        self.collection = store
+    
+    def claim_batch(self, owner, batch_size, lease_seconds):
+        with self.store.lock:
+            now = datetime.utcnow()
+            free = [n for n, order in self.store.orders.items() if self.store.claimable(order, now)][:batch_size]
+            if not free:
+                return None
+            self.store.claims += 1
+            lease_id = f"{owner}-{self.store.claims}"
+            for number in free:
+                self.store.orders[number].update(leaseId=lease_id, leaseExpiresAt=now + timedelta(seconds=lease_seconds))
+        return lease_id, [
+            {"number": n, "status": "pending", "title": f"WO {n}", "createdAt": datetime(2024, 1, 1), "updatedAt": datetime(2024, 1, 2)}
+            for n in free
+        ]
+    
+    def complete_lease(self, lease_id, numbers):
+        with self.store.lock:
+            for number in numbers:
+                order = self.store.orders[number]
+                if order["leaseId"] == lease_id:
+                    order.update(isSynced=True, leaseId=None, leaseExpiresAt=None)
+                    self.store.acknowledged.append(number)
+        return True
+    
+    def release_lease(self, lease_id):
+        with self.store.lock:
+            for order in self.store.orders.values():
+                if order["leaseId"] == lease_id and not order["isSynced"]:
+                    order.update(leaseId=None, leaseExpiresAt=None)
+        return True
+    
+    def close(self):
+        pass
+
+
+def make_worker(monkeypatch, tmp_path, store, worker_id, **options):
+    monkeypatch.setenv("DATA_OUTBOUND_DIR", str(tmp_path))
+    monkeypatch.setenv("OUTBOUND_WORKER_ID", worker_id)
+    monkeypatch.setattr(outbound_module, "OutboundQuery", lambda: FakeLeaseQuery(store))
+    return OutboundService(**options)
+
+
+def test_workers_split_the_backlog_without_duplicates(monkeypatch, tmp_path):
+    store = LeaseStore(range(1, 41))
+    workers = [make_worker(monkeypatch, tmp_path, store, f"node-{i}", batch_size=5) for i in range(3)]
+    
+    threads = [threading.Thread(target=worker.process_claimed) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert sorted(store.acknowledged) == list(range(1, 41))
+    assert len(os.listdir(tmp_path)) == 40
+
+
+def test_failed_orders_stay_leased_until_expiry(monkeypatch, tmp_path):
+    store = LeaseStore(range(1, 5))
+    worker = make_worker(monkeypatch, tmp_path, store, "node-a", batch_size=10)
+    write_json = worker.write_json
+    worker.write_json = lambda client_wo: client_wo["orderNo"] != 3 and write_json(client_wo)
+    
+    results = worker.process_claimed()
+    
+    assert results == {"sucesso": 3, "falha": 1}
+    assert store.orders[3]["leaseId"] == "node-a-1"
+    
+    # After a crash or failure the lease expires and any worker can take the order
+    store.orders[3]["leaseExpiresAt"] = datetime.utcnow() - timedelta(seconds=1)
+    worker.write_json = write_json
+    assert make_worker(monkeypatch, tmp_path, store, "node-b").process_claimed() == {"sucesso": 1, "falha": 0}
+
+
+def test_interrupted_batch_releases_its_lease(monkeypatch, tmp_path):
+    store = LeaseStore(range(1, 4))
+    worker = make_worker(monkeypatch, tmp_path, store, "node-a", batch_size=10)
+    
+    def interrupted(documents, results, **kwargs):
+        raise KeyboardInterrupt
+    
+    worker._run_pipeline = interrupted
+    with pytest.raises(KeyboardInterrupt):
+        worker.process_claimed()
+    
+    assert all(order["leaseId"] is None for order in store.orders.values())
+
+
+class RecordingCollection:
+    
+    def __init__(self, candidates, claimed):
+        self.candidates = candidates
+        self.claimed = claimed
+        self.updates = []
+    
+    def find(self, query, projection=None, **options):
+        return self.claimed if "leaseId" in query else self.candidates
+    
+    def update_many(self, query, update):
+        self.updates.append((query, update))
+
+
+def test_claim_batch_is_guarded_by_the_claimable_filter(monkeypatch):
+    collection = RecordingCollection([{"number": 1}, {"number": 2}], [{"number": 2}])
+    query = OutboundQuery.__new__(OutboundQuery)
+    query.collection = collection
+    
+    lease_id, claimed = query.claim_batch("node-a", batch_size=2, lease_seconds=60)
+    
+    (claim_filter, claim_update), = collection.updates
+    assert claimed == [{"number": 2}]
+    assert claim_filter["isSynced"] is False and claim_filter["number"] == {"$in": [1, 2]}
+    assert {"leaseExpiresAt": None} in claim_filter["$or"]
+    assert claim_update["$set"]["leaseId"] == lease_id and claim_update["$set"]["leaseOwner"] == "node-a"
@@ -0,0 +1,321 @@
+import json
+import sys
+import os
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import src.service.outbound_service as outbound_module
+from src.service.outbound_service import OutboundService
+
+
+class FakeCheckpoints:
+    
+    def __init__(self):
+        self.values = {}
+    
+    def load(self, name):
+        return self.values.get(name)
+    
+    def save(self, name, value):
+        self.values[name] = value
+        return True
+
+
+def cursor(work_order):
+    # MongoDB sorts a missing modifiedAt before every date
+    modified_at = work_order.get("modifiedAt")
+    return modified_at is not None, modified_at or datetime.min, work_order["number"]
+
+
+class FakeQuery:
+    
+    def __init__(self, work_orders):
+        self.work_orders = work_orders
+        self.acknowledged = []
+        self.checkpoints = FakeCheckpoints()
+        self.watermarks = []
+        self.pending = True
+        self.collection = object()
+        self.closed = False
+    
+    def has_unsynced(self):
+        return self.pending
+    
+    def iter_unsynced_work_orders(self, batch_size):
+        yield from self.work_orders
+    
+    def iter_modified_since(self, watermark, batch_size):
+        self.watermarks.append(watermark)
+        yield from sorted(
+            (wo for wo in self.work_orders if watermark is None or cursor(wo) > cursor(watermark)),
+            key=cursor
+        )
+    
+    def iter_unsynced_behind(self, watermark, batch_size):
+        synced = {number for numbers in self.acknowledged for number in numbers}
+        yield from (
+            wo for wo in self.work_orders
+            if wo["number"] not in synced and cursor(wo) <= cursor(watermark)
+        )
+    
+    def watch_changes(self, resume_token):
+        for index, work_order in enumerate(self.work_orders):
+            yield work_order, {"_data": str(index)}
+    
+    def mark_as_synced(self, number):
+        self.acknowledged.append([number])
+        return True
+    
+    def mark_many_as_synced(self, numbers):
+        self.acknowledged.append(list(numbers))
+        return True
+    
+    def close(self):
+        self.closed = True
+
+
+def tracos_order(number):
+    return {
+        "number": number,
+        "status": "pending",
+        "title": f"Example workorder #{number}",
+        "createdAt": datetime(2024, 12, 8, 10, 0, 0),
+        "updatedAt": datetime(2024, 12, 8, 11, number, 0),
+        "modifiedAt": datetime(2024, 12, 9, 8, number, 0),
+        "deleted": False,
+        "deletedAt": None,
+    }
+
+
+def make_service(monkeypatch, tmp_path, work_orders, batch_size, **options):
+    query = FakeQuery(work_orders)
+    monkeypatch.setenv("DATA_OUTBOUND_DIR", str(tmp_path))
+    monkeypatch.setattr(outbound_module, "OutboundQuery", lambda: query)
+    return OutboundService(batch_size=batch_size, **options), query
+
+
+def test_outbound_acknowledges_in_batches(monkeypatch, tmp_path):
+    service, query = make_service(monkeypatch, tmp_path, [tracos_order(n) for n in range(1, 6)], batch_size=2)
+    
+    service.process()
+    
+    assert query.acknowledged == [[1, 2], [3, 4], [5]]
+    assert sorted(os.listdir(tmp_path)) == [f"{n}.json" for n in range(1, 6)]
+    assert json.loads((tmp_path / "1.json").read_text())["isPending"] is True
+
+
+def test_outbound_does_not_acknowledge_failed_orders(monkeypatch, tmp_path):
+    broken = {"number": 2, "status": "pending"}
+    service, query = make_service(monkeypatch, tmp_path, [tracos_order(1), broken, tracos_order(3)], batch_size=10)
+    
+    service.process()
+    
+    assert query.acknowledged == [[1, 3]]
+
+
+def test_incremental_outbound_advances_watermark(monkeypatch, tmp_path):
+    service, query = make_service(monkeypatch, tmp_path, [tracos_order(n) for n in range(1, 4)], batch_size=2)
+    
+    service.process_incremental()
+    service.process_incremental()
+    
+    assert query.acknowledged == [[1, 2], [3]]
+    assert query.watermarks == [None, {"modifiedAt": datetime(2024, 12, 9, 8, 3, 0), "number": 3}]
+
+
+def test_incremental_outbound_watermark_stops_before_failure(monkeypatch, tmp_path):
+    broken = {"number": 2, "status": "pending", "modifiedAt": datetime(2024, 12, 9, 8, 2, 0)}
+    service, query = make_service(monkeypatch, tmp_path, [tracos_order(1), broken, tracos_order(3)], batch_size=10)
+    
+    service.process_incremental()
+    
+    assert query.acknowledged == [[1, 3]]
+    assert query.checkpoints.load(OutboundService.WATERMARK_CHECKPOINT) == {
+        "modifiedAt": datetime(2024, 12, 9, 8, 1, 0), "number": 1
+    }
+
+
+def test_incremental_outbound_retries_a_failed_order_sharing_its_timestamp(monkeypatch, tmp_path):
+    # Same ERP batch: both orders were modified at the same instant, the first one fails
+    modified_at = datetime(2024, 12, 9, 8, 0, 0)
+    broken = {"number": 1, "status": "pending", "modifiedAt": modified_at}
+    service, query = make_service(monkeypatch, tmp_path, [broken, {**tracos_order(2), "modifiedAt": modified_at}], batch_size=10)
+    
+    service.process_incremental()
+    query.work_orders[0] = {**tracos_order(1), "modifiedAt": modified_at}
+    service.process_incremental()
+    
+    assert query.acknowledged == [[2], [1, 2]]
+    assert query.checkpoints.load(OutboundService.WATERMARK_CHECKPOINT) == {"modifiedAt": modified_at, "number": 2}
+
+
+def test_incremental_outbound_restarts_from_a_legacy_watermark(monkeypatch, tmp_path):
+    service, query = make_service(monkeypatch, tmp_path, [tracos_order(n) for n in range(1, 3)], batch_size=10)
+    query.checkpoints.save(OutboundService.WATERMARK_CHECKPOINT, datetime(2024, 12, 8, 11, 5, 0))
+    
+    service.process_incremental()
+    
+    assert query.watermarks == [None]
+    assert query.acknowledged == [[1, 2]]
+
+
+def test_incremental_outbound_exports_unsynced_orders_behind_the_watermark(monkeypatch, tmp_path):
+    service, query = make_service(monkeypatch, tmp_path, [tracos_order(n) for n in range(1, 3)], batch_size=10)
+    service.process_incremental()
+    
+    # Inserted by setup.py without modifiedAt, and stamped by a write that committed after the watermark moved
+    unstamped = tracos_order(3)
+    del unstamped["modifiedAt"]
+    late = {**tracos_order(4), "modifiedAt": datetime(2024, 12, 9, 8, 0, 0)}
+    query.work_orders += [unstamped, late]
+    
+    results = service.process_incremental()
+    
+    assert results == {"sucesso": 2, "falha": 0}
+    assert query.acknowledged == [[1, 2], [3, 4]]
+    assert query.checkpoints.load(OutboundService.WATERMARK_CHECKPOINT) == {
+        "modifiedAt": datetime(2024, 12, 9, 8, 2, 0), "number": 2
+    }
+
+
+def test_watermark_query_resumes_inside_a_shared_timestamp():
+    from src.outbound_query import after_watermark
+    
+    modified_at = datetime(2024, 12, 9, 8, 0, 0)
+    
+    assert after_watermark(None) == {}
+    assert after_watermark({"modifiedAt": modified_at, "number": 7}) == {"$or": [
+        {"modifiedAt": {"$gt": modified_at}},
+        {"modifiedAt": modified_at, "number": {"$gt": 7}},
+    ]}
+    assert after_watermark({"modifiedAt": None, "number": 7}) == {"$or": [
+        {"modifiedAt": {"$ne": None}},
+        {"modifiedAt": None, "number": {"$gt": 7}},
+    ]}
+
+
+def test_unsynced_query_covers_orders_behind_the_watermark():
+    from src.outbound_query import at_or_before_watermark
+    
+    modified_at = datetime(2024, 12, 9, 8, 0, 0)
+    
+    assert at_or_before_watermark({"modifiedAt": modified_at, "number": 7}) == {"$or": [
+        {"modifiedAt": None},
+        {"modifiedAt": {"$lt": modified_at}},
+        {"modifiedAt": modified_at, "number": {"$lte": 7}},
+    ]}
+    assert at_or_before_watermark({"modifiedAt": None, "number": 7}) == {"modifiedAt": None, "number": {"$lte": 7}}
+
+
+def test_parallel_writers_keep_cursor_order_for_acknowledgements(monkeypatch, tmp_path):
+    service, query = make_service(monkeypatch, tmp_path, [tracos_order(n) for n in range(1, 11)], batch_size=3, workers=4)
+    write_json = service.write_json
+    
+    def slow_write(client_wo):
+        # Earlier orders finish last
+        time.sleep((11 - client_wo["orderNo"]) * 0.002)
+        return write_json(client_wo)
+    
+    service.write_json = slow_write
+    service.process()
+    
+    assert query.acknowledged == [[1, 2, 3], [4, 5, 6], [7, 8, 9], [10]]
+
+
+def test_idle_outbound_skips_the_writer_pipeline(monkeypatch, tmp_path):
+    service, query = make_service(monkeypatch, tmp_path, [], batch_size=2)
+    query.pending = False
+    service._run_pipeline = lambda *args, **kwargs: pytest.fail("pipeline started without pending orders")
+    
+    assert service.process() == {"sucesso": 0, "falha": 0}
+
+
+def test_bounded_queue_applies_backpressure_to_the_cursor(monkeypatch, tmp_path):
+    produced = []
+    release = threading.Event()
+    
+    def documents():
+        for number in range(1, 51):
+            produced.append(number)
+            yield tracos_order(number)
+    
+    service, query = make_service(monkeypatch, tmp_path, [], batch_size=10, workers=2, queue_size=4)
+    query.iter_unsynced_work_orders = lambda batch_size: documents()
+    write_json = service.write_json
+    service.write_json = lambda client_wo: release.wait() and write_json(client_wo)
+    
+    worker = threading.Thread(target=service.process)
+    worker.start()
+    time.sleep(0.1)
+    in_flight = len(produced)
+    release.set()
+    worker.join()
+    
+    assert in_flight <= 4 + 2 + 2
+    assert sum(query.acknowledged, []) == list(range(1, 51))
+
+
+def test_outbound_reconnects_after_a_failed_connection(monkeypatch, tmp_path):
+    disconnected = FakeQuery([])
+    disconnected.collection = None
+    disconnected.pending = False
+    connected = FakeQuery([tracos_order(1)])
+    queries = iter([disconnected, connected])
+    monkeypatch.setenv("DATA_OUTBOUND_DIR", str(tmp_path))
+    monkeypatch.setattr(outbound_module, "OutboundQuery", lambda: next(queries))
+    service = OutboundService(batch_size=10)
+    
+    assert service.process() == {"sucesso": 0, "falha": 0}
+    assert service.process() == {"sucesso": 1, "falha": 0}
+    assert disconnected.closed
+    assert connected.acknowledged == [[1]]
+
+
+def test_incremental_outbound_keeps_watermark_when_acknowledgement_fails(monkeypatch, tmp_path):
+    service, query = make_service(monkeypatch, tmp_path, [tracos_order(n) for n in range(1, 5)], batch_size=2)
+    query.mark_many_as_synced = lambda numbers: numbers != [1, 2]
+    
+    service.process_incremental()
+    
+    assert query.checkpoints.load(OutboundService.WATERMARK_CHECKPOINT) is None
+
+
+def test_tail_skips_synced_changes_and_saves_resume_token(monkeypatch, tmp_path):
+    synced = {**tracos_order(2), "isSynced": True}
+    service, query = make_service(monkeypatch, tmp_path, [tracos_order(1), synced, None], batch_size=10)
+    
+    service.tail()
+    
+    assert query.acknowledged == [[1]]
+    assert os.listdir(tmp_path) == ["1.json"]
+    assert query.checkpoints.load(OutboundService.RESUME_TOKEN_CHECKPOINT) == {"_data": "2"}
+
+
+def test_acknowledgement_error_stops_the_pipeline_instead_of_hanging(monkeypatch, tmp_path):
+    service, query = make_service(monkeypatch, tmp_path, [tracos_order(n) for n in range(1, 51)], batch_size=1, queue_size=1)
+    
+    def broken_save(name, value):
+        raise RuntimeError("checkpoint indisponível")
+    
+    query.checkpoints.save = broken_save
+    raised = []
+    
+    def run():
+        try:
+            service.process_incremental()
+        except RuntimeError as e:
+            raised.append(e)
+    
+    worker = threading.Thread(target=run)
+    worker.start()
+    worker.join(timeout=5)
+    
+    assert not worker.is_alive()
+    assert [str(e) for e in raised] == ["checkpoint indisponível"]
+    # The cursor stopped early instead of writing the whole backlog
+    assert query.acknowledged == [[1]]
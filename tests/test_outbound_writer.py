@@ -0,0 +1,71 @@
+import json
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.adapters.outbound_writer import OutboundWriter
+
+
+def client_order(order_no):
+    return {"orderNo": order_no, "summary": f"Test {order_no}", "isDone": False}
+
+
+def test_write_is_compact_and_leaves_no_temp_files(tmp_path):
+    writer = OutboundWriter(tmp_path, compact=True, fsync="file", output_format="json")
+    
+    assert writer.write(client_order(1)) is True
+    
+    assert os.listdir(tmp_path) == ["1.json"]
+    assert (tmp_path / "1.json").read_text() == '{"orderNo":1,"summary":"Test 1","isDone":false}'
+
+
+def test_write_pretty_prints_when_not_compact(tmp_path):
+    writer = OutboundWriter(tmp_path, compact=False, fsync="none", output_format="json")
+    
+    writer.write(client_order(1))
+    
+    assert (tmp_path / "1.json").read_text() == json.dumps(client_order(1), indent=2)
+
+
+def test_output_stays_indented_unless_compact_is_enabled(monkeypatch, tmp_path):
+    monkeypatch.delenv("OUTBOUND_COMPACT", raising=False)
+    assert OutboundWriter(tmp_path).compact is False
+    
+    monkeypatch.setenv("OUTBOUND_COMPACT", "true")
+    assert OutboundWriter(tmp_path).compact is True
+
+
+def test_batch_fsync_flushes_written_files(tmp_path):
+    writer = OutboundWriter(tmp_path, fsync="batch", output_format="json")
+    writer.write(client_order(1))
+    writer.write(client_order(2))
+    
+    assert len(writer._unsynced_paths) == 2
+    assert writer.flush() is True
+    assert writer._unsynced_paths == []
+
+
+def test_bundle_mode_writes_ndjson_with_manifest_on_flush(tmp_path):
+    writer = OutboundWriter(tmp_path, fsync="batch", output_format="ndjson")
+    writer.write(client_order(1))
+    writer.write(client_order(2))
+    
+    assert os.listdir(tmp_path) == []
+    assert writer.flush() is True
+    
+    bundle = next(tmp_path.glob("*.ndjson"))
+    manifest = json.loads(next(tmp_path.glob("*.manifest.json")).read_text())
+    lines = [json.loads(line) for line in bundle.read_text().splitlines()]
+    
+    assert lines == [client_order(1), client_order(2)]
+    assert manifest["bundle"] == bundle.name
+    assert manifest["count"] == 2
+    assert manifest["orderNos"] == [1, 2]
+
+
+def test_invalid_fsync_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        OutboundWriter(tmp_path, fsync="always")
@@ -0,0 +1,135 @@
+import json
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src.adapters.client_adapter as adapter_module
+from src.adapters.client_adapter import ClientAdapter
+
+
+def write_inbound(directory, name, content):
+    path = directory / name
+    path.write_text(content if isinstance(content, str) else json.dumps(content), encoding="utf-8")
+    return path
+
+
+def settled(path, age=3600):
+    # Older than QUARANTINE_MIN_AGE: no longer possibly being written by the ERP
+    past = time.time() - age
+    os.utime(path, (past, past))
+    return path
+
+
+def valid_order(order_no):
+    return {
+        "orderNo": order_no,
+        "summary": f"Test {order_no}",
+        "creationDate": "2024-12-08T10:00:00Z",
+        "lastUpdateDate": "2024-12-08T11:00:00Z"
+    }
+
+
+def make_adapter(monkeypatch, inbound_dir, **env):
+    monkeypatch.setenv("DATA_INBOUND_DIR", str(inbound_dir))
+    monkeypatch.delenv("DATA_REJECTED_DIR", raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return ClientAdapter()
+
+
+def test_bad_files_move_to_rejected_with_error_report(monkeypatch, tmp_path):
+    write_inbound(tmp_path, "1.json", valid_order(1))
+    settled(write_inbound(tmp_path, "corrupted.json", "{not json"))
+    write_inbound(tmp_path, "missing.json", {"orderNo": 3, "summary": "x", "lastUpdateDate": "2024-12-08T11:00:00Z"})
+    adapter = make_adapter(monkeypatch, tmp_path)
+    
+    assert [wo.orderNo for wo in adapter.iter_inbound_files()] == [1]
+    
+    rejected = tmp_path / "rejected"
+    assert sorted(p.name for p in tmp_path.glob("*.json")) == ["1.json"]
+    assert (rejected / "corrupted.json").read_text() == "{not json"
+    report = json.loads((rejected / "missing.json.error.json").read_text())
+    assert (report["reason"], report["field"], report["detail"]) == ("invalid", "creationDate", "faltando")
+    assert json.loads((rejected / "corrupted.json.error.json").read_text())["reason"] == "corrupted"
+    
+    # The next scan only sees pending work
+    assert [wo.orderNo for wo in adapter.iter_inbound_files()] == [1]
+    adapter.close()
+
+
+def test_unparseable_dates_are_rejected_instead_of_failing_every_run(monkeypatch, tmp_path):
+    write_inbound(tmp_path, "1.json", valid_order(1))
+    write_inbound(tmp_path, "2.json", {**valid_order(2), "lastUpdateDate": "31/12/2024"})
+    adapter = make_adapter(monkeypatch, tmp_path)
+    
+    assert [wo.orderNo for wo in adapter.iter_inbound_files()] == [1]
+    
+    report = json.loads((tmp_path / "rejected" / "2.json.error.json").read_text())
+    assert (report["reason"], report["field"], report["detail"]) == ("invalid", "lastUpdateDate", "data inválida")
+    adapter.close()
+
+
+def test_unreadable_files_back_off_then_get_quarantined(monkeypatch, tmp_path):
+    locked = write_inbound(tmp_path, "locked.json", valid_order(1))
+    reads = []
+    read_bytes = adapter_module.codec.read_bytes
+    
+    def guarded_read(path):
+        reads.append(os.path.basename(path))
+        if str(path) == str(locked):
+            raise PermissionError("acesso negado")
+        return read_bytes(path)
+    
+    monkeypatch.setattr(adapter_module.codec, "read_bytes", guarded_read)
+    adapter = make_adapter(monkeypatch, tmp_path, QUARANTINE_MAX_FAILURES="2", QUARANTINE_RETRY_DELAY="0.05")
+    
+    assert list(adapter.iter_inbound_files()) == []
+    assert list(adapter.iter_inbound_files()) == []
+    assert reads == ["locked.json"]
+    
+    # Retry state survives a restart
+    adapter.close()
+    time.sleep(0.06)
+    adapter = make_adapter(monkeypatch, tmp_path, QUARANTINE_MAX_FAILURES="2", QUARANTINE_RETRY_DELAY="0.05")
+    assert list(adapter.iter_inbound_files()) == []
+    
+    assert reads == ["locked.json", "locked.json"]
+    report = json.loads((tmp_path / "rejected" / "locked.json.error.json").read_text())
+    assert (report["reason"], report["failures"]) == ("unreadable", 2)
+    assert "PermissionError" in report["detail"]
+    adapter.close()
+
+
+def test_quarantine_can_be_disabled(monkeypatch, tmp_path):
+    write_inbound(tmp_path, "corrupted.json", "{not json")
+    adapter = make_adapter(monkeypatch, tmp_path, INBOUND_QUARANTINE="false")
+    
+    assert list(adapter.iter_inbound_files()) == []
+    assert (tmp_path / "corrupted.json").exists()
+    assert not (tmp_path / "rejected").exists()
+
+
+def test_invalid_json_in_a_fresh_file_backs_off_instead_of_being_rejected(monkeypatch, tmp_path):
+    partial = write_inbound(tmp_path, "partial.json", '{"orderNo": 1, "summ')
+    adapter = make_adapter(monkeypatch, tmp_path, QUARANTINE_MIN_AGE="30")
+    
+    assert list(adapter.iter_inbound_files()) == []
+    assert partial.exists()
+    assert not (tmp_path / "rejected" / "partial.json").exists()
+    assert [entry.name for entry in adapter.iter_changed_files()] == []
+    
+    # The ERP finishes the file: the rewrite is picked up right away, despite the backoff
+    write_inbound(tmp_path, "partial.json", valid_order(1))
+    assert [wo.orderNo for wo in adapter.iter_inbound_files()] == [1]
+    adapter.close()
+
+
+def test_invalid_json_in_a_settled_file_is_rejected(monkeypatch, tmp_path):
+    settled(write_inbound(tmp_path, "broken.json", "{not json"), age=60)
+    adapter = make_adapter(monkeypatch, tmp_path, QUARANTINE_MIN_AGE="30")
+    
+    assert list(adapter.iter_inbound_files()) == []
+    assert (tmp_path / "rejected" / "broken.json").exists()
+    adapter.close()
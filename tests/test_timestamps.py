@@ -0,0 +1,42 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.translators.timestamps import UTC, format_timestamp, parse_timestamp
+
+
+@pytest.mark.parametrize("value", [
+    "2024-12-08T10:00:00Z",
+    "2024-12-08T10:00:00+00:00",
+    "2024-12-08T13:00:00+03:00",
+    "2024-12-08T10:00:00",
+])
+def test_parse_always_returns_aware_utc(value):
+    parsed = parse_timestamp(value)
+    
+    assert parsed == datetime(2024, 12, 8, 10, tzinfo=UTC)
+    assert parsed.tzinfo is UTC
+
+
+def test_parse_keeps_microseconds():
+    assert parse_timestamp("2024-12-08T10:00:00.123456Z").microsecond == 123456
+
+
+def test_format_normalizes_to_z_suffix():
+    offset = timezone(timedelta(hours=-3))
+    
+    assert format_timestamp(datetime(2024, 12, 8, 10, tzinfo=UTC)) == "2024-12-08T10:00:00Z"
+    assert format_timestamp(datetime(2024, 12, 8, 7, tzinfo=offset)) == "2024-12-08T10:00:00Z"
+    assert format_timestamp(datetime(2024, 12, 8, 10)) == "2024-12-08T10:00:00Z"
+    assert format_timestamp("2024-12-08T10:00:00Z") == "2024-12-08T10:00:00Z"
+    assert format_timestamp(None) is None
+
+
+def test_invalid_timestamp_raises():
+    with pytest.raises(ValueError):
+        parse_timestamp("2024-13-08T10:00:00Z")
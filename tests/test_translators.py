@@ -0,0 +1,114 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.translators.client_to_tracos import ClientToTracOSTranslator
+from src.translators.tracos_to_client import TracOSToClientTranslator
+from src.translators.fingerprint import content_hash
+from src.models.workorders import ClientWorkOrder, ValidationError
+from src.translators.columnar import client_columns, tracos_columns
+
+import pytest
+
+
+CLIENT_ORDER = {
+    "orderNo": 42,
+    "isCanceled": False,
+    "isDeleted": False,
+    "isDone": False,
+    "isOnHold": True,
+    "isPending": False,
+    "summary": "Replace bearing",
+    "creationDate": "2024-12-08T10:00:00Z",
+    "lastUpdateDate": "2024-12-08T11:00:00Z",
+    "deletedDate": None
+}
+
+
+def test_round_trip_keeps_business_fields():
+    tracos = ClientToTracOSTranslator().translate(CLIENT_ORDER)
+    client = TracOSToClientTranslator().translate(tracos)
+    
+    assert tracos["status"] == "on_hold"
+    assert client["orderNo"] == 42
+    assert client["isOnHold"] is True
+    assert client["summary"] == "Replace bearing"
+    assert client["creationDate"] == "2024-12-08T10:00:00Z"
+
+
+def test_content_hash_tracks_business_fields_only():
+    translator = ClientToTracOSTranslator()
+    original = translator.translate(CLIENT_ORDER)
+    
+    same = translator.translate(dict(CLIENT_ORDER))
+    changed = translator.translate({**CLIENT_ORDER, "summary": "Replace bearing and seal"})
+    synced = {**original, "isSynced": True}
+    
+    assert same["contentHash"] == original["contentHash"]
+    assert changed["contentHash"] != original["contentHash"]
+    assert content_hash(synced) == original["contentHash"]
+
+
+def test_record_translation_matches_dict_translation():
+    record = ClientToTracOSTranslator().translate_record(ClientWorkOrder.from_dict(CLIENT_ORDER))
+    client = TracOSToClientTranslator().translate_record(record)
+    
+    assert record.to_document() == ClientToTracOSTranslator().translate(CLIENT_ORDER)
+    assert client.to_dict() == TracOSToClientTranslator().translate(record.to_document())
+
+
+@pytest.mark.parametrize("data, field, reason", [
+    ({k: v for k, v in CLIENT_ORDER.items() if k != "summary"}, "summary", "faltando"),
+    ({**CLIENT_ORDER, "creationDate": ""}, "creationDate", "vazio"),
+    ({**CLIENT_ORDER, "orderNo": None}, "orderNo", "vazio"),
+    ({**CLIENT_ORDER, "lastUpdateDate": "31/12/2024"}, "lastUpdateDate", "data inválida"),
+    ({**CLIENT_ORDER, "deletedDate": 20241209}, "deletedDate", "data inválida"),
+])
+def test_from_dict_rejects_invalid_orders(data, field, reason):
+    with pytest.raises(ValidationError) as error:
+        ClientWorkOrder.from_dict(data)
+    
+    assert (error.value.field, error.value.reason) == (field, reason)
+
+
+def batch_orders():
+    flags = [{}, {"isCanceled": True, "isDone": True}, {"isDone": True}, {"isPending": True}, {"isOnHold": False}]
+    orders = [{**CLIENT_ORDER, "orderNo": i, "isOnHold": False, **flags[i % len(flags)]} for i in range(10)]
+    orders[3] = {**orders[3], "isDeleted": True, "deletedDate": "2024-12-09T08:30:00Z"}
+    orders[4] = {**orders[4], "lastUpdateDate": "2024-12-08T14:00:00+03:00"}
+    del orders[5]["isPending"]
+    return orders
+
+
+def test_translate_batch_matches_per_record_translation():
+    inbound, outbound = ClientToTracOSTranslator(), TracOSToClientTranslator()
+    orders = batch_orders()
+    
+    documents = inbound.translate_batch(client_columns(orders))
+    
+    assert documents == [inbound.translate(order) for order in orders]
+    assert outbound.translate_batch(tracos_columns(documents)) == [outbound.translate(doc) for doc in documents]
+
+
+def test_translate_batch_accepts_numpy_columns():
+    np = pytest.importorskip("numpy")
+    translator = ClientToTracOSTranslator()
+    orders = batch_orders()
+    columns = {
+        name: np.asarray(values) if name == "orderNo" or name.startswith("is") else values
+        for name, values in client_columns(orders).items()
+    }
+    
+    documents = translator.translate_batch(columns)
+    
+    assert documents == [translator.translate(order) for order in orders]
+    assert type(documents[0]["number"]) is int and type(documents[0]["deleted"]) is bool
+
+
+def test_translate_batch_rejects_missing_required_column():
+    columns = client_columns([CLIENT_ORDER])
+    del columns["summary"]
+    
+    with pytest.raises(ValidationError):
+        ClientToTracOSTranslator().translate_batch(columns)